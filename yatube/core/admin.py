@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import MediaBlob, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'run_at', 'attempts',)
+    search_fields = ('name',)
+    list_filter = ('status', 'name',)
+
+
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'ref_count', 'updated',)
+    search_fields = ('name',)
+
+
+admin.site.register(Task, TaskAdmin)
+admin.site.register(MediaBlob, MediaBlobAdmin)
@@ -0,0 +1,137 @@
+"""
+Реестр бенчмарков для `manage.py benchmark`.
+Бенчмарк - функция, которая возвращает словарь {метрика: значение}.
+Приложения регистрируют свои бенчмарки в модуле benchmarks.py.
+"""
+import io
+import os
+import shutil
+import tempfile
+import time
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .compression import available_encodings, compress
+from .middleware import compression_level
+from .startup import measure_cold_start
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+@benchmark('cold_start')
+def cold_start(repeat):
+    best, median = measure_cold_start(repeat)
+    return {
+        'min, мс': best * 1000,
+        'медиана, мс': median * 1000,
+    }
+
+
+def benchmark_client():
+    host = next(
+        (host for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost'
+    ).lstrip('.')
+    return Client(HTTP_HOST=host)
+
+
+@benchmark('compression')
+def compression(repeat):
+    """Экономия байт и цена сжатия в процессорном времени на ответ."""
+    client = benchmark_client()
+    results = {}
+    for name in ('posts:index', 'about:tech'):
+        response = client.get(reverse(name))
+        content_type = response['Content-Type']
+        for encoding in available_encodings():
+            level = compression_level(content_type, encoding)
+            started = time.process_time()
+            for _ in range(repeat):
+                compressed = compress(response.content, encoding, level)
+            cpu = (time.process_time() - started) / repeat
+            saved = len(response.content) - len(compressed)
+            results[f'{name} {encoding} сэкономлено, байт'] = saved
+            results[f'{name} {encoding} CPU, мс'] = cpu * 1000
+    return results
+
+
+MEDIA_BENCHMARK_SIZE = 32 * 1024 * 1024
+
+
+@benchmark('media')
+def media(repeat):
+    """
+    Отдача большой картинки: поток FileResponse через Python, тот же
+    ответ через sendfile (как его отправит gunicorn), кусок по Range
+    и X-Accel-Redirect, где Django только проверяет доступ.
+    """
+    client = benchmark_client()
+    root = tempfile.mkdtemp()
+    with open(os.path.join(root, 'large.jpg'), 'wb') as file:
+        file.write(os.urandom(MEDIA_BENCHMARK_SIZE))
+    url = settings.MEDIA_URL + 'large.jpg'
+    megabytes = MEDIA_BENCHMARK_SIZE / 1024 / 1024
+    results = {}
+    try:
+        with override_settings(
+            MEDIA_ROOT=root, MEDIA_ACCEL_REDIRECT=None, MEDIA_X_SENDFILE=False
+        ), open(os.devnull, 'wb') as devnull:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for chunk in client.get(url).streaming_content:
+                    devnull.write(chunk)
+            elapsed = (time.perf_counter() - started) / repeat
+            results['FileResponse, МБ/с'] = megabytes / elapsed
+            # Тестовый клиент оборачивает поток ответа, поэтому ответ
+            # берётся у WSGI-обработчика, как его получит gunicorn
+            handler = WSGIHandler()
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': url,
+                'HTTP_HOST': client.defaults['HTTP_HOST'],
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+                'wsgi.url_scheme': 'http', 'wsgi.file_wrapper': FileWrapper,
+            }
+            started = time.perf_counter()
+            for _ in range(repeat):
+                response = handler(
+                    {**environ, 'wsgi.input': io.BytesIO()},
+                    lambda status, headers: None
+                )
+                source = response.filelike
+                offset, left = source.tell(), MEDIA_BENCHMARK_SIZE
+                while left:
+                    sent = os.sendfile(
+                        devnull.fileno(), source.fileno(), offset, left
+                    )
+                    offset, left = offset + sent, left - sent
+                response.close()
+            elapsed = (time.perf_counter() - started) / repeat
+            results['sendfile, МБ/с'] = megabytes / elapsed
+            started = time.perf_counter()
+            for _ in range(repeat):
+                response = client.get(url, HTTP_RANGE='bytes=0-1048575')
+                for chunk in response.streaming_content:
+                    devnull.write(chunk)
+            elapsed = (time.perf_counter() - started) / repeat
+            results['Range 1 МБ, мс'] = elapsed * 1000
+        with override_settings(
+            MEDIA_ROOT=root, MEDIA_ACCEL_REDIRECT='/protected-media/'
+        ):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                client.get(url)
+            elapsed = (time.perf_counter() - started) / repeat
+            results['X-Accel-Redirect, мс'] = elapsed * 1000
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
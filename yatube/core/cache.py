@@ -0,0 +1,216 @@
+import hashlib
+import math
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+PAGE_CACHE_PREFIX = 'page_cache'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _tag_key(tag):
+    return f'{PAGE_CACHE_PREFIX}:tag:{tag}'
+
+
+def tag_versions(tags):
+    """
+    Версии тегов страниц. Версия - время последней очистки тега,
+    поэтому вытесненный из кеша тег не воскрешает старые страницы.
+    """
+    keys = {tag: _tag_key(tag) for tag in tags}
+    versions = cache.get_many(list(keys.values()))
+    missing = {key: time.time_ns() for key in keys.values()
+               if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {tag: versions[key] for tag, key in keys.items()}
+
+
+def purge_page_tags(*tags):
+    """Сбрасывает закешированные страницы с этими тегами."""
+    now = time.time_ns()
+    cache.set_many({_tag_key(tag): now for tag in tags}, None)
+
+
+def add_page_cache_tags(request, *tags):
+    """
+    Отмечает, от каких данных зависит страница.
+    Вызывается во view до выборки этих данных.
+    """
+    if hasattr(request, 'page_cache_tags'):
+        request.page_cache_tags.update(tag_versions(tags))
+
+
+def acquire_lock(key, timeout):
+    """Блокировка через атомарный add: перестраивает только один воркер."""
+    return cache.add(f'{key}:lock', 1, timeout)
+
+
+def release_lock(key):
+    cache.delete(f'{key}:lock')
+
+
+def poll(attempt, wait):
+    """
+    Вызывает attempt() раз в LOCK_POLL_INTERVAL, пока он не вернёт
+    истинное значение, но не дольше wait секунд. Возвращает последний
+    результат; при wait=0 attempt вызывается один раз.
+    """
+    deadline = time.monotonic() + wait
+    result = attempt()
+    while not result and time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        result = attempt()
+    return result
+
+
+def wait_lock(key, timeout, wait):
+    """Берёт блокировку, ожидая её не дольше wait секунд."""
+    return poll(lambda: acquire_lock(key, timeout), wait)
+
+
+def wait_for(key, timeout, is_fresh):
+    """Ждёт, пока другой воркер положит свежее значение в кеш."""
+    def fresh_value():
+        value = cache.get(key)
+        if value is not None and is_fresh(value):
+            return value
+        return None
+    return poll(fresh_value, timeout)
+
+
+def get_or_rebuild(key, build, timeout, beta=None, stale_timeout=None):
+    """
+    Значение из кеша с защитой от одновременного перестроения.
+
+    Вероятностное раннее истечение (XFetch): чем ближе срок и чем дольше
+    строится значение, тем вероятнее, что один из запросов перестроит его
+    заранее (beta > 1 - раньше, 0 - отключает). Перестраивает только
+    воркер, взявший блокировку, остальные отдают старое значение, которое
+    хранится ещё stale_timeout секунд после срока.
+    """
+    if beta is None:
+        beta = settings.FRAGMENT_CACHE_BETA
+    if stale_timeout is None:
+        stale_timeout = settings.FRAGMENT_CACHE_STALE_TIMEOUT
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires_at = entry
+        jitter = -delta * beta * math.log(1 - random.random())
+        if time.time() + jitter < expires_at:
+            return value
+
+    locked = acquire_lock(key, settings.FRAGMENT_CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if entry is not None:
+            return entry[0]
+        entry = wait_for(
+            key, settings.FRAGMENT_CACHE_LOCK_WAIT, lambda entry: True
+        )
+        if entry is not None:
+            return entry[0]
+    try:
+        started = time.time()
+        value = build()
+        finished = time.time()
+        cache.set(
+            key, (value, finished - started, finished + timeout),
+            timeout + stale_timeout
+        )
+    finally:
+        if locked:
+            release_lock(key)
+    return value
+
+
+def is_anonymous_request(request):
+    """Запрос без сессии и CSRF-куки: страница одинакова для всех."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    cookies = request.COOKIES
+    return (settings.SESSION_COOKIE_NAME not in cookies
+            and settings.CSRF_COOKIE_NAME not in cookies)
+
+
+class CachedPage:
+    def __init__(self, content, content_type, tags):
+        self.content = content
+        self.content_type = content_type
+        self.tags = tags
+        self.expires_at = time.time() + settings.PAGE_CACHE_TIMEOUT
+
+    def is_fresh(self):
+        if time.time() >= self.expires_at:
+            return False
+        return tag_versions(self.tags) == self.tags
+
+    def response(self, state):
+        response = HttpResponse(self.content, content_type=self.content_type)
+        mark_page_cache(response, state)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+def mark_page_cache(response, state):
+    """Заголовок X-Page-Cache для отладки, только при DEBUG."""
+    if settings.DEBUG:
+        response['X-Page-Cache'] = state
+
+
+def page_cache_key(full_path):
+    """Ключ кеша анонимной страницы по пути с query string."""
+    path_hash = hashlib.md5(full_path.encode()).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:{path_hash}'
+
+
+def cache_anonymous_page(view):
+    """
+    Кеш целой страницы для анонимных посетителей по пути и query string.
+    Страница сбрасывается, когда меняется версия любого из её тегов
+    (см. add_page_cache_tags и purge_page_tags). Пока один воркер
+    перестраивает страницу, остальные отдают устаревшую копию.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_anonymous_request(request):
+            return view(request, *args, **kwargs)
+        key = page_cache_key(request.get_full_path())
+        page = cache.get(key)
+        if page is not None and page.is_fresh():
+            return page.response('hit')
+
+        locked = acquire_lock(key, settings.PAGE_CACHE_LOCK_TIMEOUT)
+        if not locked:
+            if page is None:
+                page = wait_for(
+                    key, settings.PAGE_CACHE_LOCK_WAIT, CachedPage.is_fresh
+                )
+            if page is not None:
+                return page.response('stale')
+        try:
+            request.page_cache_tags = {}
+            response = view(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.streaming
+                    and not response.cookies):
+                page = CachedPage(
+                    response.content, response['Content-Type'],
+                    request.page_cache_tags
+                )
+                cache.set(
+                    key, page,
+                    settings.PAGE_CACHE_TIMEOUT
+                    + settings.PAGE_CACHE_STALE_TIMEOUT
+                )
+                mark_page_cache(response, 'miss')
+        finally:
+            if locked:
+                release_lock(key)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapper
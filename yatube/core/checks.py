@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from django.core.exceptions import ImproperlyConfigured
+
+
+@register(Tags.security, deploy=True)
+def check_production_settings(app_configs, **kwargs):
+    """
+    `manage.py check --deploy`: прод без отладки и отладочных
+    инструментов.
+    """
+    errors = []
+    if settings.DEBUG:
+        errors.append(Error(
+            'В проде нельзя включать DEBUG.', id='core.E001'
+        ))
+    if settings.TEMPLATE_PROFILING:
+        errors.append(Error(
+            'В проде нельзя включать TEMPLATE_PROFILING.', id='core.E002'
+        ))
+    debug_tools = (
+        set(settings.DEBUG_ONLY_APPS) & set(settings.INSTALLED_APPS)
+        | set(settings.DEBUG_ONLY_MIDDLEWARE) & set(settings.MIDDLEWARE)
+    )
+    if debug_tools:
+        errors.append(Error(
+            'В проде подключены отладочные инструменты: '
+            + ', '.join(sorted(debug_tools)),
+            hint='Уберите их из INSTALLED_APPS и MIDDLEWARE.',
+            id='core.E003',
+        ))
+    return errors
+
+
+def run_startup_checks():
+    """
+    Те же проверки при старте WSGI-приложения: прод с отладкой не
+    запускается, даже если `check --deploy` забыли выполнить.
+    """
+    errors = check_production_settings(None)
+    if errors:
+        raise ImproperlyConfigured('\n'.join(
+            f'{error.id}: {error.msg}' for error in errors
+        ))
@@ -0,0 +1,77 @@
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def available_encodings():
+    """Поддерживаемые кодировки в порядке предпочтения."""
+    if brotli is not None:
+        return ('br', 'gzip')
+    return ('gzip',)
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        quality = BROTLI_QUALITY if level is None else level
+        return brotli.compress(data, quality=quality)
+    if encoding == 'gzip':
+        level = GZIP_LEVEL if level is None else level
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    raise ValueError(f'Неизвестная кодировка {encoding}')
+
+
+def compress_stream(chunks, encoding, level=None):
+    """Сжимает поток по частям, сбрасывая буфер после каждой части."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            quality=BROTLI_QUALITY if level is None else level
+        )
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(
+        GZIP_LEVEL if level is None else level, zlib.DEFLATED, 31
+    )
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def parse_accept_encoding(header):
+    """Кодировки, которые принимает клиент (с ненулевым q)."""
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name)
+    return accepted
+
+
+def negotiate_encoding(header, encodings=None):
+    """Лучшая общая кодировка из Accept-Encoding или None."""
+    accepted = parse_accept_encoding(header)
+    for encoding in encodings or available_encodings():
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
@@ -0,0 +1,123 @@
+"""
+Удаление неиспользуемых правил CSS.
+
+Правило остаётся, если хотя бы один его селектор может сработать:
+все классы и id селектора встречаются как слова в шаблонах.
+Слова собираются грубо, по всему тексту шаблонов, поэтому классы
+из аргументов фильтров вроде addclass:"form-control" тоже учитываются.
+"""
+import os
+import re
+
+WORD_RE = re.compile(r'[A-Za-z0-9_-]+')
+NAME_RE = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+NOT_RE = re.compile(r':not\([^)]*\)')
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+# At-правила, внутри которых лежат обычные правила
+NESTED_AT_RULES = ('@media', '@supports', '@document')
+
+
+def collect_words(directories):
+    words = set()
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if not filename.endswith(('.html', '.txt', '.xml')):
+                    continue
+                with open(os.path.join(root, filename), encoding='utf-8') as f:
+                    words.update(WORD_RE.findall(f.read()))
+    return words
+
+
+def _selector_used(selector, words):
+    selector = NOT_RE.sub('', ATTRIBUTE_RE.sub('', selector))
+    return all(name in words for name in NAME_RE.findall(selector))
+
+
+def _split_selectors(prelude):
+    selectors, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+    selectors.append(prelude[start:])
+    return [selector.strip() for selector in selectors]
+
+
+def _skip_string(css, index):
+    quote = css[index]
+    index += 1
+    while index < len(css) and css[index] != quote:
+        index += 2 if css[index] == '\\' else 1
+    return index + 1
+
+
+def _find(css, index, stops):
+    """Индекс первого символа из stops вне строк и комментариев."""
+    while index < len(css):
+        char = css[index]
+        if char in '"\'':
+            index = _skip_string(css, index)
+        elif css.startswith('/*', index):
+            end = css.find('*/', index + 2)
+            index = len(css) if end == -1 else end + 2
+        elif char in stops:
+            return index
+        else:
+            index += 1
+    return len(css)
+
+
+def _block_end(css, index):
+    """Индекс закрывающей скобки блока, открытого на css[index]."""
+    depth = 0
+    while index < len(css):
+        index = _find(css, index, '{}')
+        if index == len(css):
+            return index
+        depth += 1 if css[index] == '{' else -1
+        if depth == 0:
+            return index
+        index += 1
+    return index
+
+
+def purge_css(css, words):
+    output = []
+    index = 0
+    while index < len(css):
+        stop = _find(css, index, '{;}')
+        prelude = css[index:stop]
+        # Лицензионные комментарии /*! ... */ сохраняем
+        output.extend(
+            comment for comment in COMMENT_RE.findall(prelude)
+            if comment.startswith('/*!')
+        )
+        prelude = COMMENT_RE.sub('', prelude).strip()
+        if stop == len(css) or css[stop] != '{':
+            if prelude and stop < len(css) and css[stop] == ';':
+                output.append(prelude + ';')
+            index = stop + 1
+            continue
+        end = _block_end(css, stop)
+        body = css[stop + 1:end]
+        index = end + 1
+        if prelude.startswith(NESTED_AT_RULES):
+            body = purge_css(body, words)
+            if body:
+                output.append(f'{prelude}{{{body}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in _split_selectors(prelude)
+                if _selector_used(selector, words)
+            ]
+            if selectors:
+                output.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(output)
@@ -0,0 +1,85 @@
+"""
+Карта объектов запроса (identity map).
+
+Django строит новый экземпляр модели на каждую строку: автор десяти
+постов ленты и его комментарии под постом - это десять с лишним
+одинаковых объектов User. IdentityMap хранит по одному экземпляру на
+(модель, pk) в пределах запроса, get_identity_map держит её на запросе:
+
+- hydrate(queryset, ids) - объекты по списку id (закешированные ленты)
+  в его порядке; недостающие читаются одним in_bulk на модель;
+- attach(objects, 'author', ...) - связанные объекты: уже загруженные
+  select_related заменяются общими экземплярами, остальные читаются
+  одним in_bulk на модель.
+
+Первый попавший в карту экземпляр остаётся общим, поэтому объекты,
+загруженные с only(), дочитывают отложенные поля как обычно.
+"""
+from core.pagelist import add_transform
+
+
+class IdentityMap:
+    def __init__(self):
+        self.objects = {}
+
+    def _models(self, model):
+        return self.objects.setdefault(model._meta.concrete_model, {})
+
+    def add(self, obj):
+        """Общий экземпляр для obj: уже известный или сам obj."""
+        return self._models(type(obj)).setdefault(obj.pk, obj)
+
+    def get_many(self, model, ids, queryset=None):
+        """{pk: объект} для ids; недостающие читаются одним in_bulk."""
+        known = self._models(model)
+        missing = {pk for pk in ids if pk not in known}
+        if missing:
+            if queryset is None:
+                queryset = model._default_manager.all()
+            for pk, obj in queryset.in_bulk(list(missing)).items():
+                known.setdefault(pk, obj)
+        return {pk: known[pk] for pk in ids if pk in known}
+
+    def hydrate(self, queryset, ids):
+        """Объекты по списку ids в его порядке, без удалённых."""
+        found = self.get_many(queryset.model, ids, queryset)
+        return [found[pk] for pk in ids if pk in found]
+
+    def attach(self, objects, *fields):
+        """Заполняет внешние ключи fields объектов общими экземплярами."""
+        objects = list(objects)
+        if not objects:
+            return objects
+        for name in fields:
+            field = objects[0]._meta.get_field(name)
+            missing = set()
+            for obj in objects:
+                if field.is_cached(obj):
+                    related = field.get_cached_value(obj)
+                    if related is not None:
+                        field.set_cached_value(obj, self.add(related))
+                elif getattr(obj, field.attname) is not None:
+                    missing.add(getattr(obj, field.attname))
+            if not missing:
+                continue
+            found = self.get_many(field.related_model, missing)
+            for obj in objects:
+                pk = getattr(obj, field.attname)
+                if not field.is_cached(obj) and pk in found:
+                    field.set_cached_value(obj, found[pk])
+        return objects
+
+
+def get_identity_map(request):
+    """Карта объектов запроса, создаётся при первом обращении."""
+    if not hasattr(request, 'identity_map'):
+        request.identity_map = IdentityMap()
+    return request.identity_map
+
+
+def share_related(request, page, *fields):
+    """Связанные объекты fields у всех объектов страницы - общие."""
+    identity_map = get_identity_map(request)
+    return add_transform(
+        page, lambda objects: identity_map.attach(objects, *fields)
+    )
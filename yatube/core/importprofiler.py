@@ -0,0 +1,54 @@
+"""
+Замер стоимости импорта модулей при старте Django.
+
+`python -X importtime` не видит модули, загруженные через
+importlib.import_module, а именно так Django грузит приложения, модели
+и urls. Поэтому замеряем сами, подменяя загрузку модуля в importlib.
+Модуль запускается в отдельном интерпретаторе:
+`python -m core.importprofiler`, и не должен ничего импортировать
+из Django до установки замера.
+"""
+import importlib
+import sys
+import time
+
+_bootstrap = sys.modules['importlib._bootstrap']
+_original_load_unlocked = _bootstrap._load_unlocked
+
+
+def install(records):
+    stack = []
+
+    def timed_load_unlocked(spec):
+        started = time.perf_counter_ns()
+        stack.append(0)
+        try:
+            return _original_load_unlocked(spec)
+        finally:
+            children = stack.pop()
+            cumulative = (time.perf_counter_ns() - started) // 1000
+            if stack:
+                stack[-1] += cumulative
+            records.append(
+                (spec.name, cumulative - children, cumulative, len(stack))
+            )
+
+    _bootstrap._load_unlocked = timed_load_unlocked
+
+
+def main():
+    records = []
+    install(records)
+    import django
+    django.setup()
+    from django.conf import settings
+    importlib.import_module(settings.ROOT_URLCONF)
+    for name, self_time, cumulative, depth in records:
+        indent = '  ' * depth
+        print(
+            f'import time: {self_time:9d} | {cumulative:10d} | {indent}{name}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+def keyset_chunks(queryset, chunk_size, key='pk'):
+    """
+    Перебирает queryset порциями по chunk_size, продолжая каждую порцию
+    с ключа после последней строки (WHERE key > последний). В отличие от
+    OFFSET стоимость порции не растёт с удалением от начала таблицы.
+    key должен быть уникальным; queryset может быть values() или
+    values_list(), тогда key должен входить в выбранные поля.
+    """
+    queryset = queryset.order_by(key)
+    last = None
+    while True:
+        page = queryset
+        if last is not None:
+            page = page.filter(**{f'{key}__gt': last})
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last = _key_value(chunk[-1], key, queryset)
+
+
+def keyset_iterator(queryset, chunk_size, key='pk'):
+    for chunk in keyset_chunks(queryset, chunk_size, key):
+        yield from chunk
+
+
+def batches(iterable, size):
+    """Списки по size элементов из любого итерируемого, последний короче."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _key_value(row, key, queryset):
+    if hasattr(row, '_meta'):
+        return getattr(row, key)
+    if key == 'pk':
+        key = queryset.model._meta.pk.name
+    if isinstance(row, dict):
+        return row[key]
+    if isinstance(row, tuple):
+        return row[queryset._fields.index(key)]
+    # values_list(..., flat=True)
+    return row
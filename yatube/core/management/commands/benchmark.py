@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import autodiscover_modules
+
+from core.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = 'Запускает бенчмарки проекта'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help='Имена бенчмарков, по умолчанию все'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Количество повторов замера'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('benchmarks')
+        names = options['names'] or sorted(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(
+                'Неизвестные бенчмарки: ' + ', '.join(sorted(unknown))
+            )
+        for name in names:
+            results = BENCHMARKS[name](options['repeat'])
+            for metric, value in results.items():
+                self.stdout.write(f'{name} {metric}: {value:.2f}')
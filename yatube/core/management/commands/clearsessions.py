@@ -0,0 +1,55 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет устаревшие сессии небольшими порциями, '
+        'не блокируя таблицу сессий надолго'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.CLEARSESSIONS_BATCH_SIZE,
+            help='Сколько сессий удалять за один запрос'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза между порциями в секундах'
+        )
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        store = engine.SessionStore
+        if not hasattr(store, 'get_model_class'):
+            try:
+                store.clear_expired()
+            except NotImplementedError:
+                self.stderr.write(
+                    f'Хранилище {settings.SESSION_ENGINE} не поддерживает '
+                    'удаление устаревших сессий.'
+                )
+            return
+        model = store.get_model_class()
+        deleted = 0
+        while True:
+            now = timezone.now()
+            keys = list(
+                model.objects.filter(expire_date__lt=now)
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            # Сессию могли продлить между выборкой и удалением
+            deleted += model.objects.filter(
+                pk__in=keys, expire_date__lt=now
+            ).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        if options['verbosity'] > 0:
+            self.stdout.write(f'Удалено устаревших сессий: {deleted}')
@@ -0,0 +1,123 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import worker
+from core.tasks import claim_tasks, finish_task, format_error, run_task
+
+BROKEN_POOL_ERROR = 'Процесс воркера завершился аварийно'
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет отложенные задачи из очереди в пуле процессов, '
+        'повторяя упавшие задачи'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.TASKS_WORKERS,
+            help='Количество процессов, 0 - выполнять задачи в этом процессе'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=settings.TASKS_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди в секундах'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        self.done = 0
+        self.failed = 0
+        self.verbosity = options['verbosity']
+        try:
+            if options['workers'] > 0:
+                self.run_pool(options)
+            else:
+                self.run_inline(options)
+        except KeyboardInterrupt:
+            pass
+        if options['verbosity'] > 0:
+            self.stdout.write(
+                f'Выполнено задач: {self.done}, с ошибкой: {self.failed}'
+            )
+
+    def record(self, task_obj, error=None):
+        finish_task(task_obj, error)
+        if error is None:
+            self.done += 1
+        else:
+            self.failed += 1
+            if self.verbosity > 1:
+                self.stderr.write(f'{task_obj.name}: {error}')
+
+    def run_inline(self, options):
+        while True:
+            close_old_connections()
+            tasks = claim_tasks(1)
+            if not tasks:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            task_obj = tasks[0]
+            try:
+                run_task(task_obj.name, task_obj.payload)
+            except Exception as exc:
+                self.record(task_obj, format_error(exc))
+            else:
+                self.record(task_obj)
+
+    def run_pool(self, options):
+        while True:
+            running = {}
+            try:
+                self.run_executor(options, running)
+                return
+            except BrokenProcessPool:
+                # Процесс пула умер посреди задачи (OOM killer, segfault):
+                # какая задача виновата, неизвестно, поэтому попытка
+                # засчитывается всем задачам пула, а пул создаётся заново
+                for task_obj in running.values():
+                    self.record(task_obj, BROKEN_POOL_ERROR)
+
+    def run_executor(self, options, running):
+        with ProcessPoolExecutor(
+            max_workers=options['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=worker.init_worker,
+        ) as executor:
+            while True:
+                close_old_connections()
+                free = options['workers'] - len(running)
+                tasks = claim_tasks(free) if free else []
+                for task_obj in tasks:
+                    future = executor.submit(
+                        worker.run_task, task_obj.name, task_obj.payload
+                    )
+                    running[future] = task_obj
+                if not running:
+                    if options['once']:
+                        return
+                    time.sleep(options['poll_interval'])
+                    continue
+                finished, _ = wait(
+                    running, timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    exc = future.exception()
+                    if isinstance(exc, BrokenProcessPool):
+                        raise exc
+                    task_obj = running.pop(future)
+                    self.record(
+                        task_obj, format_error(exc) if exc else None
+                    )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from core.startup import profile_imports
+
+
+class Command(BaseCommand):
+    help = 'Стоимость импорта модулей во время django.setup()'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=30,
+            help='Сколько самых дорогих модулей показать'
+        )
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='cumulative',
+            help='Сортировать по собственному или общему времени импорта'
+        )
+        parser.add_argument(
+            '--prefix', default='',
+            help='Показывать только модули с этим префиксом'
+        )
+
+    def handle(self, *args, **options):
+        modules = profile_imports()
+        total = sum(self_time for _, self_time, _ in modules)
+        column = 1 if options['sort'] == 'self' else 2
+        selected = [
+            module for module in modules
+            if module[0].startswith(options['prefix'])
+        ]
+        selected.sort(key=lambda module: module[column], reverse=True)
+        self.stdout.write(f'{"self, мс":>10} {"всего, мс":>10}  модуль')
+        for name, self_time, cumulative in selected[:options['limit']]:
+            self.stdout.write(
+                f'{self_time / 1000:10.1f} {cumulative / 1000:10.1f}  {name}'
+            )
+        self.stdout.write(
+            f'Импортировано модулей: {len(modules)}, '
+            f'суммарно {total / 1000:.1f} мс'
+        )
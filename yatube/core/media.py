@@ -0,0 +1,298 @@
+"""
+Медиафайлы с адресацией по содержимому.
+
+Файл сохраняется под именем из SHA-256 его содержимого
+(posts/ab/ab12...ef.jpg), поэтому одинаковые картинки лежат в
+хранилище один раз. Сколько записей ссылается на файл, считает модель
+MediaBlob: счётчики меняют сигналы моделей через add_reference и
+remove_reference. Файлы без ссылок удаляет `manage.py gc_media` после
+MEDIA_GC_GRACE секунд, чтобы не задеть загрузку, которая ещё не
+сохранила запись. Сохранение файла создаёт или обновляет его MediaBlob
+под той же блокировкой, под которой сборщик удаляет файл, поэтому
+сборщик не удалит файл, который только что загрузили повторно.
+
+Файлы со старыми именами (не по хешу) не учитываются и не удаляются.
+
+Сами байты хранит адаптер объектного хранилища из MEDIA_OBJECT_STORE.
+LocalObjectStore держит объекты в папке MEDIA_ROOT и заменяет S3-подобное
+хранилище при разработке и в тестах; другой адаптер должен реализовать
+те же методы.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .cache import release_lock, wait_lock
+from .iterators import batches
+from .models import MediaBlob
+
+GC_BATCH_SIZE = 1000
+CONTENT_NAME_RE = re.compile(r'(^|/)([0-9a-f]{2})/\2[0-9a-f]{62}(\.\w+)?$')
+LOCK_TIMEOUT = 60
+LOCK_WAIT = 10
+
+
+def is_content_name(name):
+    return bool(name) and CONTENT_NAME_RE.search(name) is not None
+
+
+@contextmanager
+def blob_lock(name, wait=LOCK_WAIT):
+    """
+    Блокировка файла между загрузкой и сборщиком. Отдаёт True, если
+    блокировку удалось взять за wait секунд.
+    """
+    key = f'media:{name}'
+    locked = wait_lock(key, LOCK_TIMEOUT, wait)
+    try:
+        yield locked
+    finally:
+        if locked:
+            release_lock(key)
+
+
+def touch_blob(name):
+    """
+    Отмечает, что файл только что сохранён: сборщик не тронет его ещё
+    MEDIA_GC_GRACE секунд, даже если ссылок пока нет.
+    """
+    updated = MediaBlob.objects.filter(name=name).update(
+        updated=timezone.now()
+    )
+    if not updated:
+        MediaBlob.objects.get_or_create(name=name, defaults={'ref_count': 0})
+
+
+class LocalObjectStore:
+    """Объекты - файлы в папке, ключи - пути относительно неё."""
+
+    def __init__(self, location=None, base_url=None):
+        self.location = location
+        self.base_url = base_url
+
+    @property
+    def root(self):
+        return self.location or settings.MEDIA_ROOT
+
+    def path(self, key):
+        """Путь объекта; ключ с выходом за папку - SuspiciousFileOperation."""
+        return safe_join(self.root, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def put(self, key, content):
+        """Записывает объект целиком: читатель не увидит его половину."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def open(self, key, mode='rb'):
+        return open(self.path(key), mode)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def size(self, key):
+        return os.path.getsize(self.path(key))
+
+    def modified_time(self, key):
+        return datetime.fromtimestamp(
+            os.path.getmtime(self.path(key)), timezone.utc
+        )
+
+    def url(self, key):
+        base_url = self.base_url or settings.MEDIA_URL
+        return urljoin(base_url, filepath_to_uri(key))
+
+    def keys(self, prefix):
+        """Ключи всех объектов, начинающихся с prefix."""
+        top = self.path(prefix)
+        for dirpath, _, filenames in os.walk(top):
+            relative = os.path.relpath(dirpath, self.root)
+            relative = relative.replace(os.sep, '/')
+            for filename in filenames:
+                yield posixpath.join(relative, filename)
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    def __init__(self, store=None):
+        self.store_path = store
+
+    @cached_property
+    def store(self):
+        return import_string(self.store_path or settings.MEDIA_OBJECT_STORE)()
+
+    def content_name(self, name, content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        digest = sha256.hexdigest()
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        with blob_lock(name):
+            touch_blob(name)
+            if not self.store.exists(name):
+                content.seek(0)
+                self.store.put(name, content)
+        return name
+
+    def _open(self, name, mode='rb'):
+        return File(self.store.open(name, mode), name)
+
+    def delete(self, name):
+        self.store.delete(name)
+
+    def exists(self, name):
+        return self.store.exists(name)
+
+    def size(self, name):
+        return self.store.size(name)
+
+    def url(self, name):
+        return self.store.url(name)
+
+    def path(self, name):
+        if not hasattr(self.store, 'path'):
+            raise NotImplementedError(
+                'Хранилище не даёт доступа к файлам по пути.'
+            )
+        return self.store.path(name)
+
+    def get_modified_time(self, name):
+        return self.store.modified_time(name)
+
+
+def add_reference(name, count=1):
+    if not is_content_name(name):
+        return
+    updated = MediaBlob.objects.filter(name=name).update(
+        ref_count=F('ref_count') + count, updated=timezone.now()
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(name=name, ref_count=count)
+        except IntegrityError:
+            add_reference(name, count)
+
+
+def add_references(names):
+    """Добавляет ссылки на файлы names (имя может повторяться)."""
+    for name, count in Counter(names).items():
+        add_reference(name, count)
+
+
+def set_references(counts):
+    """Перезаписывает счётчики ссылок: counts - {имя файла: ссылок}."""
+    counts = {
+        name: count for name, count in counts.items()
+        if is_content_name(name)
+    }
+    MediaBlob.objects.exclude(name__in=list(counts)).update(
+        ref_count=0, updated=timezone.now()
+    )
+    for name, count in counts.items():
+        MediaBlob.objects.update_or_create(
+            name=name, defaults={'ref_count': count}
+        )
+
+
+def remove_reference(name):
+    """
+    Снимает ссылку с файла. Файлы без записи MediaBlob (старые имена,
+    ссылки до подсчёта) не трогает: сборщик не удалит их по ошибке.
+    """
+    if not is_content_name(name):
+        return
+    MediaBlob.objects.filter(name=name).update(
+        ref_count=F('ref_count') - 1, updated=timezone.now()
+    )
+
+
+def collect_garbage(storage, grace=None, prefixes=()):
+    """
+    Удаляет файлы без ссылок, которые не менялись дольше grace секунд.
+    Для каждого префикса из prefixes удаляет и файлы хранилища с именем
+    по содержимому, о которых нет записи MediaBlob (загрузки, после
+    которых запись не сохранилась). Файлы со старыми именами не трогает.
+    Возвращает количество удалённых файлов.
+    """
+    if grace is None:
+        grace = settings.MEDIA_GC_GRACE
+    threshold = timezone.now() - timedelta(seconds=grace)
+    deleted = 0
+    unreferenced = MediaBlob.objects.filter(
+        ref_count__lte=0, updated__lt=threshold
+    ).values_list('pk', 'name')
+    for pk, name in unreferenced.iterator():
+        with blob_lock(name, wait=0) as locked:
+            if not locked:
+                continue
+            # Строка удаляется, только если файл не загрузили и на него
+            # не сослались заново
+            rows, _ = MediaBlob.objects.filter(
+                pk=pk, ref_count__lte=0, updated__lt=threshold
+            ).delete()
+            if rows:
+                storage.delete(name)
+                deleted += 1
+    for prefix in prefixes:
+        old_names = (
+            name for name in storage.store.keys(prefix)
+            if is_content_name(name)
+            and storage.get_modified_time(name) < threshold
+        )
+        for names in batches(old_names, GC_BATCH_SIZE):
+            known = set(MediaBlob.objects.filter(
+                name__in=names
+            ).values_list('name', flat=True))
+            for name in set(names) - known:
+                with blob_lock(name, wait=0) as locked:
+                    if locked and not MediaBlob.objects.filter(
+                        name=name
+                    ).exists():
+                        storage.delete(name)
+                        deleted += 1
+    return deleted
+
+
+content_storage = ContentAddressedStorage()
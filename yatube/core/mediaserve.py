@@ -0,0 +1,231 @@
+"""
+Отдача медиафайлов (картинок постов и миниатюр) из хранилищ.
+
+Картинки постов читаются через хранилище поля Post.image, то есть
+через адаптер MEDIA_OBJECT_STORE, миниатюры - через default_storage,
+куда их пишет sorl-thumbnail. Размер, время изменения и содержимое
+файла берутся у хранилища, путь на диске нужен только X-Sendfile.
+
+Перед отдачей вызывается проверка доступа MEDIA_ACCESS_CHECK - функция
+(request, name), которая возвращает False для закрытых файлов, на них
+отвечаем 404. Дальше ответ строится одним из трёх способов:
+
+- MEDIA_ACCEL_REDIRECT задан - пустой ответ с X-Accel-Redirect на
+  internal-локацию nginx, файл и диапазоны отдаёт nginx;
+- MEDIA_X_SENDFILE включён - то же через заголовок X-Sendfile
+  (Apache mod_xsendfile, lighttpd);
+- иначе - FileResponse. WSGI-сервер с wsgi.file_wrapper (gunicorn)
+  отправляет его через sendfile без копирования в Python, в том числе
+  кусок файла для запроса с Range.
+
+ETag файла с именем по содержимому - сам хеш, такие файлы кешируются
+клиентом навсегда; для остальных ETag строится из размера и времени
+изменения, как у статики.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.module_loading import import_string
+
+from .media import CONTENT_NAME_RE, content_storage
+from .static import CHUNK_SIZE, IMMUTABLE_CACHE_CONTROL
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class MediaFileResponse(FileResponse):
+    block_size = CHUNK_SIZE
+
+
+class MediaFile:
+    """Файл хранилища: размер, время изменения и ETag, как у статики."""
+
+    def __init__(self, storage, name, path=None):
+        self.storage = storage
+        self.name = name
+        self.path = path
+        self.size = storage.size(name)
+        self.mtime = int(storage.get_modified_time(name).timestamp())
+        self.etag = f'"{self.size:x}-{self.mtime:x}"'
+
+    def open(self):
+        return self.storage.open(self.name, 'rb')
+
+
+class FileRange:
+    """
+    Кусок открытого файла длиной length с позиции start. fileno()
+    и позиция исходного файла сохраняются, поэтому wsgi.file_wrapper
+    может отправить кусок через sendfile.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def find_media(name):
+    """
+    MediaFile по имени или None. Имя по хешу содержимого ищется только
+    в хранилище картинок, остальные - сначала среди миниатюр, потом
+    среди картинок со старыми именами.
+    """
+    if CONTENT_NAME_RE.search(name):
+        storages = (content_storage,)
+    else:
+        storages = (default_storage, content_storage)
+    for storage in storages:
+        if not storage.exists(name):
+            continue
+        try:
+            path = storage.path(name)
+        except NotImplementedError:
+            # Объектное хранилище: каталогов нет, путь на диске тоже
+            return MediaFile(storage, name)
+        if os.path.isfile(path):
+            return MediaFile(storage, name, path)
+    return None
+
+
+def check_access(request, name):
+    check = settings.MEDIA_ACCESS_CHECK
+    if check is None:
+        return True
+    return import_string(check)(request, name)
+
+
+def parse_range(header, size):
+    """
+    Диапазон (start, end) включительно из заголовка Range или None,
+    если заголовок не разобран или диапазонов несколько - тогда файл
+    отдаётся целиком. Для диапазона за концом файла - ValueError.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def range_allowed(request, etag, mtime):
+    """Условие If-Range: кусок отдаётся, только если файл не изменился."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == mtime
+
+
+def serve_media(request, name):
+    try:
+        media_file = find_media(name)
+    except SuspiciousFileOperation:
+        media_file = None
+    if media_file is None:
+        raise Http404(name)
+    if not check_access(request, name):
+        # Не раскрываем, что закрытый файл существует
+        raise Http404(name)
+    content_address = CONTENT_NAME_RE.search(name)
+    if content_address:
+        digest = posixpath.splitext(posixpath.basename(name))[0]
+        media_file.etag = f'"{digest}"'
+    response = get_conditional_response(
+        request, etag=media_file.etag, last_modified=media_file.mtime
+    )
+    if response is None:
+        response = build_response(request, name, media_file)
+    response['ETag'] = media_file.etag
+    response['Last-Modified'] = http_date(media_file.mtime)
+    if content_address:
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        patch_cache_control(
+            response, public=True, max_age=settings.MEDIA_MAX_AGE
+        )
+    if settings.MEDIA_ACCESS_CHECK is not None:
+        # Закрытые файлы не должны оседать в общих кешах
+        patch_cache_control(response, private=True)
+    return response
+
+
+def build_response(request, name, media_file):
+    content_type, encoding = mimetypes.guess_type(name)
+    if encoding or not content_type:
+        content_type = 'application/octet-stream'
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT + quote(name)
+        )
+        return response
+    if settings.MEDIA_X_SENDFILE and media_file.path:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = media_file.path
+        return response
+    status, start, length = 200, 0, media_file.size
+    file_range = None
+    if 'HTTP_RANGE' in request.META and range_allowed(
+        request, media_file.etag, media_file.mtime
+    ):
+        try:
+            file_range = parse_range(
+                request.META['HTTP_RANGE'], media_file.size
+            )
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{media_file.size}'
+            return response
+    if file_range is not None:
+        status, start = 206, file_range[0]
+        length = file_range[1] - start + 1
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, status=status)
+    else:
+        response = MediaFileResponse(
+            FileRange(media_file.open(), start, length),
+            content_type=content_type, status=status,
+        )
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    if file_range is not None:
+        response['Content-Range'] = (
+            f'bytes {start}-{file_range[1]}/{media_file.size}'
+        )
+    return response
@@ -0,0 +1,114 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from . import template_profiler
+from .compression import compress, compress_stream, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateProfilerMiddleware:
+    """
+    Профилирование рендера шаблонов.
+    Включается настройкой TEMPLATE_PROFILING, самые медленные узлы
+    пишутся в лог и в заголовок Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILING:
+            raise MiddlewareNotUsed
+        template_profiler.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        template_profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile = template_profiler.stop()
+        top = profile.top(settings.TEMPLATE_PROFILING_TOP)
+        timings = []
+        for index, (key, (count, total)) in enumerate(top):
+            logger.debug(
+                '%s %s: %d раз, %.2f мс', request.path, key, count,
+                total * 1000
+            )
+            description = key.replace('"', "'")
+            timings.append(
+                f'tpl{index};dur={total * 1000:.2f};desc="{description}"'
+            )
+        if timings:
+            response['Server-Timing'] = ', '.join(timings)
+        return response
+
+
+def compression_level(content_type, encoding):
+    """Уровень сжатия для типа содержимого из COMPRESSION_LEVELS."""
+    levels = settings.COMPRESSION_LEVELS
+    mime_type = content_type.split(';')[0].strip().lower()
+    for key in (mime_type, mime_type.split('/')[0] + '/*', '*'):
+        if key in levels:
+            return levels[key].get(encoding)
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов brotli или gzip по Accept-Encoding.
+    Маленькие ответы и уже сжатые форматы (картинки, архивы) не трогает,
+    потоковые ответы сжимает по частям. Ответы с диапазонами байт (206,
+    Content-Range, Accept-Ranges) не сжимаются: диапазон относится к
+    исходному телу, а не к сжатому.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if (response.status_code == 206
+                or response.has_header('Content-Range')
+                or response.has_header('Accept-Ranges')):
+            return response
+        content_type = response.get('Content-Type', '')
+        if content_type.startswith(tuple(settings.COMPRESSION_SKIP_TYPES)):
+            return response
+        if response.streaming and not settings.COMPRESSION_STREAMING:
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+        level = compression_level(content_type, encoding)
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level
+            )
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Задача')),
+                ('payload', models.TextField(verbose_name='Аргументы')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Выполняется'), ('failed', 'Ошибка')], default='queued', max_length=10, verbose_name='Статус')),
+                ('run_at', models.DateTimeField(verbose_name='Когда выполнить')),
+                ('started_at', models.DateTimeField(null=True, verbose_name='Начало выполнения')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('max_retries', models.PositiveIntegerField(default=3, verbose_name='Повторов')),
+                ('retry_delay', models.PositiveIntegerField(default=60, verbose_name='Пауза перед повтором, с')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Задача',
+                'verbose_name_plural': 'Задачи',
+                'ordering': ['run_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'run_at'], name='core_task_status_5742ae_idx'),
+        ),
+    ]
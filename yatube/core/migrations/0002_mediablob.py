@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Имя файла')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='Ссылок')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Изменён')),
+            ],
+            options={
+                'verbose_name': 'Медиафайл',
+                'verbose_name_plural': 'Медиафайлы',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='mediablob',
+            index=models.Index(fields=['ref_count', 'updated'], name='core_mediab_ref_cou_e72c5e_idx'),
+        ),
+    ]
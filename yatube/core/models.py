@@ -10,3 +10,57 @@ class PubDateModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Task(models.Model):
+    """Отложенная задача в очереди, которую выполняет runworker."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    name = models.CharField('Задача', max_length=255)
+    payload = models.TextField('Аргументы')
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED
+    )
+    run_at = models.DateTimeField('Когда выполнить')
+    started_at = models.DateTimeField('Начало выполнения', null=True)
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    max_retries = models.PositiveIntegerField('Повторов', default=3)
+    retry_delay = models.PositiveIntegerField(
+        'Пауза перед повтором, с',
+        default=60
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+    class Meta:
+        ordering = ['run_at']
+        indexes = [models.Index(fields=['status', 'run_at'])]
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+
+class MediaBlob(models.Model):
+    """Файл в хранилище с адресацией по содержимому и число ссылок на него."""
+    name = models.CharField('Имя файла', max_length=255, unique=True)
+    ref_count = models.IntegerField('Ссылок', default=0)
+    updated = models.DateTimeField('Изменён', auto_now=True)
+
+    def __str__(self):
+        return f'{self.name} ({self.ref_count})'
+
+    class Meta:
+        indexes = [models.Index(fields=['ref_count', 'updated'])]
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
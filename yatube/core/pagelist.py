@@ -0,0 +1,51 @@
+"""
+Ленивые объекты страницы пагинатора.
+
+Представления готовят объекты страницы преобразованиями: посты по id
+из закешированной ленты (posts.group_feeds), общие экземпляры связанных
+объектов (core.identity), миниатюры (core.thumbnails). add_transform
+заменяет object_list страницы одним PageList, который применяет все
+преобразования по порядку при первом обращении к объектам. Если
+страница взята из кеша фрагментов и карточки не рисуются, ни объекты,
+ни связанные с ними данные не читаются.
+"""
+from django.utils.functional import cached_property
+
+
+class PageList:
+    def __init__(self, source, transforms=()):
+        self.source = source
+        self.transforms = list(transforms)
+
+    @cached_property
+    def objects(self):
+        objects = list(self.source)
+        for transform in self.transforms:
+            objects = list(transform(objects))
+        return objects
+
+    def add(self, transform):
+        if 'objects' in self.__dict__:
+            self.objects = list(transform(self.objects))
+        else:
+            self.transforms.append(transform)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __getitem__(self, index):
+        return self.objects[index]
+
+
+def add_transform(page, transform):
+    """
+    Добавляет преобразование объектов страницы: transform(список) ->
+    список. Объекты читаются и преобразуются при первом обращении.
+    """
+    if not isinstance(page.object_list, PageList):
+        page.object_list = PageList(page.object_list)
+    page.object_list.add(transform)
+    return page
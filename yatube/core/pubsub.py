@@ -0,0 +1,172 @@
+"""
+Публикация и ожидание событий внутри процесса.
+
+Событие получает в канале возрастающий номер. Подписчик ждёт события
+с номером больше известного ему, блокируясь на общем
+threading.Condition, поэтому ожидающее соединение не делает ни одного
+запроса к базе или кешу. Последние PUBSUB_BUFFER_SIZE событий каждого
+канала хранятся в памяти, их получает переподключившийся клиент.
+
+Бэкенд выбирается настройкой PUBSUB_BACKEND:
+- LocalBackend видит только события своего процесса, подходит для
+  разработки и одного процесса с потоками;
+- CacheBackend кладёт события в общий кеш, а один фоновый поток на
+  процесс раз в PUBSUB_POLL_INTERVAL переносит новые события в
+  локальный буфер, так что события видны во всех процессах. Номер
+  события выдаётся раньше, чем записывается его сообщение, поэтому
+  опрос останавливается на первом ненаписанном сообщении и ждёт его
+  не дольше PUBSUB_MISSING_EVENT_TIMEOUT.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+class LocalBackend:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.buffers = {}
+        self.last_ids = {}
+
+    def _append(self, channel, event_id, message):
+        """Добавляет событие в буфер, вызывается под self.condition."""
+        buffer = self.buffers.get(channel)
+        if buffer is None:
+            buffer = self.buffers[channel] = deque(
+                maxlen=settings.PUBSUB_BUFFER_SIZE
+            )
+        buffer.append((event_id, message))
+        self.last_ids[channel] = event_id
+        self.condition.notify_all()
+
+    def publish(self, channel, message):
+        """Публикует событие и возвращает его номер."""
+        with self.condition:
+            event_id = self.last_ids.get(channel, 0) + 1
+            self._append(channel, event_id, message)
+        return event_id
+
+    def last_id(self, channel):
+        with self.condition:
+            return self.last_ids.get(channel, 0)
+
+    def listen(self, channel, last_id, timeout):
+        """
+        Возвращает список событий (номер, сообщение) новее last_id,
+        ожидая первого из них не дольше timeout секунд.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.last_ids.get(channel, 0) > last_id, timeout
+            )
+            return [
+                event for event in self.buffers.get(channel, ())
+                if event[0] > last_id
+            ]
+
+
+class CacheBackend(LocalBackend):
+    def __init__(self):
+        super().__init__()
+        self.cache = caches[settings.PUBSUB_CACHE_ALIAS]
+        self.channels = set()
+        self.missing = {}
+        self.poller = None
+
+    def _key(self, channel, suffix):
+        return f'pubsub:{channel}:{suffix}'
+
+    def publish(self, channel, message):
+        key = self._key(channel, 'last')
+        self.cache.add(key, 0, None)
+        event_id = self.cache.incr(key)
+        self.cache.set(
+            self._key(channel, event_id), message,
+            settings.PUBSUB_EVENT_TIMEOUT
+        )
+        return event_id
+
+    def last_id(self, channel):
+        self._subscribe(channel)
+        return self.cache.get(self._key(channel, 'last'), 0)
+
+    def listen(self, channel, last_id, timeout):
+        self._subscribe(channel)
+        return super().listen(channel, last_id, timeout)
+
+    def _subscribe(self, channel):
+        with self.condition:
+            if channel not in self.channels:
+                self.channels.add(channel)
+                self.last_ids[channel] = self.cache.get(
+                    self._key(channel, 'last'), 0
+                )
+            if self.poller is None:
+                self.poller = threading.Thread(
+                    target=self._poll, name='pubsub-poller', daemon=True
+                )
+                self.poller.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(settings.PUBSUB_POLL_INTERVAL)
+            with self.condition:
+                channels = list(self.channels)
+            for channel in channels:
+                self._fetch(channel)
+
+    def _fetch(self, channel):
+        """Переносит в буфер события, опубликованные с прошлого опроса."""
+        last_id = self.cache.get(self._key(channel, 'last'), 0)
+        with self.condition:
+            known_id = self.last_ids.get(channel, 0)
+        if last_id <= known_id:
+            return
+        first_id = max(
+            known_id + 1, last_id - settings.PUBSUB_BUFFER_SIZE + 1
+        )
+        keys = [
+            self._key(channel, event_id)
+            for event_id in range(first_id, last_id + 1)
+        ]
+        messages = self.cache.get_many(keys)
+        now = time.monotonic()
+        with self.condition:
+            for event_id, key in zip(range(first_id, last_id + 1), keys):
+                if key in messages:
+                    self._append(channel, event_id, messages[key])
+                    continue
+                missing_id, since = self.missing.get(channel, (None, now))
+                if missing_id != event_id:
+                    self.missing[channel] = (event_id, now)
+                    break
+                if now - since < settings.PUBSUB_MISSING_EVENT_TIMEOUT:
+                    break
+                # Сообщение так и не появилось - событие пропускается
+                self.last_ids[channel] = event_id
+            self.condition.notify_all()
+
+
+def get_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = import_string(settings.PUBSUB_BACKEND)()
+        return _hub
+
+
+@receiver(setting_changed)
+def reset_hub(setting, **kwargs):
+    global _hub
+    if setting.startswith('PUBSUB_'):
+        with _hub_lock:
+            _hub = None
@@ -0,0 +1,159 @@
+"""
+Ограничение частоты запросов.
+
+Лимит - скользящее окно в общем кеше, общее для всех воркеров. На
+каждое окно длиной в период заводится счётчик, запрос увеличивает его
+одним атомарным incr, без блокировок. Запросы за последний период
+оцениваются как текущий счётчик плюс доля предыдущего, пропорциональная
+непрошедшей части окна. Поэтому на стыке окон нельзя сделать вдвое
+больше запросов, а лимит освобождается постепенно, как в корзине
+токенов. Отклонённый запрос возвращает свой incr обратно. Запросы с
+методами вне `methods` (например, GET формы) лимитом не считаются и кеш
+не трогают.
+
+Для вошедшего пользователя проверяются две корзины: его собственная и
+корзина его IP, в RATELIMIT_IP_MULTIPLIER раз шире - за одним NAT
+бывает много пользователей, но один клиент не обойдёт лимит, создав
+новые аккаунты.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)"""
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period]
+
+
+def client_ip(request):
+    """
+    IP клиента. За прокси берётся адрес, который дописал в заголовок
+    RATELIMIT_IP_HEADER ближайший из RATELIMIT_PROXY_COUNT доверенных
+    прокси: левые части заголовка присылает сам клиент.
+    """
+    header = settings.RATELIMIT_IP_HEADER
+    count = settings.RATELIMIT_PROXY_COUNT
+    if header and count and request.META.get(header):
+        addresses = [
+            address.strip() for address in request.META[header].split(',')
+        ]
+        if len(addresses) >= count:
+            return addresses[-count]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def user_and_ip(request):
+    """Корзины запроса: [(идентификатор, во сколько раз шире лимит)]."""
+    address = f'ip:{client_ip(request)}'
+    if request.user.is_authenticated:
+        return [
+            (f'user:{request.user.pk}', 1),
+            (address, settings.RATELIMIT_IP_MULTIPLIER),
+        ]
+    return [(address, 1)]
+
+
+def ip(request):
+    return [(f'ip:{client_ip(request)}', 1)]
+
+
+def _counter_key(scope, ident, window):
+    return f'ratelimit:{scope}:{ident}:{window}'
+
+
+def _window(now, period):
+    """Номер окна и сколько секунд от него прошло."""
+    window, offset = divmod(now, period)
+    return int(window), offset
+
+
+def _retry_after(previous, current, limit, period, offset):
+    """Через сколько секунд оценка окна пропустит следующий запрос."""
+    left = period - offset
+    if current >= limit:
+        # Текущее окно заполнено: ждём следующего, в котором
+        # заполненное окно станет предыдущим и будет учитываться частью
+        wait = left + period - period * (limit - 1) / current
+    else:
+        wait = left - period * (limit - 1 - current) / previous
+    return max(math.ceil(wait), 1)
+
+
+def hit(scope, ident, limit, period, now):
+    """
+    Считает запрос. Возвращает (разрешён ли запрос, через сколько
+    секунд можно повторить).
+    """
+    window, offset = _window(now, period)
+    key = _counter_key(scope, ident, window)
+    try:
+        current = cache.incr(key)
+    except ValueError:
+        # Окно ещё не начато; add атомарен, поэтому из одновременных
+        # запросов счётчик создаст только один
+        cache.add(key, 0, period * 2)
+        current = cache.incr(key)
+    previous = cache.get(_counter_key(scope, ident, window - 1), 0)
+    if previous * (1 - offset / period) + current <= limit:
+        return True, 0
+    cancel_hit(scope, ident, period, now)
+    return False, _retry_after(
+        previous, current - 1, limit, period, offset
+    )
+
+
+def cancel_hit(scope, ident, period, now):
+    """Возвращает запрос, который всё-таки не был выполнен."""
+    window, _ = _window(now, period)
+    try:
+        cache.decr(_counter_key(scope, ident, window))
+    except ValueError:
+        pass
+
+
+def too_many_requests(request, retry_after):
+    response = render(
+        request, 'core/429.html', {'retry_after': retry_after}, status=429
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(rate, key=user_and_ip, methods=('POST',), scope=None):
+    """
+    Декоратор view: не больше rate запросов ('10/m', '5/h') с одного
+    пользователя и с одного IP. key(request) возвращает корзины запроса
+    (см. user_and_ip). Сверх лимита отдаёт 429 с Retry-After.
+    """
+    limit, period = parse_rate(rate)
+
+    def decorator(view):
+        view_scope = scope or f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLE and request.method in methods:
+                now = time.time()
+                counted = []
+                for ident, scale in key(request):
+                    allowed, retry_after = hit(
+                        view_scope, ident, limit * scale, period, now
+                    )
+                    if not allowed:
+                        for counted_ident in counted:
+                            cancel_hit(
+                                view_scope, counted_ident, period, now
+                            )
+                        return too_many_requests(request, retry_after)
+                    counted.append(ident)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
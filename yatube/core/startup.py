@@ -0,0 +1,63 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+
+SETUP_SCRIPT = (
+    'import time\n'
+    'started = time.perf_counter()\n'
+    'import django\n'
+    'django.setup()\n'
+    'import {urlconf}\n'
+    'print(time.perf_counter() - started)\n'
+)
+
+
+def _run_setup():
+    """Запускает django.setup() в отдельном интерпретаторе."""
+    script = SETUP_SCRIPT.format(urlconf=settings.ROOT_URLCONF)
+    return subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=settings.BASE_DIR,
+        env=dict(os.environ),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(output):
+    """
+    Разбирает вывод `python -X importtime` или core.importprofiler.
+    Возвращает список (модуль, собственное время, общее время) в мкс.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            continue
+        modules.append((name.strip(), int(self_time), int(cumulative)))
+    return modules
+
+
+def profile_imports():
+    """Стоимость импорта каждого модуля при старте воркера."""
+    result = subprocess.run(
+        [sys.executable, '-m', 'core.importprofiler'],
+        cwd=settings.BASE_DIR,
+        env=dict(os.environ),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stdout)
+
+
+def measure_cold_start(repeat=5):
+    """Время холодного старта воркера в секундах: min и медиана."""
+    timings = [float(_run_setup().stdout) for _ in range(repeat)]
+    return min(timings), statistics.median(timings)
@@ -0,0 +1,133 @@
+import json
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+
+from django.conf import settings
+
+from .compression import available_encodings, negotiate_encoding
+from .storage import COMPRESSED_SUFFIXES
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CHUNK_SIZE = 64 * 1024
+
+
+class StaticFile:
+    def __init__(self, path):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.etag = f'"{self.size:x}-{self.mtime:x}"'
+        self.variants = {}
+
+
+class StaticFilesApplication:
+    """
+    WSGI-обёртка, которая отдаёт собранную статику из STATIC_ROOT,
+    не доходя до Django. Файлы индексируются один раз при старте,
+    сжатые копии .br/.gz выбираются по Accept-Encoding, файлы
+    с хешем в имени кешируются клиентом навсегда.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.immutable = self._hashed_names()
+        self.files = self._scan()
+
+    def _hashed_names(self):
+        manifest = os.path.join(self.root, 'staticfiles.json')
+        if not os.path.exists(manifest):
+            return set()
+        with open(manifest, encoding='utf-8') as f:
+            return set(json.load(f).get('paths', {}).values())
+
+    def _scan(self):
+        files = {}
+        for root, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                files[name] = StaticFile(path)
+        for encoding, suffix in COMPRESSED_SUFFIXES.items():
+            for name in list(files):
+                original = files.get(name[:-len(suffix)])
+                if name.endswith(suffix) and original is not None:
+                    original.variants[encoding] = files.pop(name)
+        return files
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        name = path[len(self.prefix):]
+        static_file = self.files.get(name)
+        if static_file is None:
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+            return []
+        return self.serve(environ, start_response, name, static_file)
+
+    def serve(self, environ, start_response, name, static_file):
+        content_type, _ = mimetypes.guess_type(name)
+        headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Last-Modified', formatdate(static_file.mtime, usegmt=True)),
+        ]
+        if name in self.immutable:
+            headers.append(('Cache-Control', IMMUTABLE_CACHE_CONTROL))
+        else:
+            headers.append(
+                ('Cache-Control', f'public, max-age={settings.STATIC_MAX_AGE}')
+            )
+        served = static_file
+        if static_file.variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+            encodings = [
+                encoding for encoding in available_encodings()
+                if encoding in static_file.variants
+            ]
+            encoding = negotiate_encoding(
+                environ.get('HTTP_ACCEPT_ENCODING', ''), encodings
+            )
+            if encoding:
+                served = static_file.variants[encoding]
+                headers.append(('Content-Encoding', encoding))
+        headers.append(('ETag', served.etag))
+        if self._not_modified(environ, served):
+            start_response('304 Not Modified', headers)
+            return []
+        headers.append(('Content-Length', str(served.size)))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file = open(served.path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, CHUNK_SIZE)
+        return _read_chunks(file)
+
+    def _not_modified(self, environ, served):
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            tags = (tag.strip() for tag in if_none_match.split(','))
+            return served.etag in tags
+        if_modified_since = environ.get('HTTP_IF_MODIFIED_SINCE')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return served.mtime <= since
+        return False
+
+
+def _read_chunks(file):
+    with file:
+        chunk = file.read(CHUNK_SIZE)
+        while chunk:
+            yield chunk
+            chunk = file.read(CHUNK_SIZE)
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import available_encodings, compress
+from .csspurge import collect_words, purge_css
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.html', '.json', '.xml', '.map',
+)
+COMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешами в именах файлов.
+    Перед хешированием из CSS вырезаются неиспользуемые правила,
+    после - рядом с каждым файлом кладутся сжатые копии .br и .gz.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.purge_unused_css(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            for name in set(self.hashed_files.values()):
+                self.write_compressed(name)
+
+    def purge_unused_css(self, paths):
+        names = [name for name in settings.STATIC_PURGE_CSS if name in paths]
+        if not names:
+            return
+        directories = [
+            directory
+            for template in settings.TEMPLATES
+            for directory in template.get('DIRS', [])
+        ]
+        words = collect_words(directories)
+        words |= set(settings.STATIC_PURGE_SAFELIST)
+        for name in names:
+            with self.open(name) as css_file:
+                css = css_file.read().decode('utf-8')
+            self.delete(name)
+            self._save(name, ContentFile(purge_css(css, words).encode()))
+            # Хеш считается по урезанному файлу, а не по исходнику
+            paths[name] = (self, name)
+
+    def write_compressed(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as original:
+            data = original.read()
+        for encoding in available_encodings():
+            compressed_name = name + COMPRESSED_SUFFIXES[encoding]
+            compressed = compress(data, encoding)
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            if len(compressed) < len(data) * 0.95:
+                self._save(compressed_name, ContentFile(compressed))
@@ -0,0 +1,194 @@
+"""
+Отложенные задачи без внешнего брокера.
+
+Функция, обёрнутая в @task, по-прежнему вызывается напрямую, а
+.delay() и .schedule() кладут вызов в таблицу core.Task. Запись
+создаётся в текущей транзакции, поэтому задача видна воркеру только
+после того, как запрос успешно завершился. Выполняет очередь
+`manage.py runworker`. При TASKS_ALWAYS_EAGER задача выполняется сразу,
+в текущем потоке: так удобно при разработке и в тестах.
+
+Аргументы задачи сериализуются в JSON, поэтому передавать стоит
+первичные ключи, а не объекты моделей.
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+LOST_ERROR = 'Воркер не завершил задачу за TASKS_VISIBILITY_TIMEOUT'
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_retries, retry_delay):
+        self.func = func
+        self.name = name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.__doc__ = func.__doc__
+        self.__wrapped__ = func
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<task {self.name}>'
+
+    def delay(self, *args, **kwargs):
+        """Ставит задачу в очередь на ближайшее выполнение."""
+        return self.schedule(None, *args, **kwargs)
+
+    def schedule(self, when, *args, **kwargs):
+        """
+        Ставит задачу в очередь на момент when: datetime или
+        количество секунд от текущего момента.
+        """
+        # Модуль нужен воркеру, чтобы найти задачу с именем из name=
+        payload = json.dumps({
+            'args': args, 'kwargs': kwargs, 'module': self.func.__module__
+        })
+        if settings.TASKS_ALWAYS_EAGER:
+            data = json.loads(payload)
+            self.func(*data['args'], **data['kwargs'])
+            return None
+        now = timezone.now()
+        if when is None:
+            run_at = now
+        elif isinstance(when, (int, float)):
+            run_at = now + timedelta(seconds=when)
+        else:
+            run_at = when
+        return Task.objects.create(
+            name=self.name,
+            payload=payload,
+            run_at=run_at,
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay,
+        )
+
+
+def task(func=None, *, name=None, max_retries=3, retry_delay=60):
+    """
+    Регистрирует функцию как отложенную задачу. Упавшая задача
+    повторяется до max_retries раз, пауза перед повтором растёт
+    вдвое с каждой попыткой, начиная с retry_delay секунд.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        TASKS[task_name] = TaskFunction(
+            func, task_name, max_retries, retry_delay
+        )
+        return TASKS[task_name]
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def get_task(name, module=None):
+    """Ищет задачу по имени, при необходимости импортируя её модуль."""
+    if name not in TASKS:
+        module = module or name.rpartition('.')[0]
+        if module:
+            import_module(module)
+    if name not in TASKS:
+        raise LookupError(f'Задача {name} не зарегистрирована')
+    return TASKS[name]
+
+
+def claim_tasks(limit):
+    """
+    Забирает до limit готовых к выполнению задач. Задача считается
+    забранной, только если условный UPDATE изменил именно её строку,
+    так что несколько воркеров не получат одну и ту же задачу.
+    Задачи, которые выполняются дольше TASKS_VISIBILITY_TIMEOUT,
+    считаются потерянными вместе с воркером: это тоже попытка, и задача
+    выдаётся заново, пока попытки не кончатся. Так задача, которая
+    роняет или вешает воркер, не повторяется бесконечно.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_VISIBILITY_TIMEOUT)
+    candidates = Task.objects.filter(
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, started_at__lt=stale)
+    ).values_list(
+        'pk', 'name', 'status', 'started_at', 'attempts', 'max_retries'
+    )[:limit]
+    claimed = []
+    for pk, name, status, started_at, attempts, max_retries in candidates:
+        same_task = Task.objects.filter(
+            pk=pk, status=status, started_at=started_at
+        )
+        if status == Task.QUEUED:
+            updated = same_task.update(status=Task.RUNNING, started_at=now)
+        elif attempts + 1 > max_retries:
+            if same_task.update(
+                status=Task.FAILED, started_at=None, attempts=attempts + 1,
+                last_error=LOST_ERROR
+            ):
+                logger.error(
+                    'Задача %s не выполнена после %s попыток: %s',
+                    name, attempts + 1, LOST_ERROR
+                )
+            continue
+        else:
+            updated = same_task.update(
+                status=Task.RUNNING, started_at=now, attempts=attempts + 1,
+                last_error=LOST_ERROR
+            )
+        if updated:
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def run_task(name, payload):
+    """Выполняет задачу в текущем процессе."""
+    close_old_connections()
+    try:
+        data = json.loads(payload)
+        get_task(name, data.get('module')).func(
+            *data['args'], **data['kwargs']
+        )
+    finally:
+        close_old_connections()
+
+
+def finish_task(task_obj, error=None):
+    """
+    Записывает итог выполнения: успешная задача удаляется из очереди,
+    упавшая откладывается для повтора или помечается как ошибочная.
+    """
+    if error is None:
+        task_obj.delete()
+        return
+    task_obj.attempts += 1
+    task_obj.last_error = error
+    if task_obj.attempts > task_obj.max_retries:
+        task_obj.status = Task.FAILED
+        logger.error(
+            'Задача %s не выполнена после %s попыток:\n%s',
+            task_obj.name, task_obj.attempts, error
+        )
+    else:
+        task_obj.status = Task.QUEUED
+        task_obj.run_at = timezone.now() + timedelta(
+            seconds=task_obj.retry_delay * 2 ** (task_obj.attempts - 1)
+        )
+    task_obj.started_at = None
+    task_obj.save()
+
+
+def format_error(exc):
+    return ''.join(
+        traceback.format_exception(type(exc), exc, exc.__traceback__)
+    )
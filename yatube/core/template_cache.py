@@ -0,0 +1,35 @@
+import os
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def _template_names(loader):
+    """Имена всех шаблонов, которые видит загрузчик."""
+    for directory in loader.get_dirs():
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def warm_templates():
+    """
+    Заранее компилирует шаблоны в кеширующих загрузчиках,
+    чтобы первые запросы воркера не читали их с диска.
+    Возвращает количество прогретых шаблонов.
+    """
+    warmed = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        for loader in engine.template_loaders:
+            if not isinstance(loader, CachedLoader):
+                continue
+            for inner_loader in loader.loaders:
+                for name in _template_names(inner_loader):
+                    loader.get_template(name)
+                    warmed += 1
+    return warmed
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from django.template.base import Node, TextNode
+
+_state = threading.local()
+_original_render_annotated = Node.render_annotated
+
+
+class TemplateProfile:
+    """
+    Время рендера узлов шаблонов за один запрос.
+    Ключ - шаблон и содержимое тега, например
+    "posts/includes/post_list.html: {% thumbnail ... %}".
+    Время узла включает время вложенных в него узлов.
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    def add(self, key, duration):
+        count, total = self.stats.get(key, (0, 0.0))
+        self.stats[key] = (count + 1, total + duration)
+
+    def top(self, limit):
+        items = sorted(
+            self.stats.items(), key=lambda item: item[1][1], reverse=True
+        )
+        return items[:limit]
+
+
+def _node_key(node):
+    token = getattr(node, 'token', None)
+    origin = getattr(node, 'origin', None)
+    template_name = getattr(origin, 'template_name', None) or '<string>'
+    if token is None:
+        return f'{template_name}: {node.__class__.__name__}'
+    if token.token_type.name == 'VAR':
+        return f'{template_name}: {{{{ {token.contents} }}}}'
+    return f'{template_name}: {{% {token.contents} %}}'
+
+
+def _profiled_render_annotated(self, context):
+    profile = getattr(_state, 'profile', None)
+    if profile is None or isinstance(self, TextNode):
+        return _original_render_annotated(self, context)
+    started = time.perf_counter()
+    try:
+        return _original_render_annotated(self, context)
+    finally:
+        profile.add(_node_key(self), time.perf_counter() - started)
+
+
+def install():
+    """Подменяет рендер узлов шаблонов на замеряющий время."""
+    Node.render_annotated = _profiled_render_annotated
+
+
+def start():
+    _state.profile = TemplateProfile()
+    return _state.profile
+
+
+def stop():
+    profile = getattr(_state, 'profile', None)
+    _state.profile = None
+    return profile
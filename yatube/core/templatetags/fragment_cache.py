@@ -0,0 +1,64 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from core.cache import get_or_rebuild
+
+register = template.Library()
+
+OPTIONS = ('beta', 'stale')
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on, options):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+        self.options = options
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        options = {
+            name: value.resolve(context)
+            for name, value in self.options.items()
+        }
+        key = 'fragment:' + make_template_fragment_key(
+            self.fragment_name, vary_on
+        )
+        return get_or_rebuild(
+            key, lambda: self.nodelist.render(context), int(timeout),
+            beta=options.get('beta'), stale_timeout=options.get('stale')
+        )
+
+
+@register.tag('fragmentcache')
+def do_fragment_cache(parser, token):
+    """
+    Замена тега cache с защитой от одновременного перестроения:
+    {% fragmentcache 20 index_page page_obj.number beta=1 stale=60 %}
+    ...
+    {% endfragmentcache %}
+    """
+    nodelist = parser.parse(('endfragmentcache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    options = {}
+    args = []
+    for bit in bits[1:]:
+        name, sep, value = bit.partition('=')
+        if sep and name in OPTIONS:
+            options[name] = parser.compile_filter(value)
+        else:
+            args.append(bit)
+    if len(args) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least 2 arguments."
+        )
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(args[0]),
+        args[1],
+        [parser.compile_filter(arg) for arg in args[2:]],
+        options,
+    )
@@ -0,0 +1,42 @@
+from django import template
+from django.conf import settings
+from django.utils.html import format_html
+
+from ..thumbnails import ThumbnailBatch
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image, thumbnails=None, css_class='', alt='', loading='lazy',
+           sizes=None):
+    """
+    Картинка с миниатюрами в нескольких ширинах. thumbnails - найденные
+    заранее миниатюры страницы (ThumbnailBatch), без них миниатюры
+    картинки ищутся здесь же:
+    {% srcset post.image thumbnails=post.thumbnails css_class="card-img" %}
+    """
+    if not image:
+        return ''
+    found = thumbnails.get(image) if thumbnails else None
+    if found is None:
+        found = ThumbnailBatch([image]).get(image)
+    candidates = {}
+    for thumbnail in found.values():
+        # Без размера - sorl не смог прочитать исходную картинку
+        if thumbnail.size:
+            candidates.setdefault(thumbnail.width, thumbnail)
+    if not candidates:
+        return ''
+    largest = candidates[max(candidates)]
+    return format_html(
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" width="{}" '
+        'height="{}" loading="{}" decoding="async" alt="{}">',
+        css_class, largest.url,
+        ', '.join(
+            f'{thumbnail.url} {width}w'
+            for width, thumbnail in sorted(candidates.items())
+        ),
+        sizes or settings.RESPONSIVE_IMAGE_SIZES,
+        largest.width, largest.height, loading, alt,
+    )
@@ -0,0 +1,90 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from ..cache import (
+    acquire_lock, get_or_rebuild, release_lock, wait_for, wait_lock
+)
+
+
+class GetOrRebuildTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return f'значение {self.builds}'
+
+    def test_fresh_value_is_not_rebuilt(self):
+        """Свежее значение берётся из кеша."""
+        get_or_rebuild('key', self.build, 60, beta=0)
+        self.assertEqual(get_or_rebuild('key', self.build, 60, beta=0),
+                         'значение 1')
+        self.assertEqual(self.builds, 1)
+
+    def test_early_expiration(self):
+        """При большом beta значение перестраивается до срока."""
+        get_or_rebuild('key', self.build, 60, beta=0)
+        cache.set('key', ('значение 1', 1.0, time.time() + 60))
+        with mock.patch('core.cache.random.random', return_value=0.99):
+            self.assertEqual(
+                get_or_rebuild('key', self.build, 60, beta=100),
+                'значение 2'
+            )
+
+    def test_stale_value_served_while_locked(self):
+        """Пока другой воркер перестраивает, отдаётся старое значение."""
+        get_or_rebuild('key', self.build, 60, beta=0)
+        cache.set('key', ('значение 1', 0.01, time.time() - 1))
+        acquire_lock('key', 10)
+        try:
+            self.assertEqual(get_or_rebuild('key', self.build, 60),
+                             'значение 1')
+        finally:
+            release_lock('key')
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(get_or_rebuild('key', self.build, 60), 'значение 2')
+
+
+class PollTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_wait_lock(self):
+        """Занятая блокировка не берётся, свободная - сразу."""
+        self.assertTrue(wait_lock('key', 10, 0))
+        try:
+            self.assertFalse(wait_lock('key', 10, 0.1))
+        finally:
+            release_lock('key')
+        self.assertTrue(wait_lock('key', 10, 0))
+        release_lock('key')
+
+    def test_wait_for_fresh_value(self):
+        cache.set('key', 'старое')
+        self.assertIsNone(wait_for('key', 0.1, lambda value: value == 'новое'))
+        cache.set('key', 'новое')
+        self.assertEqual(wait_for('key', 0, lambda value: True), 'новое')
+
+
+class FragmentCacheTagTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fragment_is_cached_per_vary_on(self):
+        template = Template(
+            '{% load fragment_cache %}'
+            '{% fragmentcache 20 test_fragment page beta=0 stale=5 %}'
+            '{{ text }}{% endfragmentcache %}'
+        )
+
+        def render(page, text):
+            return template.render(Context({'page': page, 'text': text}))
+
+        self.assertEqual(render(1, 'первый'), 'первый')
+        self.assertEqual(render(1, 'второй'), 'первый')
+        self.assertEqual(render(2, 'второй'), 'второй')
@@ -0,0 +1,67 @@
+import gzip
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import CompressionMiddleware
+
+LARGE_HTML = '<p>Тестовый текст поста</p>' * 100
+
+
+def middleware_response(response, accept_encoding='gzip'):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+@override_settings(COMPRESSION_LEVELS={'*': {'br': 4, 'gzip': 6}})
+class CompressionMiddlewareTests(SimpleTestCase):
+    def test_large_html_is_compressed(self):
+        """Большая страница сжимается выбранной кодировкой."""
+        response = middleware_response(HttpResponse(LARGE_HTML))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            gzip.decompress(response.content).decode(), LARGE_HTML
+        )
+
+    def test_small_and_binary_responses_are_skipped(self):
+        """Маленькие ответы и картинки отдаются как есть."""
+        responses = {
+            'small': HttpResponse('<p>мало</p>'),
+            'image': HttpResponse(b'0' * 4096, content_type='image/png'),
+            'encoded': HttpResponse(LARGE_HTML),
+        }
+        responses['encoded']['Content-Encoding'] = 'identity'
+        for name, response in responses.items():
+            with self.subTest(name=name):
+                response = middleware_response(response)
+                self.assertNotEqual(response.get('Content-Encoding'), 'gzip')
+
+    def test_without_accept_encoding_response_is_plain(self):
+        response = middleware_response(HttpResponse(LARGE_HTML), '')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content.decode(), LARGE_HTML)
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        """Поток сжимается по частям."""
+        chunks = [LARGE_HTML.encode()] * 3
+        response = middleware_response(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b''.join(chunks)
+        )
+
+    def test_range_responses_are_skipped(self):
+        """Диапазоны байт относятся к несжатому телу, его не трогаем."""
+        partial = HttpResponse(LARGE_HTML, status=206)
+        partial['Content-Range'] = 'bytes 0-9/3000'
+        ranged = StreamingHttpResponse(
+            iter([LARGE_HTML.encode()]),
+            content_type='application/octet-stream'
+        )
+        ranged['Accept-Ranges'] = 'bytes'
+        for name, response in {'206': partial, 'ranges': ranged}.items():
+            with self.subTest(name=name):
+                response = middleware_response(response)
+                self.assertFalse(response.has_header('Content-Encoding'))
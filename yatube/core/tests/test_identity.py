@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+
+from ..identity import IdentityMap
+
+
+class IdentityMapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LevKharkov')
+        cls.other = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {index}', group=cls.group,
+                author=cls.author if index % 2 else cls.other
+            )
+            for index in range(6)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hydrate_reads_only_missing_rows(self):
+        identity_map = IdentityMap()
+        known = identity_map.add(Post.objects.get(pk=self.posts[0].pk))
+        ids = [post.pk for post in reversed(self.posts)] + [10 ** 6]
+        with self.assertNumQueries(1):
+            posts = identity_map.hydrate(Post.objects.all(), ids)
+        self.assertEqual(posts, self.posts[::-1])
+        self.assertIs(posts[-1], known)
+        with self.assertNumQueries(0):
+            again = identity_map.hydrate(Post.objects.all(), ids[:2])
+        self.assertIs(again[0], posts[0])
+
+    def test_attach_shares_related_objects(self):
+        identity_map = IdentityMap()
+        # Посты и по одному in_bulk на автора и группу
+        with self.assertNumQueries(3):
+            posts = identity_map.attach(
+                Post.objects.order_by('pk'), 'author', 'group'
+            )
+        self.assertIs(posts[1].author, posts[3].author)
+        self.assertIs(posts[0].group, posts[1].group)
+        joined = identity_map.attach(
+            Post.objects.select_related('author').order_by('pk'), 'author'
+        )
+        self.assertIs(joined[0].author, posts[0].author)
+        self.assertIs(joined[2].author, posts[0].author)
+
+    def test_pages_share_authors(self):
+        self.client.force_login(self.other)
+        for url in (reverse('posts:index'),
+                    reverse('posts:group_list', args=[self.group.slug])):
+            with self.subTest(url=url):
+                page = list(self.client.get(url).context['page_obj'])
+                self.assertIs(page[0].author, page[2].author)
+                self.assertIs(page[1].author, page[3].author)
+
+    def test_post_detail_comments_share_author(self):
+        post = self.posts[1]
+        for author in (self.author, self.other, self.author):
+            Comment.objects.create(post=post, author=author, text='Ответ')
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk])
+        )
+        comments = response.context['comments']
+        self.assertIs(comments[0].author, response.context['post'].author)
+        self.assertIs(comments[2].author, comments[0].author)
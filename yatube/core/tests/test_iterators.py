@@ -0,0 +1,38 @@
+from django.test import TestCase
+
+from posts.models import Group
+from ..iterators import batches, keyset_chunks, keyset_iterator
+
+
+class KeysetIteratorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'group-{i}')
+            for i in range(5)
+        ]
+
+    def test_chunks_cover_queryset_without_offset(self):
+        with self.assertNumQueries(3):
+            chunks = list(keyset_chunks(Group.objects.all(), 2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[2][0], self.groups[4])
+
+    def test_values_and_values_list(self):
+        ids = [group.id for group in self.groups]
+        querysets = [
+            Group.objects.values('id', 'slug'),
+            Group.objects.values_list('slug', 'id'),
+            Group.objects.values_list('id', flat=True),
+        ]
+        for queryset in querysets:
+            with self.subTest(queryset=queryset.query):
+                rows = list(keyset_iterator(queryset, 2, key='id'))
+                self.assertEqual(len(rows), len(ids))
+
+    def test_batches(self):
+        self.assertEqual(
+            list(batches(iter(range(5)), 2)), [[0, 1], [2, 3], [4]]
+        )
+        self.assertEqual(list(batches([], 2)), [])
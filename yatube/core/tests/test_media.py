@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import TestCase
+
+from ..media import ContentAddressedStorage, LocalObjectStore
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.storage = ContentAddressedStorage()
+        self.storage.store = LocalObjectStore(self.root, '/media/')
+
+    def test_identical_content_is_stored_once(self):
+        """Одинаковые файлы под разными именами хранятся один раз."""
+        first = self.storage.save('posts/cat.JPG', ContentFile(b'cat'))
+        second = self.storage.save('posts/copy.jpg', ContentFile(b'cat'))
+        other = self.storage.save('posts/dog.jpg', ContentFile(b'dog'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r'^posts/([0-9a-f]{2})/\1[0-9a-f]{62}\.jpg$')
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.root, 'posts'))),
+            sorted({first.split('/')[1], other.split('/')[1]})
+        )
+
+    def test_storage_reads_through_object_store(self):
+        name = self.storage.save('posts/cat.jpg', ContentFile(b'cat'))
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), 3)
+        self.assertEqual(self.storage.url(name), f'/media/{name}')
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b'cat')
+        self.assertEqual(list(self.storage.store.keys('posts')), [name])
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
@@ -0,0 +1,170 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from ..media import content_storage
+from ..static import IMMUTABLE_CACHE_CONTROL
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 4
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+HASHED_NAME = f'posts/{DIGEST[:2]}/{DIGEST}.jpg'
+
+
+class MemoryObjectStore:
+    """Объектное хранилище без файлов на диске."""
+
+    def __init__(self, objects):
+        self.objects = objects
+
+    def exists(self, key):
+        return key in self.objects
+
+    def open(self, key, mode='rb'):
+        return io.BytesIO(self.objects[key])
+
+    def size(self, key):
+        return len(self.objects[key])
+
+    def modified_time(self, key):
+        return datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def deny_secret(request, name):
+    return not name.startswith('secret/')
+
+
+def body(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, MEDIA_ACCEL_REDIRECT=None,
+    MEDIA_X_SENDFILE=False, MEDIA_ACCESS_CHECK=None,
+)
+class MediaServeTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in (HASHED_NAME, 'cache/thumb.jpg', 'secret/file.jpg'):
+            path = os.path.join(TEMP_MEDIA_ROOT, *name.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, name, **headers):
+        return self.client.get(settings.MEDIA_URL + name, **headers)
+
+    def test_serves_whole_file(self):
+        response = self.get('cache/thumb.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body(response), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age=3600', response['Cache-Control'])
+
+    def test_content_addressed_file_is_immutable(self):
+        """ETag файла с хешем в имени - сам хеш, кешируется навсегда."""
+        response = self.get(HASHED_NAME)
+        self.assertEqual(response['ETag'], f'"{DIGEST}"')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        response = self.get(HASHED_NAME, HTTP_IF_NONE_MATCH=f'"{DIGEST}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        for header, start, end in (
+            ('bytes=2-5', 2, 5),
+            ('bytes=1000-', 1000, 1023),
+            ('bytes=-3', 1021, 1023),
+            ('bytes=1020-5000', 1020, 1023),
+        ):
+            with self.subTest(header=header):
+                response = self.get(HASHED_NAME, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(body(response), CONTENT[start:end + 1])
+                self.assertEqual(
+                    response['Content-Range'], f'bytes {start}-{end}/1024'
+                )
+                self.assertEqual(
+                    response['Content-Length'], str(end - start + 1)
+                )
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        response = self.get(HASHED_NAME, HTTP_RANGE='bytes=1024-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+        for headers in (
+            {'HTTP_RANGE': 'bytes=0-1,5-6'},
+            {'HTTP_RANGE': 'bytes=5-1'},
+            {'HTTP_RANGE': 'bytes=0-1', 'HTTP_IF_RANGE': '"outdated"'},
+        ):
+            with self.subTest(headers=headers):
+                response = self.get(HASHED_NAME, **headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(body(response), CONTENT)
+
+    def test_head_has_no_body(self):
+        response = self.client.head(settings.MEDIA_URL + HASHED_NAME)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(body(response), b'')
+
+    def test_missing_and_outside_files(self):
+        for name in ('cache/missing.jpg', '../manage.py', 'cache'):
+            with self.subTest(name=name):
+                self.assertEqual(self.get(name).status_code, 404)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='/protected/')
+    def test_accel_redirect(self):
+        """Файл отдаёт nginx, Django только проверяет доступ и заголовки."""
+        response = self.get(HASHED_NAME)
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected/' + HASHED_NAME
+        )
+        self.assertEqual(response['ETag'], f'"{DIGEST}"')
+        self.assertEqual(body(response), b'')
+
+    @override_settings(MEDIA_X_SENDFILE=True)
+    def test_x_sendfile(self):
+        response = self.get('cache/thumb.jpg')
+        self.assertEqual(
+            response['X-Sendfile'],
+            os.path.join(TEMP_MEDIA_ROOT, 'cache', 'thumb.jpg')
+        )
+        self.assertEqual(body(response), b'')
+
+    @override_settings(
+        MEDIA_ACCESS_CHECK='core.tests.test_mediaserve.deny_secret'
+    )
+    def test_access_check(self):
+        self.assertEqual(self.get('secret/file.jpg').status_code, 404)
+        response = self.get('cache/thumb.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+
+    def test_object_store_without_files(self):
+        """Картинка читается через адаптер хранилища, а не с диска."""
+        name = f'posts/ab/ab{"0" * 62}.jpg'
+        store = MemoryObjectStore({name: CONTENT})
+        with mock.patch.object(content_storage, 'store', store):
+            response = self.get(name, HTTP_RANGE='bytes=2-5')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(body(response), CONTENT[2:6])
+            self.assertEqual(self.get(HASHED_NAME).status_code, 404)
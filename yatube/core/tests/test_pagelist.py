@@ -0,0 +1,35 @@
+from django.core.paginator import Paginator
+from django.test import SimpleTestCase
+
+from ..pagelist import PageList, add_transform
+
+
+class PageListTests(SimpleTestCase):
+    def setUp(self):
+        self.calls = []
+
+    def transform(self, name):
+        def apply(objects):
+            self.calls.append(name)
+            return [f'{name}{obj}' for obj in objects]
+        return apply
+
+    def test_transforms_run_once_on_first_access(self):
+        page = Paginator([1, 2, 3], 2).get_page(1)
+        add_transform(page, self.transform('a'))
+        add_transform(page, self.transform('b'))
+        self.assertIsInstance(page.object_list, PageList)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(len(page), 2)
+        self.assertEqual(list(page), ['ba1', 'ba2'])
+        self.assertEqual(page[1], 'ba2')
+        self.assertEqual(self.calls, ['a', 'b'])
+
+    def test_transform_after_access_applies_at_once(self):
+        page = add_transform(
+            Paginator([1], 1).get_page(1), self.transform('a')
+        )
+        list(page)
+        add_transform(page, self.transform('b'))
+        self.assertEqual(list(page), ['ba1'])
+        self.assertEqual(self.calls, ['a', 'b'])
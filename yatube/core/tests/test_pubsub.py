@@ -0,0 +1,76 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from ..pubsub import CacheBackend, LocalBackend, get_hub
+
+
+class LocalBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.hub = LocalBackend()
+
+    def test_listen_returns_events_after_last_id(self):
+        first = self.hub.publish('posts', 'a')
+        self.hub.publish('posts', 'b')
+        self.assertEqual(self.hub.listen('posts', first, 0), [(2, 'b')])
+        self.assertEqual(self.hub.last_id('posts'), 2)
+
+    def test_listen_times_out_without_events(self):
+        self.assertEqual(self.hub.listen('posts', 0, 0.01), [])
+
+    def test_listener_is_woken_by_publish(self):
+        """Ожидающий подписчик просыпается при публикации события."""
+        timer = threading.Timer(0.05, self.hub.publish, ('posts', 'a'))
+        timer.start()
+        self.assertEqual(self.hub.listen('posts', 0, 5), [(1, 'a')])
+        timer.join()
+
+    @override_settings(PUBSUB_BUFFER_SIZE=2)
+    def test_buffer_keeps_latest_events(self):
+        for message in 'abc':
+            self.hub.publish('posts', message)
+        self.assertEqual(
+            self.hub.listen('posts', 0, 0), [(2, 'b'), (3, 'c')]
+        )
+
+
+@override_settings(PUBSUB_POLL_INTERVAL=0.01)
+class CacheBackendTests(SimpleTestCase):
+    def test_events_are_shared_between_hubs(self):
+        """События одного процесса видны хабу другого процесса."""
+        publisher, listener = CacheBackend(), CacheBackend()
+        last_id = listener.last_id('shared')
+        publisher.publish('shared', 'a')
+        self.assertEqual(
+            listener.listen('shared', last_id, 5), [(last_id + 1, 'a')]
+        )
+
+    def reserve_id(self, hub, channel):
+        """Номер выдан, но сообщение ещё не записано, как в publish."""
+        key = hub._key(channel, 'last')
+        hub.cache.add(key, 0, None)
+        return hub.cache.incr(key)
+
+    def test_fetch_waits_for_unwritten_message(self):
+        """Опрос между incr и set не пропускает событие."""
+        hub = CacheBackend()
+        event_id = self.reserve_id(hub, 'race')
+        hub._fetch('race')
+        self.assertEqual(hub.last_ids.get('race', 0), 0)
+        hub.cache.set(hub._key('race', event_id), 'a')
+        hub._fetch('race')
+        self.assertEqual(hub.listen('race', 0, 0), [(event_id, 'a')])
+
+    @override_settings(PUBSUB_MISSING_EVENT_TIMEOUT=0)
+    def test_fetch_skips_message_that_never_appears(self):
+        hub = CacheBackend()
+        self.reserve_id(hub, 'lost')
+        published = CacheBackend().publish('lost', 'b')
+        hub._fetch('lost')
+        self.assertEqual(hub.last_ids.get('lost', 0), 0)
+        hub._fetch('lost')
+        self.assertEqual(hub.listen('lost', 0, 0), [(published, 'b')])
+
+    @override_settings(PUBSUB_BACKEND='core.pubsub.CacheBackend')
+    def test_backend_is_configurable(self):
+        self.assertIsInstance(get_hub(), CacheBackend)
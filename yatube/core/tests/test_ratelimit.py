@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from ..ratelimit import client_ip, parse_rate, ratelimit
+
+
+@ratelimit('2/m', scope='test')
+def limited_view(request):
+    return HttpResponse('ok')
+
+
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LevKharkov')
+        cls.post = Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def request(self, method='post', ip='127.0.0.1', user=None):
+        request = getattr(self.factory, method)('/', REMOTE_ADDR=ip)
+        request.user = user or self.user
+        return request
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('5/h'), (5, 3600))
+
+    def test_limit_returns_429_with_retry_after(self):
+        """Сверх лимита отдаётся 429 с Retry-After."""
+        for _ in range(2):
+            self.assertEqual(limited_view(self.request()).status_code, 200)
+        response = limited_view(self.request())
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_get_requests_are_not_limited(self):
+        """Запросы других методов лимитом не считаются."""
+        for _ in range(5):
+            response = limited_view(self.request(method='get'))
+            self.assertEqual(response.status_code, 200)
+
+    def test_buckets_are_per_user(self):
+        another_user = User.objects.create_user(username='NotLevKharkov')
+        for _ in range(2):
+            limited_view(self.request())
+        self.assertEqual(
+            limited_view(self.request(user=another_user)).status_code, 200
+        )
+
+    def test_bucket_refills_gradually(self):
+        """Лимит освобождается постепенно, а не весь на границе окна."""
+        with mock.patch('core.ratelimit.time.time', return_value=1000.0):
+            for _ in range(2):
+                limited_view(self.request())
+            response = limited_view(self.request())
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '50')
+        with mock.patch('core.ratelimit.time.time', return_value=1021.0):
+            self.assertEqual(limited_view(self.request()).status_code, 429)
+        with mock.patch('core.ratelimit.time.time', return_value=1050.0):
+            self.assertEqual(limited_view(self.request()).status_code, 200)
+            self.assertEqual(limited_view(self.request()).status_code, 429)
+
+    def test_ip_bucket_limits_many_accounts(self):
+        """С одного IP нельзя обойти лимит, заводя новые аккаунты."""
+        users = [
+            User.objects.create_user(username=f'bot{index}')
+            for index in range(6)
+        ]
+        statuses = [
+            limited_view(self.request(user=user)).status_code
+            for user in users for _ in range(2)
+        ]
+        self.assertEqual(statuses[:10], [200] * 10)
+        self.assertEqual(statuses[10:], [429] * 2)
+        response = limited_view(self.request(user=users[0], ip='10.0.0.9'))
+        self.assertEqual(response.status_code, 429)
+        response = limited_view(self.request(user=self.user, ip='10.0.0.9'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_limited_request_uses_no_lock(self):
+        """Запрос стоит incr счётчика и чтение предыдущего окна."""
+        with mock.patch('core.ratelimit.cache') as fake_cache:
+            fake_cache.incr.return_value = 1
+            fake_cache.get.return_value = 0
+            limited_view(self.request(user=AnonymousUser()))
+        self.assertEqual(fake_cache.incr.call_count, 1)
+        self.assertEqual(fake_cache.get.call_count, 1)
+        fake_cache.add.assert_not_called()
+        fake_cache.set.assert_not_called()
+
+    @override_settings(RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_forwarded_for_cannot_be_spoofed(self):
+        """Учитывается адрес, который дописал доверенный прокси."""
+        for fake in ('1.1.1.1', '2.2.2.2'):
+            request = self.factory.post(
+                '/', HTTP_X_FORWARDED_FOR=f'{fake}, 10.0.0.1'
+            )
+            self.assertEqual(client_ip(request), '10.0.0.1')
+        with override_settings(RATELIMIT_PROXY_COUNT=2):
+            request = self.factory.post(
+                '/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='10.0.0.1'
+            )
+            self.assertEqual(client_ip(request), '10.0.0.2')
+
+    @override_settings(RATELIMIT_ENABLE=False)
+    def test_ratelimit_can_be_disabled(self):
+        for _ in range(5):
+            self.assertEqual(limited_view(self.request()).status_code, 200)
+
+    def test_comment_spam_is_throttled(self):
+        """Поток комментариев упирается в лимит."""
+        self.client.force_login(self.user)
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.id})
+        statuses = [
+            self.client.post(url, {'text': 'спам'}).status_code
+            for _ in range(21)
+        ]
+        self.assertEqual(statuses[:20], [302] * 20)
+        self.assertEqual(statuses[20], 429)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from yatube.settings.base import session_engine
+
+
+class ClearSessionsTests(TestCase):
+    def test_clearsessions_deletes_expired_in_batches(self):
+        """Удаляются только устаревшие сессии, порциями."""
+        now = timezone.now()
+        for index in range(5):
+            Session.objects.create(
+                session_key=f'expired{index}', session_data='',
+                expire_date=now - timedelta(days=1)
+            )
+        Session.objects.create(
+            session_key='active', session_data='',
+            expire_date=now + timedelta(days=1)
+        )
+        out = StringIO()
+        call_command('clearsessions', batch_size=2, stdout=out)
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['active']
+        )
+        self.assertIn('Удалено устаревших сессий: 5', out.getvalue())
+
+    def test_renewed_session_survives(self):
+        """Сессия, продлённая после выборки, не удаляется."""
+        Session.objects.create(
+            session_key='renewed', session_data='',
+            expire_date=timezone.now() - timedelta(days=1)
+        )
+        delete = QuerySet.delete
+
+        def renew_before_delete(queryset):
+            Session.objects.filter(session_key='renewed').update(
+                expire_date=timezone.now() + timedelta(days=1)
+            )
+            return delete(queryset)
+
+        with mock.patch.object(QuerySet, 'delete', renew_before_delete):
+            call_command('clearsessions', stdout=StringIO())
+        self.assertTrue(Session.objects.filter(session_key='renewed').exists())
+
+
+class SessionTierTests(SimpleTestCase):
+    def test_unknown_tier_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            session_engine('redis')
@@ -0,0 +1,91 @@
+import importlib
+import os
+import sys
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from ..checks import check_production_settings, run_startup_checks
+
+PROD_SETTINGS = 'yatube.settings.prod'
+
+
+def load_prod_settings(**environ):
+    sys.modules.pop(PROD_SETTINGS, None)
+    with mock.patch.dict(os.environ, environ):
+        return importlib.import_module(PROD_SETTINGS)
+
+
+class ProdSettingsTests(SimpleTestCase):
+    def tearDown(self):
+        sys.modules.pop(PROD_SETTINGS, None)
+
+    def test_prod_strips_debug_tooling(self):
+        """Прод без отладочных приложений, с кешем шаблонов и соединений."""
+        prod = load_prod_settings(SECRET_KEY='secret', DEBUG='0')
+        self.assertFalse(prod.DEBUG)
+        self.assertNotIn('debug_toolbar', prod.INSTALLED_APPS)
+        self.assertNotIn(
+            'debug_toolbar.middleware.DebugToolbarMiddleware',
+            prod.MIDDLEWARE
+        )
+        loaders = prod.TEMPLATES[0]['OPTIONS']['loaders']
+        self.assertEqual(
+            loaders[0][0], 'django.template.loaders.cached.Loader'
+        )
+        self.assertGreater(prod.DATABASES['default']['CONN_MAX_AGE'], 0)
+        self.assertTrue(prod.STARTUP_CHECKS)
+
+    def test_prod_hashing_workers_use_half_of_cpus(self):
+        """Пулу хеширования паролей - половина ядер, но не меньше одного."""
+        for cpus, workers in ((8, 4), (1, 1), (None, 1)):
+            with self.subTest(cpus=cpus):
+                with mock.patch('os.cpu_count', return_value=cpus):
+                    prod = load_prod_settings(SECRET_KEY='secret', DEBUG='0')
+                self.assertEqual(prod.PASSWORD_HASHING_WORKERS, workers)
+
+    def test_prod_refuses_debug(self):
+        """Прод не запускается с DEBUG."""
+        with self.assertRaises(ImproperlyConfigured):
+            load_prod_settings(SECRET_KEY='secret', DEBUG='1')
+
+    def test_prod_requires_secret_key(self):
+        """Прод не запускается без SECRET_KEY из окружения."""
+        environ = {key: value for key, value in os.environ.items()
+                   if key != 'SECRET_KEY'}
+        with mock.patch.dict(os.environ, environ, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                load_prod_settings(DEBUG='0')
+
+
+@override_settings(
+    DEBUG_ONLY_APPS=['devtools'],
+    DEBUG_ONLY_MIDDLEWARE=['devtools.middleware.DevToolsMiddleware'],
+)
+class DeployCheckTests(SimpleTestCase):
+    def error_ids(self):
+        return [error.id for error in check_production_settings(None)]
+
+    @override_settings(DEBUG=False, TEMPLATE_PROFILING=False)
+    def test_clean_settings_pass(self):
+        self.assertEqual(self.error_ids(), [])
+
+    @override_settings(DEBUG=True, TEMPLATE_PROFILING=True)
+    def test_debug_and_profiling_are_reported(self):
+        self.assertEqual(self.error_ids(), ['core.E001', 'core.E002'])
+
+    def test_debug_tools_are_reported(self):
+        with self.modify_settings(MIDDLEWARE={
+            'append': 'devtools.middleware.DevToolsMiddleware'
+        }):
+            self.assertEqual(self.error_ids(), ['core.E003'])
+
+    @override_settings(DEBUG=True, TEMPLATE_PROFILING=False)
+    def test_startup_checks_refuse_errors(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'core.E001'):
+            run_startup_checks()
+
+    @override_settings(DEBUG=False, TEMPLATE_PROFILING=False)
+    def test_startup_checks_pass_clean_settings(self):
+        run_startup_checks()
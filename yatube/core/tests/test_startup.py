@@ -0,0 +1,33 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..startup import parse_importtime
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   sorl.thumbnail.conf
+import time:       300 |        420 | sorl.thumbnail
+"""
+
+
+class StartupProfileTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        """Из вывода -X importtime берутся модули и их время."""
+        self.assertEqual(parse_importtime(IMPORTTIME_OUTPUT), [
+            ('sorl.thumbnail.conf', 120, 120),
+            ('sorl.thumbnail', 300, 420),
+        ])
+
+    def test_startup_profile_command(self):
+        """Команда показывает стоимость импорта модулей проекта."""
+        out = StringIO()
+        call_command('startup_profile', prefix='posts', stdout=out)
+        self.assertIn('posts.models', out.getvalue())
+        self.assertIn('Импортировано модулей', out.getvalue())
+
+    def test_benchmark_cold_start(self):
+        out = StringIO()
+        call_command('benchmark', 'cold_start', repeat=1, stdout=out)
+        self.assertIn('cold_start медиана, мс', out.getvalue())
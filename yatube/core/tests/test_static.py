@@ -0,0 +1,107 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from ..csspurge import purge_css
+from ..static import IMMUTABLE_CACHE_CONTROL, StaticFilesApplication
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def not_found_app(environ, start_response):
+    start_response('404 Not Found', [])
+    return [b'django']
+
+
+def call(application, path, **environ):
+    result = {}
+
+    def start_response(status, headers):
+        result['status'] = status
+        result['headers'] = dict(headers)
+
+    body = b''.join(application(
+        {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', **environ},
+        start_response
+    ))
+    return result['status'], result['headers'], body
+
+
+class PurgeCssTests(SimpleTestCase):
+    def test_purge_css_keeps_used_rules(self):
+        """Остаются только правила с классами из шаблонов."""
+        css = (
+            '/*! license */a{color:red}.used,.unused{margin:0}'
+            '.unused{padding:0}@media (min-width:1px){.unused{top:0}'
+            '.used{top:1px}}@font-face{font-family:x}'
+        )
+        self.assertEqual(
+            purge_css(css, {'used'}),
+            '/*! license */a{color:red}.used{margin:0}'
+            '@media (min-width:1px){.used{top:1px}}@font-face{font-family:x}'
+        )
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class StaticPipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with override_settings(
+            STATIC_ROOT=TEMP_STATIC_ROOT,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'
+            ),
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(TEMP_STATIC_ROOT, 'staticfiles.json')) as f:
+            cls.hashed_css = json.load(f)['paths']['css/bootstrap.min.css']
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def test_collectstatic_purges_and_compresses(self):
+        """Bootstrap урезан под шаблоны, рядом лежит сжатая копия."""
+        original = os.path.join(settings.BASE_DIR, 'static', 'css',
+                                'bootstrap.min.css')
+        hashed = os.path.join(TEMP_STATIC_ROOT, self.hashed_css)
+        self.assertLess(os.path.getsize(hashed), os.path.getsize(original))
+        with gzip.open(hashed + '.gz') as compressed, open(hashed, 'rb') as f:
+            self.assertEqual(compressed.read(), f.read())
+
+    def test_static_application_serves_compressed_immutable(self):
+        """Хешированный файл отдаётся сжатым и кешируется навсегда."""
+        application = StaticFilesApplication(not_found_app)
+        status, headers, body = call(
+            application, '/static/' + self.hashed_css,
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(headers['Content-Type'], 'text/css')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+
+        status, _, body = call(
+            application, '/static/' + self.hashed_css,
+            HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=headers['ETag']
+        )
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_static_application_passes_unknown_paths(self):
+        application = StaticFilesApplication(not_found_app)
+        for path in ('/static/missing.css', '/posts/1/'):
+            with self.subTest(path=path):
+                self.assertEqual(call(application, path)[2], b'django')
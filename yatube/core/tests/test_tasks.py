@@ -0,0 +1,142 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Task
+from ..tasks import LOST_ERROR, claim_tasks, get_task, task
+
+CALLS = []
+
+
+@task
+def remember(value, suffix=''):
+    CALLS.append(f'{value}{suffix}')
+
+
+@task(max_retries=1, retry_delay=0)
+def explode():
+    raise ValueError('Ошибка задачи')
+
+
+@task(name='short_name')
+def short_name(value):
+    CALLS.append(value)
+
+
+class BrokenExecutor:
+    """Пул, процесс которого умирает на каждой задаче."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool())
+        return future
+
+
+def run_worker(**options):
+    call_command('runworker', once=True, verbosity=0, **options)
+
+
+class TaskTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_eager_task_runs_inline(self):
+        """При TASKS_ALWAYS_EAGER задача выполняется сразу."""
+        self.assertIsNone(remember.delay(1, suffix='!'))
+        self.assertEqual(CALLS, ['1!'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_ALWAYS_EAGER=False)
+    def test_delay_enqueues_task(self):
+        remember.delay(1, suffix='!')
+        self.assertEqual(CALLS, [])
+        task_obj = Task.objects.get()
+        self.assertEqual(task_obj.name, remember.name)
+        self.assertEqual(task_obj.status, Task.QUEUED)
+
+    @override_settings(TASKS_ALWAYS_EAGER=False)
+    def test_worker_runs_and_removes_tasks(self):
+        remember.delay(1)
+        remember.delay(2)
+        run_worker(workers=0)
+        self.assertEqual(sorted(CALLS), ['1', '2'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_ALWAYS_EAGER=False)
+    def test_scheduled_task_waits_for_its_time(self):
+        remember.schedule(3600, 1)
+        run_worker(workers=0)
+        self.assertEqual(CALLS, [])
+        remember.schedule(timezone.now() - timedelta(seconds=1), 2)
+        run_worker(workers=0)
+        self.assertEqual(CALLS, ['2'])
+
+    @override_settings(TASKS_ALWAYS_EAGER=False)
+    def test_failed_task_is_retried_then_marked_failed(self):
+        """Упавшая задача повторяется, затем помечается как ошибочная."""
+        explode.delay()
+        run_worker(workers=0)
+        task_obj = Task.objects.get()
+        self.assertEqual(task_obj.status, Task.FAILED)
+        self.assertEqual(task_obj.attempts, 2)
+        self.assertIn('Ошибка задачи', task_obj.last_error)
+
+    @override_settings(TASKS_ALWAYS_EAGER=False)
+    def test_task_is_claimed_once(self):
+        remember.delay(1)
+        self.assertEqual(len(claim_tasks(10)), 1)
+        self.assertEqual(claim_tasks(10), [])
+
+    @override_settings(TASKS_ALWAYS_EAGER=False, TASKS_VISIBILITY_TIMEOUT=0)
+    def test_lost_task_is_claimed_again(self):
+        remember.delay(1)
+        claim_tasks(10)
+        self.assertEqual(len(claim_tasks(10)), 1)
+
+    @override_settings(TASKS_ALWAYS_EAGER=False, TASKS_VISIBILITY_TIMEOUT=0)
+    def test_lost_task_fails_after_retries(self):
+        """Каждая повторная выдача потерянной задачи - попытка."""
+        explode.delay()
+        self.assertEqual(len(claim_tasks(10)), 1)
+        self.assertEqual(len(claim_tasks(10)), 1)
+        self.assertEqual(claim_tasks(10), [])
+        task_obj = Task.objects.get()
+        self.assertEqual(task_obj.status, Task.FAILED)
+        self.assertEqual(task_obj.attempts, 2)
+        self.assertEqual(task_obj.last_error, LOST_ERROR)
+
+    @override_settings(TASKS_ALWAYS_EAGER=False)
+    def test_task_with_short_name(self):
+        short_name.delay(1)
+        run_worker(workers=0)
+        self.assertEqual(CALLS, [1])
+        with self.assertRaises(LookupError):
+            get_task('unknown')
+
+    @override_settings(TASKS_ALWAYS_EAGER=False)
+    def test_broken_pool_is_recreated(self):
+        """Аварийно завершённый процесс пула - попытка для его задач."""
+        explode.delay()
+        with mock.patch(
+            'core.management.commands.runworker.ProcessPoolExecutor',
+            BrokenExecutor
+        ):
+            run_worker(workers=2)
+        task_obj = Task.objects.get()
+        self.assertEqual(task_obj.status, Task.FAILED)
+        self.assertEqual(task_obj.attempts, 2)
+        self.assertIn('аварийно', task_obj.last_error)
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..template_cache import warm_templates
+
+CACHED_TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [settings.TEMPLATES_DIR],
+        'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                ]),
+            ],
+            'context_processors': (
+                settings.TEMPLATES[0]['OPTIONS']['context_processors']
+            ),
+        },
+    },
+]
+
+
+class TemplateCacheTests(TestCase):
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_templates_fills_cached_loader(self):
+        """Прогрев компилирует шаблоны проекта в кеш загрузчика."""
+        warmed = warm_templates()
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertGreater(warmed, 0)
+        self.assertIn(
+            'posts/includes/post_list.html', loader.get_template_cache
+        )
+
+    def test_warm_templates_skips_uncached_loaders(self):
+        """Без кеширующего загрузчика прогревать нечего."""
+        with self.settings(TEMPLATES=[{
+            **CACHED_TEMPLATES[0],
+            'OPTIONS': {
+                'loaders': ['django.template.loaders.filesystem.Loader'],
+            },
+        }]):
+            self.assertEqual(warm_templates(), 0)
+
+
+class TemplateProfilerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(TEMPLATE_PROFILING=True)
+    def test_profiler_reports_server_timing(self):
+        """В режиме профилирования время include попадает в заголовок."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertIn('Server-Timing', response)
+        self.assertIn('include', response['Server-Timing'])
+
+    def test_profiler_disabled_by_default(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
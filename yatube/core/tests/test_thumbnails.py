@@ -0,0 +1,95 @@
+import re
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.paginator import Paginator
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from posts.models import Post, User
+
+from ..thumbnails import preload_thumbnails
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+PAGE = Template(
+    '{% load responsive_images %}{% for post in page %}'
+    '{% srcset post.image thumbnails=post.thumbnails %}{% endfor %}'
+)
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    RESPONSIVE_IMAGE_WIDTHS=[320, 640, 960],
+    RESPONSIVE_IMAGE_BOX=(960, 339),
+)
+class SrcsetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='LevKharkov')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {index}', author=author,
+                image=SimpleUploadedFile(
+                    f'small{index}.gif', SMALL_GIF + bytes([index])
+                )
+            )
+            for index in range(3)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def render(self, template, **context):
+        return template.render(Context(context))
+
+    def test_srcset_lists_all_widths(self):
+        """Картинка 2x1 вписывается в рамки 320x113, 640x226, 960x339."""
+        html = self.render(
+            Template('{% load responsive_images %}{% srcset image %}'),
+            image=self.posts[0].image
+        )
+        self.assertRegex(html, r'srcset="\S+ 226w, \S+ 452w, \S+ 678w"')
+        self.assertIn('width="678" height="339"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn(f'sizes="{settings.RESPONSIVE_IMAGE_SIZES}"', html)
+        self.assertEqual(self.render(
+            Template('{% load responsive_images %}{% srcset image %}'),
+            image=Post(text='').image
+        ), '')
+
+    def page(self):
+        return preload_thumbnails(Paginator(
+            Post.objects.filter(pk__in=[post.pk for post in self.posts]), 10
+        ).get_page(1))
+
+    def test_page_thumbnails_are_fetched_in_one_batch(self):
+        """Посты страницы и их миниатюры - два запроса на всю страницу."""
+        expected = self.render(PAGE, page=self.page())
+        self.assertEqual(len(re.findall('<img', expected)), 3)
+        cache.clear()
+        page = self.page()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.render(PAGE, page=page), expected)
+        page = self.page()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.render(PAGE, page=page), expected)
+
+    def test_unrendered_page_reads_nothing(self):
+        """Страница из кеша фрагментов не читает ни посты, ни миниатюры."""
+        # Остаётся только COUNT пагинатора
+        with self.assertNumQueries(1):
+            self.page()
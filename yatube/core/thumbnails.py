@@ -0,0 +1,145 @@
+"""
+Адаптивные миниатюры: несколько ширин одной картинки для srcset.
+
+sorl.thumbnail ищет каждую миниатюру отдельным обращением к своему
+хранилищу ключей (KV store): для десяти карточек в трёх ширинах это
+тридцать чтений кеша, а при холодном кеше - тридцать запросов к базе.
+get_thumbnails находит миниатюры всех картинок страницы одним get_many
+из кеша и одним запросом к таблице KV store за промахами; недостающие
+миниатюры создаёт sorl как обычно.
+
+Представление передаёт страницу в preload_thumbnails: каждый её объект
+получает общий ThumbnailBatch, который находит миниатюры всей страницы
+при первом обращении. Объекты страницы ленивые (core.pagelist): если
+страница взята из кеша фрагментов и карточки не рисуются, ни посты, ни
+миниатюры не читаются.
+"""
+from django.conf import settings
+from django.utils.functional import cached_property
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import defaults as thumbnail_defaults
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.kvstores.cached_db_kvstore import KVStore as CachedKVStore
+from sorl.thumbnail.models import KVStore
+
+from core.pagelist import add_transform
+
+SRCSET_OPTIONS = {'upscale': True}
+
+
+def thumbnail_name(source, geometry, options):
+    """Имя файла миниатюры, как его вычисляет ThumbnailBackend."""
+    backend = default.backend
+    options = dict(options)
+    if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(thumbnail_defaults, attr):
+            options.setdefault(key, value)
+    return backend._get_thumbnail_filename(source, geometry, options)
+
+
+def get_thumbnails(requests):
+    """
+    Миниатюры для списка (файл, геометрия, опции):
+    {(имя файла, геометрия): ImageFile}.
+    """
+    wanted = {}
+    for file, geometry, options in requests:
+        thumbnail = ImageFile(
+            thumbnail_name(ImageFile(file), geometry, options),
+            default.storage
+        )
+        wanted[add_prefix(thumbnail.key)] = (file, geometry, options)
+    values = _get_raw_many(list(wanted))
+    thumbnails = {}
+    for key, (file, geometry, options) in wanted.items():
+        if values.get(key):
+            thumbnail = deserialize_image_file(values[key])
+        else:
+            thumbnail = default.backend.get_thumbnail(
+                file, geometry, **options
+            )
+        thumbnails[file.name, geometry] = thumbnail
+    return thumbnails
+
+
+def _get_raw_many(keys):
+    kvstore = default.kvstore
+    if not isinstance(kvstore, CachedKVStore):
+        return {key: kvstore._get_raw(key) for key in keys}
+    values = kvstore.cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        stored = dict(
+            KVStore.objects.filter(key__in=missing).values_list('key', 'value')
+        )
+        # Как и sorl, запоминаем в кеше и отсутствие записи
+        kvstore.cache.set_many(
+            {key: stored.get(key, EMPTY_VALUE) for key in missing},
+            thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+        )
+        values.update(stored)
+    return {
+        key: value for key, value in values.items() if value != EMPTY_VALUE
+    }
+
+
+def srcset_geometries():
+    box_width, box_height = settings.RESPONSIVE_IMAGE_BOX
+    return [
+        f'{width}x{round(width * box_height / box_width)}'
+        for width in settings.RESPONSIVE_IMAGE_WIDTHS
+    ]
+
+
+def get_srcset_thumbnails(files):
+    """Миниатюры всех ширин srcset для картинок files."""
+    return get_thumbnails([
+        (file, geometry, SRCSET_OPTIONS)
+        for file in files if file
+        for geometry in srcset_geometries()
+    ])
+
+
+class ThumbnailBatch:
+    """Миниатюры srcset для картинок страницы, найденные одним пакетом."""
+
+    def __init__(self, files):
+        self.files = [file for file in files if file]
+        self.names = {file.name for file in self.files}
+
+    @cached_property
+    def thumbnails(self):
+        return get_srcset_thumbnails(self.files)
+
+    def get(self, image):
+        """Миниатюры картинки {геометрия: ImageFile} или None."""
+        if image.name not in self.names:
+            return None
+        return {
+            geometry: self.thumbnails[image.name, geometry]
+            for geometry in srcset_geometries()
+        }
+
+
+def attach_thumbnails(objects, field='image', attname='thumbnails'):
+    """Вешает на объекты общий ThumbnailBatch их картинок."""
+    objects = list(objects)
+    batch = ThumbnailBatch(getattr(obj, field) for obj in objects)
+    for obj in objects:
+        setattr(obj, attname, batch)
+    return objects
+
+
+def preload_thumbnails(page, field='image', attname='thumbnails'):
+    """Готовит миниатюры картинок для всех объектов страницы разом."""
+    return add_transform(
+        page, lambda objects: attach_thumbnails(objects, field, attname)
+    )
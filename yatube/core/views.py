@@ -1,4 +1,7 @@
 from django.shortcuts import render
+from django.views.decorators.http import require_safe
+
+from .mediaserve import serve_media
 
 
 def page_not_found(request, exception):
@@ -11,3 +14,8 @@ def internal_server_error(request):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@require_safe
+def media(request, path):
+    return serve_media(request, path)
@@ -0,0 +1,16 @@
+"""
+Точки входа для процессов пула runworker.
+
+Процессы запускаются через spawn и получают этот модуль до настройки
+Django, поэтому модели и задачи импортируются только внутри функций.
+"""
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def run_task(name, payload):
+    from .tasks import run_task
+    run_task(name, payload)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Post, Group, Comment
+from .models import Post, Group, Comment, Notification
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -16,6 +16,12 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
 
 
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'post', 'pub_date', 'is_read',)
+    list_filter = ('is_read', 'is_emailed',)
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(Notification, NotificationAdmin)
@@ -0,0 +1,66 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.benchmarks import benchmark, benchmark_client
+
+from .models import Group
+
+
+def _measure(client, url, repeat):
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            client.get(url)
+        elapsed = time.perf_counter() - started
+    return elapsed / repeat, len(queries) / repeat
+
+
+@benchmark('feeds')
+def feeds(repeat):
+    """Цена запроса ленты против HTML-страницы того же содержимого."""
+    client = benchmark_client()
+    # С CSRF-кукой страницы не берутся из кеша анонимных страниц
+    client.cookies[settings.CSRF_COOKIE_NAME] = 'benchmark'
+    pages = [('posts:index', 'posts:index_rss', ())]
+    group = Group.objects.first()
+    if group is not None:
+        pages.append(('posts:group_list', 'posts:group_rss', (group.slug,)))
+    results = {}
+    for page, feed, args in pages:
+        for name in (page, feed):
+            seconds, queries = _measure(
+                client, reverse(name, args=args), repeat
+            )
+            results[f'{name}, мс'] = seconds * 1000
+            results[f'{name}, запросов к БД'] = queries
+    return results
+
+
+@benchmark('group_feed')
+def group_feed(repeat):
+    """Страница самой большой группы с кешем ленты группы и без него."""
+    group = Group.objects.annotate(
+        posts_count=Count('posts')
+    ).order_by('-posts_count').first()
+    if group is None:
+        return {}
+    client = benchmark_client()
+    client.cookies[settings.CSRF_COOKIE_NAME] = 'benchmark'
+    results = {}
+    for page in (1, 2):
+        url = f"{reverse('posts:group_list', args=[group.slug])}?page={page}"
+        for name, groups in (
+            ('без кеша', 0), ('с кешем', settings.GROUP_FEED_CACHE_GROUPS)
+        ):
+            with override_settings(GROUP_FEED_CACHE_GROUPS=groups):
+                seconds, queries = _measure(client, url, repeat)
+            results[f'страница {page} {name}, мс'] = seconds * 1000
+            results[f'страница {page} {name}, запросов к БД'] = queries
+    return results
@@ -0,0 +1,27 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import cursors
+from .notifications import unread_count
+
+
+def notifications(request):
+    """Счётчик непрочитанных уведомлений для шапки."""
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': unread_count(request.user)
+    }
+
+
+def follow_feed(request):
+    """
+    Число новых постов в ленте подписок. Читается, только если шаблон
+    его показывает.
+    """
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        'follow_unread': SimpleLazyObject(
+            lambda: cursors.unread_count(request.user, cursors.FOLLOW_FEED)
+        )
+    }
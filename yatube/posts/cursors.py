@@ -0,0 +1,106 @@
+"""
+Места пользователей в ленте подписок.
+
+На каждого пользователя и ленту хранится одна строка FeedCursor.
+seen_id и seen_date - самый новый пост, который пользователь видел на
+первой странице. position_id и position_date - последний пост страницы,
+до которой он долистал. Пост хранится парой (pub_date, id), поэтому
+место в ленте остаётся верным и после удаления поста. unread - счётчик
+новых постов: его увеличивает задача уведомлений для всей порции
+подписчиков одним UPDATE, а просмотр первой страницы обнуляет. Поэтому
+значок с числом новых постов не делает COUNT по ленте.
+
+Ссылка «продолжить» открывает ленту с ?after=<микросекунды даты>-<id>:
+посты после этой пары выбираются одним запросом по ключу (pub_date, id)
+без OFFSET и без COUNT пагинатора.
+"""
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import F, Q
+
+from .models import FeedCursor
+
+FOLLOW_FEED = 'follow'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Больший id не поместится в BIGINT базы
+MAX_ID = 2 ** 63 - 1
+
+
+def get_cursor(user, feed):
+    return FeedCursor.objects.filter(user=user, feed=feed).first()
+
+
+def unread_count(user, feed):
+    unread = FeedCursor.objects.filter(user=user, feed=feed).values_list(
+        'unread', flat=True
+    ).first()
+    return unread or 0
+
+
+def add_unread(user_ids, feed):
+    FeedCursor.objects.filter(user_id__in=user_ids, feed=feed).update(
+        unread=F('unread') + 1
+    )
+
+
+def mark_seen(cursor, user, feed, newest):
+    """Пользователь открыл первую страницу ленты с постом newest сверху."""
+    values = {'seen_id': newest.pk, 'seen_date': newest.pub_date}
+    if cursor is None:
+        FeedCursor.objects.get_or_create(user=user, feed=feed, defaults=values)
+    elif cursor.seen_id != newest.pk or cursor.unread:
+        FeedCursor.objects.filter(pk=cursor.pk).update(unread=0, **values)
+
+
+def remember_position(cursor, user, feed, post):
+    """Пользователь долистал ленту до поста post."""
+    values = {'position_id': post.pk, 'position_date': post.pub_date}
+    if cursor is None:
+        FeedCursor.objects.get_or_create(user=user, feed=feed, defaults=values)
+    elif cursor.position_id != post.pk:
+        FeedCursor.objects.filter(pk=cursor.pk).update(**values)
+
+
+def seen_from(cursor, posts):
+    """Номер первого из posts, который пользователь уже видел."""
+    if cursor is None or cursor.seen_date is None:
+        return None
+    seen = (cursor.seen_date, cursor.seen_id)
+    return next((
+        index for index, post in enumerate(posts)
+        if (post.pub_date, post.pk) <= seen
+    ), None)
+
+
+def position_token(pub_date, pk):
+    """Значение ?after= для места в ленте после поста (pub_date, pk)."""
+    return f'{(pub_date - EPOCH) // MICROSECOND}-{pk}'
+
+
+def resume_token(cursor):
+    if cursor is None or cursor.position_date is None:
+        return None
+    return position_token(cursor.position_date, cursor.position_id)
+
+
+def parse_position(token):
+    """(pub_date, id) из значения ?after= или None, если оно неверное."""
+    micros, sep, pk = token.partition('-')
+    if not (sep and micros.isdigit() and pk.isdigit()):
+        return None
+    try:
+        pub_date = EPOCH + int(micros) * MICROSECOND
+        pk = int(pk)
+    except (ValueError, OverflowError):
+        return None
+    if pk > MAX_ID:
+        return None
+    return pub_date, pk
+
+
+def posts_after(queryset, pub_date, pk):
+    """Посты ленты, идущие после поста (pub_date, pk), в порядке ленты."""
+    return queryset.filter(
+        Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+    ).order_by('-pub_date', '-pk')
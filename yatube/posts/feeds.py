@@ -0,0 +1,154 @@
+"""
+RSS и Atom ленты главной страницы, групп и авторов.
+
+Посты выбираются через values() без создания моделей и без COUNT
+пагинации, вместо текста - готовые отрывок и HTML. Готовая лента
+хранится в кеше под ключом с версиями тегов страниц (см. core.cache),
+поэтому сбрасывается теми же сигналами, что и HTML-страницы. Время
+последней очистки тегов служит Last-Modified, хеш ленты - ETag, и
+повторный запрос агрегатора получает 304.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from core.cache import tag_versions
+
+from .models import Group, Post, User
+
+FEED_FIELDS = (
+    'id', 'excerpt', 'text_html', 'pub_date',
+    'author__username', 'author__first_name', 'author__last_name',
+)
+
+
+class PostFeed(Feed):
+    def items(self, obj):
+        return (
+            self.posts(obj).order_by('-pub_date')
+            .values(*FEED_FIELDS)[:settings.FEED_ITEMS]
+        )
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def cache_tags(self, obj):
+        return ['index']
+
+    def item_title(self, item):
+        return item['excerpt'][:50]
+
+    def item_description(self, item):
+        return item['text_html']
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item['id'],))
+
+    def item_pubdate(self, item):
+        return item['pub_date']
+
+    def item_author_name(self, item):
+        full_name = f"{item['author__first_name']} {item['author__last_name']}"
+        return full_name.strip() or item['author__username']
+
+    def item_author_link(self, item):
+        return reverse('posts:profile', args=(item['author__username'],))
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        versions = tag_versions(self.cache_tags(obj))
+        key = 'feed:' + hashlib.md5(
+            f'{request.get_full_path()}:{sorted(versions.items())}'.encode()
+        ).hexdigest()
+        entry = cache.get(key)
+        if entry is None:
+            feedgen = self.get_feed(obj, request)
+            content = feedgen.writeString('utf-8').encode()
+            etag = quote_etag(hashlib.md5(content).hexdigest())
+            entry = (content, feedgen.content_type, etag)
+            cache.set(key, entry, settings.FEED_CACHE_TIMEOUT)
+        content, content_type, etag = entry
+        last_modified = max(versions.values()) // 10 ** 9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class IndexFeed(PostFeed):
+    title = 'Yatube: последние обновления'
+    description = 'Новые посты на сайте'
+
+    def link(self):
+        return reverse('posts:index')
+
+
+class GroupFeed(PostFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def posts(self, group):
+        return group.posts.all()
+
+    def cache_tags(self, group):
+        return [f'group:{group.id}']
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=(group.slug,))
+
+
+class AuthorFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def posts(self, author):
+        return author.posts.all()
+
+    def cache_tags(self, author):
+        return [f'author:{author.id}']
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Посты пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=(author.username,))
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class IndexAtomFeed(AtomFeedMixin, IndexFeed):
+    pass
+
+
+class GroupAtomFeed(AtomFeedMixin, GroupFeed):
+    pass
+
+
+class AuthorAtomFeed(AtomFeedMixin, AuthorFeed):
+    pass
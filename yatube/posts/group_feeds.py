@@ -0,0 +1,202 @@
+"""
+Закешированные ленты групп.
+
+Для группы в общем кеше хранятся (pub_date, id) её GROUP_FEED_SIZE
+самых новых постов и общее число постов. Страница группы берёт id из
+этого окна и читает сами посты одним in_bulk, без OFFSET и без COUNT
+пагинатора; только страницы глубже окна читают id из базы.
+
+Окно не перестраивается при каждом изменении: сигналы постов после
+фиксации транзакции вставляют в него новый пост, переносят пост при
+смене группы в post_edit и убирают удалённый. Окно остаётся верным
+началом ленты, только после удалений оно короче; слишком короткое окно
+сбрасывается и строится заново при следующем чтении.
+
+Кешируется не больше GROUP_FEED_CACHE_GROUPS групп: список недавно
+открытых групп хранится в том же кеше, окна вытесненных групп
+удаляются. Список обновляется без блокировки, поэтому LRU
+приблизительный; окно без записи в списке живёт до GROUP_FEED_TIMEOUT.
+"""
+from bisect import bisect
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+
+from core.cache import acquire_lock, release_lock, wait_lock
+from core.identity import IdentityMap
+from core.pagelist import add_transform
+from .models import Post
+
+GROUP_FEED_PREFIX = 'group_feed'
+LRU_KEY = f'{GROUP_FEED_PREFIX}:lru'
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 1
+
+
+def _feed_key(group_id):
+    return f'{GROUP_FEED_PREFIX}:{group_id}'
+
+
+def _sort_key(entry):
+    pub_date, pk = entry
+    return -pub_date, -pk
+
+
+def _ordered(queryset):
+    return queryset.order_by('-pub_date', '-pk')
+
+
+def build_feed(group_id):
+    """Окно самых новых постов группы из базы."""
+    size = settings.GROUP_FEED_SIZE
+    posts = Post.objects.filter(group_id=group_id)
+    entries = [
+        (pub_date.timestamp(), pk) for pub_date, pk
+        in _ordered(posts).values_list('pub_date', 'pk')[:size]
+    ]
+    count = len(entries) if len(entries) < size else posts.count()
+    return {'entries': entries, 'count': count}
+
+
+def get_feed(group_id):
+    """
+    Окно ленты группы: из кеша или из базы. None, если кеширование
+    выключено или окно сейчас строит другой воркер.
+    """
+    limit = settings.GROUP_FEED_CACHE_GROUPS
+    if not limit:
+        return None
+    key = _feed_key(group_id)
+    values = cache.get_many([key, LRU_KEY])
+    touch(group_id, values.get(LRU_KEY) or [], limit)
+    if key in values:
+        return values[key]
+    if not acquire_lock(key, LOCK_TIMEOUT):
+        return None
+    try:
+        feed = build_feed(group_id)
+        cache.set(key, feed, settings.GROUP_FEED_TIMEOUT)
+    finally:
+        release_lock(key)
+    return feed
+
+
+def touch(group_id, lru, limit):
+    """Поднимает группу в списке недавно открытых и вытесняет лишние."""
+    # Группы из первой четверти списка не двигаем: у популярных групп
+    # список не перезаписывается на каждом запросе
+    if group_id in lru[:max(limit // 4, 1)]:
+        return
+    lru = [group_id] + [pk for pk in lru if pk != group_id]
+    evicted = lru[limit:]
+    cache.set(LRU_KEY, lru[:limit], None)
+    if evicted:
+        cache.delete_many([_feed_key(pk) for pk in evicted])
+
+
+def update_feed(group_id, change):
+    """
+    Применяет change(feed) к закешированному окну группы. Если change
+    вернул None или блокировку взять не удалось, окно сбрасывается.
+    """
+    key = _feed_key(group_id)
+    if not wait_lock(key, LOCK_TIMEOUT, LOCK_WAIT):
+        cache.delete(key)
+        return
+    try:
+        feed = cache.get(key)
+        if feed is None:
+            return
+        feed = change(feed)
+        if feed is None:
+            cache.delete(key)
+        else:
+            cache.set(key, feed, settings.GROUP_FEED_TIMEOUT)
+    finally:
+        release_lock(key)
+
+
+def _insert(entry):
+    def change(feed):
+        complete = len(feed['entries']) == feed['count']
+        entries = [item for item in feed['entries'] if item[1] != entry[1]]
+        count = feed['count'] + (len(entries) == len(feed['entries']))
+        if complete or (
+            entries and _sort_key(entry) < _sort_key(entries[-1])
+        ):
+            keys = [_sort_key(item) for item in entries]
+            entries.insert(bisect(keys, _sort_key(entry)), entry)
+        return {
+            'entries': entries[:settings.GROUP_FEED_SIZE], 'count': count
+        }
+    return change
+
+
+def _remove(pk):
+    def change(feed):
+        entries = [item for item in feed['entries'] if item[1] != pk]
+        count = max(feed['count'] - 1, len(entries))
+        if (len(entries) < count
+                and len(entries) < settings.GROUP_FEED_SIZE // 2):
+            return None
+        return {'entries': entries, 'count': count}
+    return change
+
+
+def add_post(group_id, pk, pub_date):
+    if group_id is not None:
+        update_feed(group_id, _insert((pub_date.timestamp(), pk)))
+
+
+def remove_post(group_id, pk):
+    if group_id is not None:
+        update_feed(group_id, _remove(pk))
+
+
+def reset_feed(group_id):
+    cache.delete(_feed_key(group_id))
+
+
+def reset_all():
+    """Сбрасывает окна всех групп из списка недавно открытых."""
+    lru = cache.get(LRU_KEY) or []
+    cache.delete_many([_feed_key(pk) for pk in lru] + [LRU_KEY])
+
+
+class FeedIds:
+    """
+    id постов группы для Paginator: число постов и начало ленты берутся
+    из окна, срезы глубже окна читаются из базы.
+    """
+
+    def __init__(self, group, feed):
+        self.group = group
+        self.feed = feed
+
+    def count(self):
+        return self.feed['count']
+
+    def __getitem__(self, index):
+        entries = self.feed['entries']
+        if index.stop <= len(entries):
+            return [pk for _, pk in entries[index]]
+        ids = _ordered(self.group.posts.all()).values_list('pk', flat=True)
+        return list(ids[index])
+
+
+def get_page(group, number, per_page, identity_map=None):
+    """
+    Страница ленты группы; посты читаются при первом обращении одним
+    in_bulk через карту объектов запроса. Пост мог быть удалён после
+    того, как id попал в окно, такие id пропускаются.
+    """
+    feed = get_feed(group.pk)
+    if feed is None:
+        return Paginator(group.posts.cards(), per_page).get_page(number)
+    page = Paginator(FeedIds(group, feed), per_page).get_page(number)
+    identity_map = identity_map or IdentityMap()
+    queryset = group.posts.cards()
+    return add_transform(
+        page, lambda ids: identity_map.hydrate(queryset, ids)
+    )
@@ -0,0 +1,158 @@
+"""
+Живое обновление лент: новые посты приходят в открытую страницу через
+server-sent events или long polling.
+
+При создании поста в канал 'posts' публикуется событие с номером поста,
+автора и группы. Соединение ждёт события на хабе core.pubsub, не делая
+запросов, и только для подходящих ленте событий загружает посты одним
+запросом и отрисовывает их карточки.
+
+Страница могла быть отдана из кеша и не показать посты, вышедшие до
+подключения. Поэтому первая страница ленты передаёт номер своего самого
+нового поста (since), и при подключении без Last-Event-ID более новые
+посты читаются из базы и отдаются первым же обновлением.
+"""
+import json
+import time
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from core.pubsub import get_hub
+from core.thumbnails import attach_thumbnails
+
+from .models import Follow, Post
+
+CHANNEL = 'posts'
+
+
+def publish_post(post):
+    get_hub().publish(CHANNEL, {
+        'id': post.pk,
+        'author_id': post.author_id,
+        'group_id': post.group_id,
+    })
+
+
+def feed_filter(request, feed, group=None):
+    """
+    Возвращает функцию, которая решает, относится ли событие к ленте.
+    Подписки читаются один раз при открытии соединения.
+    """
+    if feed == 'follow':
+        authors = set(
+            Follow.objects.filter(user=request.user.id)
+            .values_list('author_id', flat=True)
+        )
+        return lambda message: message['author_id'] in authors
+    if feed == 'group':
+        return lambda message: message['group_id'] == group.pk
+    return lambda message: True
+
+
+def render_update(request, events, matches):
+    """Количество новых постов ленты и HTML их карточек."""
+    ids = [message['id'] for _, message in events if matches(message)]
+    if not ids:
+        return None
+    posts = attach_thumbnails(
+        Post.objects.cards().filter(pk__in=ids)
+    )
+    html = ''.join(
+        render_to_string(
+            'posts/includes/post_list.html', {'post': post}, request
+        )
+        for post in posts
+    )
+    return {'count': len(ids), 'html': html}
+
+
+def catch_up(request, matches, since):
+    """
+    Начало ленты без Last-Event-ID: номер события, с которого слушать
+    хаб, обновление с постами новее since (или None) и фильтр, который
+    не отдаёт эти посты ещё раз.
+    """
+    last_id = get_hub().last_id(CHANNEL)
+    if since is None:
+        return last_id, None, matches
+    messages = list(
+        Post.objects.filter(pk__gt=since).order_by('-pk')
+        .values('id', 'author_id', 'group_id')[:settings.LIVE_FEED_BACKLOG]
+    )
+    sent = {message['id'] for message in messages}
+    update = render_update(
+        request, [(None, message) for message in messages], matches
+    )
+    return last_id, update, (
+        lambda message: message['id'] not in sent and matches(message)
+    )
+
+
+def _read_int(value):
+    """Целое из запроса; вне 64-битного диапазона базы - None."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    if not -2 ** 63 <= value < 2 ** 63:
+        return None
+    return value
+
+
+def read_last_id(request):
+    return _read_int(
+        request.GET.get('last') or request.META.get('HTTP_LAST_EVENT_ID')
+    )
+
+
+def read_since(request):
+    return _read_int(request.GET.get('since'))
+
+
+def poll(request, matches, last_id, since=None):
+    """Ответ long polling: ждёт постов не дольше LIVE_FEED_POLL_TIMEOUT."""
+    hub = get_hub()
+    if last_id is None:
+        last_id, update, _ = catch_up(request, matches, since)
+        return {'last': last_id, 'count': 0, 'html': '', **(update or {})}
+    deadline = time.monotonic() + settings.LIVE_FEED_POLL_TIMEOUT
+    while True:
+        events = hub.listen(
+            CHANNEL, last_id, max(deadline - time.monotonic(), 0)
+        )
+        if events:
+            last_id = events[-1][0]
+            update = render_update(request, events, matches)
+            if update:
+                return {'last': last_id, **update}
+        if time.monotonic() >= deadline:
+            return {'last': last_id, 'count': 0, 'html': ''}
+
+
+def stream(request, matches, last_id, since=None):
+    """
+    Поток server-sent events. Пока событий нет, раз в
+    LIVE_FEED_HEARTBEAT секунд отправляется комментарий, чтобы прокси не
+    закрыли соединение. Через LIVE_FEED_MAX_DURATION поток завершается,
+    и браузер переподключается с заголовком Last-Event-ID.
+    """
+    hub = get_hub()
+    update = None
+    if last_id is None:
+        last_id, update, matches = catch_up(request, matches, since)
+    deadline = time.monotonic() + settings.LIVE_FEED_MAX_DURATION
+    yield f'retry: {settings.LIVE_FEED_RETRY}\n\n'
+    if update:
+        data = json.dumps(update, ensure_ascii=False)
+        yield f'id: {last_id}\nevent: posts\ndata: {data}\n\n'
+    while time.monotonic() < deadline:
+        events = hub.listen(CHANNEL, last_id, settings.LIVE_FEED_HEARTBEAT)
+        if not events:
+            yield ': ping\n\n'
+            continue
+        last_id = events[-1][0]
+        update = render_update(request, events, matches)
+        if update:
+            data = json.dumps(update, ensure_ascii=False)
+            yield f'id: {last_id}\nevent: posts\ndata: {data}\n\n'
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        'Записывает карту сайта в SITEMAP_ROOT, перезаписывая только '
+        'изменившиеся шарды'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default=settings.SITE_URL,
+            help='Адрес сайта для ссылок в карте'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перезаписать все шарды'
+        )
+
+    def handle(self, *args, **options):
+        written = build_sitemaps(
+            settings.SITEMAP_ROOT, options['base_url'].rstrip('/'),
+            force=options['force']
+        )
+        if options['verbosity'] > 0:
+            self.stdout.write(f'Перезаписано шардов: {written}')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from posts.transfer import export_records, open_stream
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, группы, посты, комментарии и подписки '
+        'в NDJSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', nargs='?', default='-',
+            help='Файл выгрузки, .gz - со сжатием, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        records = export_records(options['chunk_size'])
+        if options['output'] == '-':
+            for record in records:
+                self.stdout.write(record, ending='')
+            return
+        with open_stream(options['output'], 'w') as output:
+            output.writelines(records)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from core.media import collect_garbage, set_references
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки постов, на которые не осталось ссылок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=None,
+            help='Сколько секунд файл без ссылок должен пролежать '
+                 'до удаления, по умолчанию MEDIA_GC_GRACE'
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Пересчитать ссылки по постам перед удалением'
+        )
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            counts = Post.objects.exclude(image='').values(
+                'image'
+            ).annotate(count=Count('id')).values_list('image', 'count')
+            set_references(dict(counts))
+        field = Post._meta.get_field('image')
+        deleted = collect_garbage(
+            field.storage, options['grace'], prefixes=[field.upload_to]
+        )
+        if options['verbosity'] > 0:
+            self.stdout.write(f'Удалено файлов: {deleted}')
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.transfer import import_records, open_stream
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_yatube, добавляя данные к уже '
+        'существующим'
+    )
+
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', nargs='?', default='-',
+            help='Файл выгрузки, .gz - со сжатием, по умолчанию stdin'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей создавать одним запросом'
+        )
+
+    def execute(self, *args, **options):
+        self.stdin = options.get('stdin', sys.stdin)
+        return super().execute(*args, **options)
+
+    def handle(self, *args, **options):
+        if options['input'] == '-':
+            counts = self.load(self.stdin, options)
+        else:
+            with open_stream(options['input'], 'r') as lines:
+                counts = self.load(lines, options)
+        if options['verbosity'] > 0:
+            for name, count in counts.items():
+                self.stdout.write(f'{name}: {count}')
+
+    def load(self, lines, options):
+        try:
+            return import_records(lines, options['batch_size'])
+        except (ValueError, KeyError) as error:
+            raise CommandError(f'Выгрузка повреждена: {error}')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core.iterators import keyset_chunks
+from posts.models import RENDERED_FIELDS, Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет отрывок и HTML текста у постов, где их ещё нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать все посты, например после смены правил '
+                 'разметки'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов читать и обновлять за раз'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.only('id', 'text')
+        if not options['all']:
+            posts = posts.filter(text_html='')
+        rendered = 0
+        for chunk in keyset_chunks(posts, options['batch_size']):
+            for post in chunk:
+                post.render_text()
+            Post.objects.bulk_update(chunk, RENDERED_FIELDS)
+            rendered += len(chunk)
+        if options['verbosity'] > 0:
+            self.stdout.write(f'Обработано постов: {rendered}')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет пользователям письма с непрочитанными уведомлениями '
+        'о новых постах'
+    )
+
+    def handle(self, *args, **options):
+        sent = send_digests()
+        if options['verbosity'] > 0:
+            self.stdout.write(f'Отправлено писем: {sent}')
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:14
+
+import core.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_notification'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Изображение в шапке поста', storage=core.media.ContentAddressedStorage(), upload_to='posts/', verbose_name='Изображение'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:23
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    last = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last).order_by('pk')
+            .only('id', 'text')[:BATCH_SIZE]
+        )
+        if not posts:
+            return
+        for post in posts:
+            post.excerpt = Truncator(post.text).chars(300)
+        Post.objects.bulk_update(posts, ['excerpt'])
+        last = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300, verbose_name='Отрывок'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
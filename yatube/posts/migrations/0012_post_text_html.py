@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:24
+
+from django.db import migrations, models
+from django.utils.html import linebreaks, urlize
+
+BATCH_SIZE = 1000
+
+
+def fill_text_html(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    last = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last).order_by('pk')
+            .only('id', 'text')[:BATCH_SIZE]
+        )
+        if not posts:
+            return
+        for post in posts:
+            post.text_html = linebreaks(
+                urlize(post.text, nofollow=True, autoescape=True)
+            )
+        Post.objects.bulk_update(posts, ['text_html'])
+        last = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_text_html, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_post_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feed', models.CharField(max_length=20, verbose_name='Лента')),
+                ('seen_id', models.PositiveIntegerField(default=0, verbose_name='Последний увиденный пост')),
+                ('position_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='Где остановился')),
+                ('unread', models.PositiveIntegerField(default=0, verbose_name='Новых постов')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_cursors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Место в ленте',
+                'verbose_name_plural': 'Места в лентах',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='feedcursor',
+            constraint=models.UniqueConstraint(fields=('user', 'feed'), name='unique_feed_cursor'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.models import Count
+
+from core.media import is_content_name
+
+
+def count_references(apps, schema_editor):
+    """Ссылки постов, созданных до подсчёта, на файлы по хешу."""
+    Post = apps.get_model('posts', 'Post')
+    MediaBlob = apps.get_model('core', 'MediaBlob')
+    counts = Post.objects.exclude(image='').values('image').annotate(
+        count=Count('id')
+    ).values_list('image', 'count')
+    for name, count in counts.iterator():
+        if is_content_name(name):
+            MediaBlob.objects.update_or_create(
+                name=name, defaults={'ref_count': count}
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_mediablob'),
+        ('posts', '0013_feedcursor'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
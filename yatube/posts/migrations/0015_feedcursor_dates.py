@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:54
+
+from django.db import migrations, models
+
+
+def fill_dates(apps, schema_editor):
+    FeedCursor = apps.get_model('posts', 'FeedCursor')
+    Post = apps.get_model('posts', 'Post')
+    for cursor in FeedCursor.objects.all():
+        dates = dict(Post.objects.filter(
+            pk__in=[cursor.seen_id, cursor.position_id]
+        ).values_list('pk', 'pub_date'))
+        cursor.seen_date = dates.get(cursor.seen_id)
+        cursor.position_date = dates.get(cursor.position_id)
+        if cursor.position_date is None:
+            cursor.position_id = None
+        cursor.save(update_fields=[
+            'seen_date', 'position_id', 'position_date'
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_count_image_references'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedcursor',
+            name='position_date',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата поста, где остановился'),
+        ),
+        migrations.AddField(
+            model_name='feedcursor',
+            name='seen_date',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего увиденного поста'),
+        ),
+        migrations.RunPython(fill_dates, migrations.RunPython.noop),
+    ]
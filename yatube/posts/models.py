@@ -1,10 +1,26 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.html import linebreaks, urlize
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
 
+from core.media import content_storage
 from core.models import PubDateModel
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 300
+# Поля, которые вычисляются из текста при сохранении
+RENDERED_FIELDS = ('excerpt', 'text_html')
+# Поля карточки поста в ленте и поля связанных объектов, которые она
+# показывает (см. PostQuerySet.cards)
+CARD_FIELDS = ('id', 'excerpt', 'pub_date', 'image', 'author', 'group')
+CARD_RELATED_FIELDS = {
+    'author': ('username', 'first_name', 'last_name'),
+    'group': ('slug',),
+}
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
@@ -15,6 +31,23 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def cards(self):
+        """
+        Только поля, которые нужны карточке в ленте. Автор и группа
+        подтягиваются тем же запросом, если queryset не получен от них
+        самих (author.posts, group.posts) - тогда они уже известны.
+        """
+        known = {field.name for field in self._known_related_objects}
+        queryset = self
+        fields = list(CARD_FIELDS)
+        for name, related_fields in CARD_RELATED_FIELDS.items():
+            if name not in known:
+                queryset = queryset.select_related(name)
+                fields += [f'{name}__{field}' for field in related_fields]
+        return queryset.only(*fields)
+
+
 class Post(PubDateModel):
     text = models.TextField(
         'Текст поста',
@@ -38,13 +71,50 @@ class Post(PubDateModel):
 
     image = models.ImageField(
         upload_to='posts/',
+        storage=content_storage,
         blank=True,
         verbose_name='Изображение',
         help_text='Изображение в шапке поста'
     )
+    excerpt = models.CharField(
+        'Отрывок',
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False
+    )
+
+    text_html = models.TextField(
+        'Текст в HTML',
+        blank=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
-        return self.text[:15]
+        # excerpt заполняется при сохранении, у нового поста его ещё нет
+        return (self.excerpt or self.text)[:15]
+
+    def render_text(self):
+        """Заполняет отрывок и HTML текста: абзацы и ссылки."""
+        self.excerpt = Truncator(self.text).chars(EXCERPT_LENGTH)
+        self.text_html = linebreaks(
+            urlize(self.text, nofollow=True, autoescape=True)
+        )
+
+    @cached_property
+    def html(self):
+        """HTML текста; для постов до появления text_html - на лету."""
+        if not self.text_html:
+            self.render_text()
+        return mark_safe(self.text_html)
+
+    def save(self, *args, **kwargs):
+        self.render_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *RENDERED_FIELDS}
+        super().save(*args, **kwargs)
 
     class Meta:
         ordering = ['-pub_date']
@@ -88,3 +158,63 @@ class Follow(models.Model):
                 name='unique_follow'
             )
         ]
+
+
+class Notification(PubDateModel):
+    """Уведомление подписчика о новом посте автора."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    is_read = models.BooleanField('Прочитано', default=False)
+    is_emailed = models.BooleanField('Отправлено в дайджесте', default=False)
+
+    class Meta:
+        ordering = ['-pub_date']
+        indexes = [models.Index(fields=['user', 'is_read'])]
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+
+class FeedCursor(models.Model):
+    """
+    Место пользователя в ленте: последний увиденный сверху пост, пост,
+    на котором он остановился, листая вглубь, и счётчик новых постов.
+    Посты хранятся парой (дата, id): лента упорядочена по ней, и место
+    не теряется, если сам пост удалят.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_cursors'
+    )
+    feed = models.CharField('Лента', max_length=20)
+    seen_id = models.PositiveIntegerField(
+        'Последний увиденный пост', default=0
+    )
+    seen_date = models.DateTimeField(
+        'Дата последнего увиденного поста', null=True, blank=True
+    )
+    position_id = models.PositiveIntegerField(
+        'Где остановился', null=True, blank=True
+    )
+    position_date = models.DateTimeField(
+        'Дата поста, где остановился', null=True, blank=True
+    )
+    unread = models.PositiveIntegerField('Новых постов', default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'feed'],
+                name='unique_feed_cursor'
+            )
+        ]
+        verbose_name = 'Место в ленте'
+        verbose_name_plural = 'Места в лентах'
@@ -0,0 +1,113 @@
+"""
+Уведомления о новых постах авторов, на которых подписан пользователь.
+
+Уведомления создаются отложенной задачей порциями по
+NOTIFICATIONS_BATCH_SIZE подписчиков, так что публикация поста автором
+с большим числом подписчиков не растягивает запрос. Счётчик
+непрочитанных хранится в кеше и сбрасывается для всей порции одним
+delete_many, поэтому шапка страницы читает его одним обращением к кешу.
+Той же порцией растёт счётчик новых постов в ленте подписок
+(см. posts.cursors).
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+
+from core.iterators import batches
+from core.tasks import task
+
+from .cursors import FOLLOW_FEED, add_unread
+from .models import Follow, Notification
+
+
+def unread_cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user):
+    """Количество непрочитанных уведомлений, при промахе кеша - из базы."""
+    key = unread_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user=user, is_read=False).count()
+        cache.set(key, count, settings.NOTIFICATIONS_CACHE_TIMEOUT)
+    return count
+
+
+def mark_read(user):
+    Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+    cache.set(
+        unread_cache_key(user.pk), 0, settings.NOTIFICATIONS_CACHE_TIMEOUT
+    )
+
+
+@task
+def notify_followers(post_id, author_id):
+    """Создаёт уведомления о посте для всех подписчиков автора."""
+    batch_size = settings.NOTIFICATIONS_BATCH_SIZE
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    ).iterator(chunk_size=batch_size)
+    for user_ids in batches(followers, batch_size):
+        Notification.objects.bulk_create(
+            [Notification(user_id=pk, post_id=post_id) for pk in user_ids],
+            batch_size=batch_size,
+        )
+        cache.delete_many([unread_cache_key(pk) for pk in user_ids])
+        add_unread(user_ids, FOLLOW_FEED)
+
+
+def send_digests():
+    """
+    Отправляет каждому пользователю с почтой одно письмо со всеми
+    непрочитанными уведомлениями, которые ещё не попадали в дайджест.
+    Пользователи обрабатываются порциями по DIGEST_BATCH_SIZE по ключу
+    user_id: письма порции уходят через EMAIL_BACKEND по одному
+    соединению, и сразу после отправки её уведомления отмечаются, так
+    что сбой посреди рассылки не повторит уже отправленные письма.
+    Возвращает количество отправленных писем.
+    """
+    pending = Notification.objects.filter(
+        is_emailed=False, is_read=False
+    ).exclude(user__email='')
+    site_url = settings.SITE_URL.rstrip('/')
+    sent = 0
+    last_user_id = 0
+    with get_connection() as connection:
+        while True:
+            user_ids = list(
+                pending.filter(user_id__gt=last_user_id).order_by(
+                    'user_id'
+                ).values_list('user_id', flat=True).distinct()[
+                    :settings.DIGEST_BATCH_SIZE
+                ]
+            )
+            if not user_ids:
+                return sent
+            last_user_id = user_ids[-1]
+            batch = pending.filter(user_id__in=user_ids).select_related(
+                'user', 'post__author'
+            ).order_by('user_id', '-pub_date')
+            messages = []
+            sent_ids = []
+            for user, notifications in groupby(batch, key=lambda n: n.user):
+                notifications = list(notifications)
+                body = render_to_string('posts/email/digest.txt', {
+                    'user': user,
+                    'notifications': notifications,
+                    'site_url': site_url,
+                })
+                messages.append(EmailMessage(
+                    f'Новые посты ({len(notifications)})',
+                    body,
+                    to=[user.email],
+                ))
+                sent_ids.extend(n.pk for n in notifications)
+            connection.send_messages(messages)
+            Notification.objects.filter(pk__in=sent_ids).update(
+                is_emailed=True
+            )
+            sent += len(messages)
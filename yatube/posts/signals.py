@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import purge_page_tags
+from core.media import add_reference, remove_reference
+
+from . import group_feeds
+from .live import publish_post
+from .models import Comment, Group, Post
+from .notifications import notify_followers
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, **kwargs):
+    """
+    Запоминает группу поста до сохранения, чтобы сбросить и её,
+    и картинку, чтобы снять с неё ссылку.
+    """
+    instance.previous_group_id = None
+    instance.previous_image = ''
+    if instance.pk is not None:
+        previous = Post.objects.filter(pk=instance.pk).values_list(
+            'group_id', 'image'
+        ).first()
+        if previous is not None:
+            instance.previous_group_id, instance.previous_image = previous
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    tags = {'index', f'post:{instance.pk}', f'author:{instance.author_id}'}
+    for group_id in (instance.group_id,
+                     getattr(instance, 'previous_group_id', None)):
+        if group_id is not None:
+            tags.add(f'group:{group_id}')
+    purge_page_tags(*tags)
+
+
+@receiver(post_save, sender=Post)
+def update_group_feeds(sender, instance, created, **kwargs):
+    """
+    Вставляет новый пост в окно группы, при смене группы переносит.
+    Окно меняется после фиксации транзакции, как и в publish_new_post:
+    откат не оставит в окне поста, которого нет в базе.
+    """
+    previous_group_id = getattr(instance, 'previous_group_id', None)
+    if created or previous_group_id != instance.group_id:
+        group_id, pk, pub_date = (
+            instance.group_id, instance.pk, instance.pub_date
+        )
+
+        def move():
+            group_feeds.remove_post(previous_group_id, pk)
+            group_feeds.add_post(group_id, pk, pub_date)
+        transaction.on_commit(move)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_group_feed(sender, instance, **kwargs):
+    group_id, pk = instance.group_id, instance.pk
+    transaction.on_commit(lambda: group_feeds.remove_post(group_id, pk))
+
+
+@receiver(post_save, sender=Post)
+def notify_about_new_post(sender, instance, created, **kwargs):
+    if created:
+        notify_followers.delay(instance.pk, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def publish_new_post(sender, instance, created, **kwargs):
+    """Сообщает открытым лентам о посте после фиксации транзакции."""
+    if created:
+        transaction.on_commit(lambda: publish_post(instance))
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, **kwargs):
+    image = instance.image.name or ''
+    previous_image = getattr(instance, 'previous_image', '')
+    if image != previous_image:
+        add_reference(image)
+        remove_reference(previous_image)
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    remove_reference(instance.image.name)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    purge_page_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def purge_group_pages(sender, instance, **kwargs):
+    purge_page_tags('index', f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=Group)
+def reset_new_group_feed(sender, instance, created, **kwargs):
+    """У новой группы может оказаться id удалённой."""
+    if created:
+        group_feeds.reset_feed(instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def reset_deleted_group_feed(sender, instance, **kwargs):
+    """Посты удалённой группы теряют её без сигналов."""
+    group_feeds.reset_feed(instance.pk)
@@ -0,0 +1,224 @@
+"""
+Карта сайта: индекс и шарды по постам, группам и профилям авторов.
+
+Шард - диапазон первичных ключей длиной SITEMAP_SHARD_SIZE, поэтому
+новые записи попадают в последний шард, а старые шарды не меняются.
+Строки шарда читаются порциями по ключу (core.iterators), без OFFSET,
+и сразу пишутся в поток, так что память не зависит от размера таблицы.
+
+Отпечаток шарда (количество, старший ключ, последняя дата) для всех
+шардов секции считается одним агрегирующим запросом. Команда
+build_sitemaps сравнивает отпечатки с сохранёнными в manifest.json и
+перезаписывает только изменившиеся шарды. Пока файлов нет, карта
+отдаётся потоком прямо из базы, а отпечатки берутся из кеша: ключ
+включает версию тега страниц index, которую сбрасывает любое изменение
+постов и групп (см. core.cache).
+"""
+import json
+import os
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.urls import reverse
+
+from core.cache import get_or_rebuild, tag_versions
+from core.iterators import keyset_iterator
+
+from .models import Group, Post, User
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+MANIFEST = 'manifest.json'
+
+
+def _lastmod(value):
+    return value.date().isoformat() if value else None
+
+
+class Section:
+    name = None
+
+    def fingerprint_queryset(self):
+        raise NotImplementedError
+
+    def entries_queryset(self):
+        raise NotImplementedError
+
+    def location(self, row):
+        raise NotImplementedError
+
+    def fingerprints(self):
+        """Отпечатки всех шардов секции: {номер шарда: отпечаток}."""
+        size = settings.SITEMAP_SHARD_SIZE
+        rows = self.fingerprint_queryset().annotate(
+            shard=F('shard_key') / size
+        ).values('shard').annotate(
+            count=Count('shard_key', distinct=True),
+            last_key=Max('shard_key'),
+            lastmod=Max('lastmod'),
+        ).order_by('shard')
+        return {
+            row['shard']: [
+                row['count'], row['last_key'], _lastmod(row['lastmod'])
+            ]
+            for row in rows
+        }
+
+    def entries(self, shard):
+        size = settings.SITEMAP_SHARD_SIZE
+        rows = self.entries_queryset().filter(
+            pk__gte=shard * size, pk__lt=(shard + 1) * size
+        )
+        for row in keyset_iterator(rows, settings.SITEMAP_CHUNK_SIZE, 'id'):
+            yield self.location(row), _lastmod(row[-1])
+
+
+class PostSection(Section):
+    name = 'posts'
+
+    def fingerprint_queryset(self):
+        return Post.objects.annotate(
+            shard_key=F('id'), lastmod=F('pub_date')
+        )
+
+    def entries_queryset(self):
+        return Post.objects.values_list('id', 'pub_date')
+
+    def location(self, row):
+        return reverse('posts:post_detail', args=(row[0],))
+
+
+class GroupSection(Section):
+    name = 'groups'
+
+    def fingerprint_queryset(self):
+        return Group.objects.annotate(
+            shard_key=F('id'), lastmod=F('posts__pub_date')
+        )
+
+    def entries_queryset(self):
+        return Group.objects.annotate(
+            lastmod=Max('posts__pub_date')
+        ).values_list('id', 'slug', 'lastmod')
+
+    def location(self, row):
+        return reverse('posts:group_list', args=(row[1],))
+
+
+class ProfileSection(Section):
+    """Профили только тех пользователей, у которых есть посты."""
+    name = 'profiles'
+
+    def fingerprint_queryset(self):
+        return Post.objects.annotate(
+            shard_key=F('author_id'), lastmod=F('pub_date')
+        )
+
+    def entries_queryset(self):
+        return User.objects.filter(posts__isnull=False).annotate(
+            lastmod=Max('posts__pub_date')
+        ).values_list('id', 'username', 'lastmod')
+
+    def location(self, row):
+        return reverse('posts:profile', args=(row[1],))
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), GroupSection(), ProfileSection())
+}
+
+
+def shard_name(section, shard):
+    return f'sitemap-{section}-{shard}.xml'
+
+
+def render_shard(section, shard, base_url):
+    """Строки XML одного шарда."""
+    yield XML_HEADER
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    for location, lastmod in SECTIONS[section].entries(shard):
+        yield '<url><loc>' + escape(base_url + location) + '</loc>'
+        if lastmod:
+            yield f'<lastmod>{lastmod}</lastmod>'
+        yield '</url>\n'
+    yield '</urlset>\n'
+
+
+def render_index(fingerprints, base_url):
+    """
+    Строки XML индекса. fingerprints - {секция: {шард: отпечаток}}.
+    """
+    yield XML_HEADER
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for section, shards in fingerprints.items():
+        for shard, fingerprint in shards.items():
+            location = reverse(
+                'posts:sitemap_shard', args=(section, shard)
+            )
+            yield '<sitemap><loc>' + escape(base_url + location) + '</loc>'
+            if fingerprint[2]:
+                yield f'<lastmod>{fingerprint[2]}</lastmod>'
+            yield '</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def all_fingerprints():
+    return {
+        name: section.fingerprints() for name, section in SECTIONS.items()
+    }
+
+
+def cached_fingerprints():
+    version = tag_versions(['index'])['index']
+    return get_or_rebuild(
+        f'sitemap:fingerprints:{version}', all_fingerprints,
+        settings.SITEMAP_CACHE_TIMEOUT
+    )
+
+
+def _write(path, chunks):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.writelines(chunks)
+    os.replace(tmp_path, path)
+
+
+def build_sitemaps(root, base_url, force=False):
+    """
+    Пишет в root индекс и изменившиеся шарды, удаляет исчезнувшие.
+    Возвращает количество перезаписанных шардов.
+    """
+    os.makedirs(root, exist_ok=True)
+    manifest_path = os.path.join(root, MANIFEST)
+    previous = {}
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as file:
+            previous = json.load(file)
+        if previous.pop('base_url', None) != base_url:
+            previous = {}
+    fingerprints = all_fingerprints()
+    written = 0
+    for section, shards in fingerprints.items():
+        old_shards = previous.get(section, {})
+        for shard, fingerprint in shards.items():
+            if old_shards.get(str(shard)) != fingerprint:
+                _write(
+                    os.path.join(root, shard_name(section, shard)),
+                    render_shard(section, shard, base_url)
+                )
+                written += 1
+        for shard in set(old_shards) - {str(shard) for shard in shards}:
+            path = os.path.join(root, shard_name(section, shard))
+            if os.path.exists(path):
+                os.remove(path)
+    _write(
+        os.path.join(root, 'sitemap.xml'),
+        render_index(fingerprints, base_url)
+    )
+    _write(manifest_path, [json.dumps({'base_url': base_url, **{
+        section: {str(shard): fp for shard, fp in shards.items()}
+        for section, shards in fingerprints.items()
+    }})])
+    return written
@@ -1,8 +1,9 @@
 from django.core.cache import cache
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from ..models import Post, User
+from core.cache import acquire_lock, page_cache_key, release_lock
+from ..models import Comment, Group, Post, User
 
 
 class PostCreateFormTests(TestCase):
@@ -35,3 +36,109 @@ class PostCreateFormTests(TestCase):
         cache.clear()
         response_last = self.client.get(self.index)
         self.assertNotEqual(response_last.content, cache.get('index_page'))
+
+
+# X-Page-Cache отдаётся только при DEBUG; пустой INTERNAL_IPS скрывает
+# debug toolbar, который иначе встраивается в страницы
+@override_settings(DEBUG=True, INTERNAL_IPS=[])
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LevKharkov')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='Test',
+            description='Group for test'
+        )
+        cls.another_group = Group.objects.create(
+            title='AnotherTestGroup',
+            slug='AnotherTest',
+            description='Another group for test'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст поста для кеша',
+            author=cls.user,
+            group=cls.group
+        )
+        cls.index = reverse('posts:index')
+        cls.post_detail = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.id}
+        )
+        cls.group_list = reverse('posts:group_list', kwargs={
+            'slug': cls.group.slug
+        })
+
+    def setUp(self):
+        cache.clear()
+        self.user_client = Client()
+        self.user_client.force_login(self.user)
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный анонимный запрос отдаётся из кеша страниц."""
+        for url in (self.index, self.post_detail, self.group_list):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.client.get(url)['X-Page-Cache'], 'miss'
+                )
+                self.assertEqual(self.client.get(url)['X-Page-Cache'], 'hit')
+
+    def test_session_and_csrf_cookies_bypass_cache(self):
+        """С сессией или CSRF-кукой кеш страниц не используется."""
+        self.client.get(self.index)
+        csrf_client = Client()
+        csrf_client.cookies['csrftoken'] = 'token'
+        for client in (self.user_client, csrf_client):
+            with self.subTest(client=client):
+                self.assertNotIn('X-Page-Cache', client.get(self.index))
+
+    def test_new_post_purges_index(self):
+        """Новый пост сбрасывает главную страницу."""
+        self.client.get(self.index)
+        Post.objects.create(text='Новый пост', author=self.user)
+        self.assertEqual(self.client.get(self.index)['X-Page-Cache'], 'miss')
+
+    def test_comment_purges_post_detail(self):
+        """Новый комментарий сбрасывает страницу поста."""
+        self.client.get(self.post_detail)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Новый комментарий'
+        )
+        self.assertContains(self.client.get(self.post_detail),
+                            'Новый комментарий')
+
+    def test_group_change_purges_previous_group(self):
+        """Перенос поста в другую группу сбрасывает страницу старой."""
+        self.client.get(self.group_list)
+        self.post.group = self.another_group
+        self.post.save()
+        response = self.client.get(self.group_list)
+        self.assertNotContains(response, self.post.text)
+
+    def test_stale_page_served_while_rebuilding(self):
+        """Пока страницу перестраивает другой воркер, отдаётся старая."""
+        self.client.get(self.index)
+        Post.objects.create(text='Новый пост', author=self.user)
+        key = page_cache_key(self.index)
+        self.assertIsNotNone(cache.get(key))
+        self.assertTrue(acquire_lock(key, 10))
+        try:
+            response = self.client.get(self.index)
+        finally:
+            release_lock(key)
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        self.assertNotContains(response, 'Новый пост')
+
+    @override_settings(DEBUG=False)
+    def test_debug_header_hidden_in_production(self):
+        self.client.get(self.index)
+        self.assertNotIn('X-Page-Cache', self.client.get(self.index))
+
+    def test_post_without_group_has_no_group_tag(self):
+        post = Post.objects.create(text='Без группы', author=self.user)
+        url = reverse('posts:post_detail', kwargs={'post_id': post.id})
+        self.client.get(url)
+        tags = cache.get(page_cache_key(url)).tags
+        self.assertEqual(
+            set(tags), {f'post:{post.id}', f'author:{self.user.id}'}
+        )
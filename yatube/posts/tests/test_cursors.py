@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..cursors import FOLLOW_FEED, position_token
+from ..models import FeedCursor, Follow, Post, User
+from ..views import POSTS_COUNT
+
+
+class FollowCursorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LevKharkov')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for index in range(POSTS_COUNT * 2 + 5):
+            Post.objects.create(text=f'Пост {index}', author=cls.author)
+        cls.feed = list(Post.objects.order_by('-pub_date', '-pk'))
+        cls.url = reverse('posts:follow_index')
+
+    @staticmethod
+    def token(post):
+        return position_token(post.pub_date, post.pk)
+
+    def setUp(self):
+        self.client.force_login(self.reader)
+
+    def cursor(self):
+        return FeedCursor.objects.get(user=self.reader, feed=FOLLOW_FEED)
+
+    def test_first_page_marks_feed_seen(self):
+        self.client.get(self.url)
+        self.assertEqual(self.cursor().seen_id, self.feed[0].pk)
+        Post.objects.create(text='Новый пост', author=self.author)
+        Post.objects.create(text='Ещё пост', author=self.author)
+        self.assertEqual(self.cursor().unread, 2)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['follow_unread'], 2)
+        self.assertContains(response, 'badge')
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['seen_from'], 2)
+        self.assertEqual(self.cursor().unread, 0)
+
+    def test_resume_where_reader_left_off(self):
+        """Ссылка «продолжить» ведёт к постам после последней страницы."""
+        self.client.get(self.url + '?page=2')
+        last_read = self.feed[POSTS_COUNT * 2 - 1]
+        self.assertEqual(self.cursor().position_id, last_read.pk)
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response.context['resume_after'], self.token(last_read)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url, {'after': self.token(last_read)}
+            )
+        self.assertEqual(
+            list(response.context['page_obj']), self.feed[POSTS_COUNT * 2:]
+        )
+        self.assertIsNone(response.context['next_after'])
+        sql = ' '.join(query['sql'] for query in queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_after_pages_through_feed(self):
+        response = self.client.get(
+            self.url, {'after': self.token(self.feed[0])}
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), self.feed[1:POSTS_COUNT + 1]
+        )
+        self.assertEqual(
+            response.context['next_after'],
+            self.token(self.feed[POSTS_COUNT])
+        )
+
+    def test_invalid_after_shows_first_page(self):
+        for after in ('99999999999999999999999-1', '1-99999999999999999999999',
+                      '1-²', 'abc'):
+            with self.subTest(after=after):
+                response = self.client.get(self.url, {'after': after})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    list(response.context['page_obj']),
+                    self.feed[:POSTS_COUNT]
+                )
+
+    def test_resume_after_deleted_post(self):
+        """Место в ленте не теряется, если пост удалили."""
+        self.client.get(self.url + '?page=2')
+        last_read = self.feed[POSTS_COUNT * 2 - 1]
+        Post.objects.filter(pk=last_read.pk).delete()
+        resume_after = self.client.get(self.url).context['resume_after']
+        response = self.client.get(self.url, {'after': resume_after})
+        self.assertEqual(
+            list(response.context['page_obj']), self.feed[POSTS_COUNT * 2:]
+        )
+
+    def test_seen_posts_are_ordered_by_date(self):
+        """Пост с меньшим id, но новее по дате, ещё не увиденный."""
+        self.client.get(self.url)
+        moved = self.feed[-1]
+        Post.objects.filter(pk=moved.pk).update(
+            pub_date=self.feed[0].pub_date + timedelta(seconds=1)
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['page_obj'][0], moved)
+        self.assertEqual(response.context['seen_from'], 1)
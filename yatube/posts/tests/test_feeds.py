@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LevKharkov')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='Test',
+            description='Group for test'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_list_posts(self):
+        urls = {
+            reverse('posts:index_rss'): 'application/rss+xml',
+            reverse('posts:index_atom'): 'application/atom+xml',
+            reverse('posts:group_rss', args=(self.group.slug,)):
+                'application/rss+xml',
+            reverse('posts:group_atom', args=(self.group.slug,)):
+                'application/atom+xml',
+            reverse('posts:profile_rss', args=(self.user.username,)):
+                'application/rss+xml',
+            reverse('posts:profile_atom', args=(self.user.username,)):
+                'application/atom+xml',
+        }
+        for url, content_type in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type
+                ))
+                self.assertContains(response, 'Тестовый текст')
+                self.assertContains(
+                    response,
+                    reverse('posts:post_detail', args=(self.post.id,))
+                )
+
+    def test_unknown_group_feed_is_404(self):
+        response = self.client.get(reverse('posts:group_rss', args=('no',)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_feed_is_cached(self):
+        """Повторная лента собирается без запросов постов."""
+        url = reverse('posts:index_rss')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_feed_is_invalidated_on_post_change(self):
+        url = reverse('posts:group_rss', args=(self.group.slug,))
+        self.client.get(url)
+        Post.objects.create(
+            text='Новый пост', author=self.user, group=self.group
+        )
+        self.assertContains(self.client.get(url), 'Новый пост')
+
+    def test_conditional_get(self):
+        """Агрегатор с актуальной копией получает 304."""
+        url = reverse('posts:index_rss')
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            304
+        )
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            304
+        )
+        Post.objects.create(text='Новый пост', author=self.user)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            200
+        )
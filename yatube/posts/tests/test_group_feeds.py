@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import group_feeds
+from ..models import Group, Post, User
+from ..views import POSTS_COUNT
+
+
+def create_posts(test):
+    test.author = User.objects.create_user(username='LevKharkov')
+    test.group = Group.objects.create(title='Группа', slug='group')
+    test.other = Group.objects.create(title='Другая', slug='other')
+    for index in range(POSTS_COUNT * 2 + 3):
+        Post.objects.create(
+            text=f'Пост {index}', author=test.author, group=test.group
+        )
+
+
+class GroupFeedMixin:
+    def page(self, group, number=1):
+        response = self.client.get(
+            reverse('posts:group_list', args=[group.slug]), {'page': number}
+        )
+        return response.context['page_obj']
+
+    def expected(self, group):
+        return list(group.posts.order_by('-pub_date', '-pk'))
+
+
+@override_settings(GROUP_FEED_SIZE=15, GROUP_FEED_CACHE_GROUPS=2)
+class GroupFeedTests(GroupFeedMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        create_posts(cls)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def test_pages_match_database(self):
+        self.page(self.group)
+        for number in (1, 2, 3):
+            page = self.page(self.group, number)
+            start = (number - 1) * POSTS_COUNT
+            self.assertEqual(
+                list(page),
+                self.expected(self.group)[start:start + POSTS_COUNT]
+            )
+        self.assertEqual(page.paginator.num_pages, 3)
+
+    def test_cached_page_skips_count_and_offset(self):
+        self.page(self.group)
+        with CaptureQueriesContext(connection) as queries:
+            self.page(self.group)
+        post_queries = [
+            query['sql'].upper() for query in queries
+            if '"posts_post"' in query['sql']
+        ]
+        self.assertEqual(len(post_queries), 1)
+        self.assertIn('"POSTS_POST"."ID" IN (', post_queries[0])
+        self.assertNotIn('LIMIT', post_queries[0])
+
+    def test_least_recent_group_evicted(self):
+        third = Group.objects.create(title='Третья', slug='third')
+        self.page(self.group)
+        self.page(self.other)
+        self.page(third)
+        self.assertIsNone(cache.get(group_feeds._feed_key(self.group.pk)))
+        self.assertIsNotNone(cache.get(group_feeds._feed_key(third.pk)))
+
+    @override_settings(GROUP_FEED_CACHE_GROUPS=0)
+    def test_disabled(self):
+        self.assertEqual(
+            list(self.page(self.group)), self.expected(self.group)[:10]
+        )
+        self.assertIsNone(cache.get(group_feeds._feed_key(self.group.pk)))
+
+
+@override_settings(GROUP_FEED_SIZE=15, GROUP_FEED_CACHE_GROUPS=2)
+class GroupFeedSignalTests(GroupFeedMixin, TransactionTestCase):
+    """Окно меняется только после фиксации транзакции."""
+
+    def setUp(self):
+        cache.clear()
+        create_posts(self)
+        self.client.force_login(self.author)
+
+    def test_window_follows_changes(self):
+        self.page(self.group)
+        self.page(self.other)
+        post = Post.objects.create(
+            text='Новый', author=self.author, group=self.group
+        )
+        self.assertEqual(self.page(self.group)[0], post)
+        oldest = self.expected(self.group)[-1]
+        moved = self.expected(self.group)[3]
+        moved.group = self.other
+        moved.save()
+        self.expected(self.group)[0].delete()
+        feed = group_feeds.get_feed(self.group.pk)
+        self.assertEqual(feed['count'], POSTS_COUNT * 2 + 2)
+        self.assertEqual(
+            [pk for _, pk in feed['entries']],
+            [post.pk for post in self.expected(self.group)[:13]]
+        )
+        self.assertEqual(list(self.page(self.other)), [moved])
+        self.assertEqual(list(self.page(self.group, 3))[-1], oldest)
+
+    def test_rolled_back_post_stays_out_of_window(self):
+        self.page(self.group)
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                Post.objects.create(
+                    text='Откат', author=self.author, group=self.group
+                )
+                raise ValueError
+        feed = group_feeds.get_feed(self.group.pk)
+        self.assertEqual(feed['count'], POSTS_COUNT * 2 + 3)
+        self.assertEqual(
+            [pk for _, pk in feed['entries']],
+            [post.pk for post in self.expected(self.group)[:15]]
+        )
@@ -0,0 +1,121 @@
+import json
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.pubsub import get_hub, reset_hub
+from ..live import CHANNEL, publish_post
+from ..models import Follow, Group, Post, User
+
+
+@override_settings(
+    PUBSUB_BACKEND='core.pubsub.LocalBackend',
+    LIVE_FEED_MAX_DURATION=0.1,
+    LIVE_FEED_HEARTBEAT=0.05,
+    LIVE_FEED_POLL_TIMEOUT=0.1
+)
+class LiveFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LevKharkov')
+        cls.author = User.objects.create_user(username='NotLevKharkov')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='Test',
+            description='Group for test'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.followed_post = Post.objects.create(
+            text='Пост автора из подписок', author=cls.author
+        )
+        cls.group_post = Post.objects.create(
+            text='Пост в группе', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        reset_hub('PUBSUB_BACKEND')
+        self.client.force_login(self.user)
+        publish_post(self.followed_post)
+        publish_post(self.group_post)
+
+    def stream(self, **params):
+        response = self.client.get(
+            reverse('posts:live_feed'), {'last': 0, **params}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return b''.join(response.streaming_content).decode()
+
+    def test_stream_sends_new_posts(self):
+        """Поток отдаёт количество и карточки новых постов."""
+        content = self.stream()
+        self.assertIn('id: 2\nevent: posts\n', content)
+        data = json.loads(content.split('data: ')[1].split('\n')[0])
+        self.assertEqual(data['count'], 2)
+        self.assertIn('Пост автора из подписок', data['html'])
+
+    def test_stream_is_filtered_by_feed(self):
+        content = self.stream(feed='follow')
+        self.assertIn('Пост автора из подписок', content)
+        self.assertNotIn('Пост в группе', content)
+        content = self.stream(feed='group', group=self.group.slug)
+        self.assertIn('Пост в группе', content)
+        self.assertNotIn('Пост автора из подписок', content)
+
+    def test_idle_stream_sends_heartbeat(self):
+        content = self.stream(last=get_hub().last_id(CHANNEL))
+        self.assertIn(': ping', content)
+        self.assertNotIn('event: posts', content)
+
+    def test_stream_catches_up_with_cached_page(self):
+        """Посты новее since, вышедшие до подключения, тоже приходят."""
+        response = self.client.get(
+            reverse('posts:live_feed'), {'since': self.followed_post.pk}
+        )
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.count('event: posts'), 1)
+        self.assertIn('id: 2\nevent: posts\n', content)
+        self.assertIn('Пост в группе', content)
+        self.assertNotIn('Пост автора из подписок', content)
+        data = self.client.get(
+            reverse('posts:live_feed'),
+            {'poll': 1, 'since': self.followed_post.pk}
+        ).json()
+        self.assertEqual((data['last'], data['count']), (2, 1))
+
+    def test_out_of_range_since_is_ignored(self):
+        data = self.client.get(
+            reverse('posts:live_feed'),
+            {'poll': 1, 'since': '9' * 23}
+        ).json()
+        self.assertEqual((data['last'], data['count']), (2, 0))
+
+    def test_first_page_sends_newest_post(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user) for i in range(10)
+        )
+        newest = Post.objects.latest('pub_date')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, f'&since={newest.pk}')
+        response = self.client.get(reverse('posts:index'), {'page': 2})
+        self.assertNotContains(response, '&since=')
+
+    def test_long_poll(self):
+        url = reverse('posts:live_feed')
+        data = self.client.get(url, {'poll': 1}).json()
+        self.assertEqual(data['last'], 2)
+        self.assertEqual(data['count'], 0)
+        data = self.client.get(url, {'poll': 1, 'last': 1}).json()
+        self.assertEqual((data['last'], data['count']), (2, 1))
+        self.assertIn('Пост в группе', data['html'])
+
+
+@override_settings(PUBSUB_BACKEND='core.pubsub.LocalBackend')
+class LiveFeedPublishTests(TransactionTestCase):
+    def test_new_post_is_published_after_commit(self):
+        user = User.objects.create_user(username='LevKharkov')
+        post = Post.objects.create(text='Тестовый текст', author=user)
+        message = get_hub().listen(CHANNEL, 0, 0)[-1][1]
+        self.assertEqual(message['id'], post.pk)
+        post.save()
+        self.assertEqual(get_hub().last_id(CHANNEL), 1)
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import MediaBlob
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageReferenceTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LevKharkov')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, content=SMALL_GIF, name='small.gif'):
+        return Post.objects.create(
+            text='Тестовый текст', author=self.user,
+            image=SimpleUploadedFile(name, content, content_type='image/gif')
+        )
+
+    def ref_count(self, name):
+        return MediaBlob.objects.get(name=name).ref_count
+
+    def gc(self, *args):
+        call_command('gc_media', '--grace=-1', *args, verbosity=0)
+
+    def test_reposted_image_is_stored_once(self):
+        """Одна и та же картинка в двух постах - один файл."""
+        first = self.create_post()
+        second = self.create_post(name='repost.gif')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(self.ref_count(first.image.name), 2)
+        first.delete()
+        self.assertEqual(self.ref_count(second.image.name), 1)
+        self.gc()
+        self.assertTrue(os.path.exists(second.image.path))
+
+    def test_replaced_image_is_collected(self):
+        """Картинка, заменённая при редактировании, удаляется сборщиком."""
+        post = self.create_post()
+        old_path = post.image.path
+        post.image = SimpleUploadedFile('new.gif', SMALL_GIF + b'new')
+        post.save()
+        self.assertEqual(self.ref_count(post.image.name), 1)
+        self.gc()
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(post.image.path))
+
+    def test_gc_removes_orphans_and_keeps_legacy_files(self):
+        storage = Post._meta.get_field('image').storage
+        orphan = storage.save('posts/orphan.gif', ContentFile(b'orphan'))
+        legacy = os.path.join(TEMP_MEDIA_ROOT, 'posts', 'legacy.gif')
+        with open(legacy, 'wb') as file:
+            file.write(SMALL_GIF)
+        self.gc()
+        self.assertFalse(storage.exists(orphan))
+        self.assertTrue(os.path.exists(legacy))
+
+    def test_legacy_images_are_not_counted(self):
+        """Картинка со старым именем переживает удаление поста и сборку."""
+        legacy = os.path.join(TEMP_MEDIA_ROOT, 'posts', 'legacy.gif')
+        os.makedirs(os.path.dirname(legacy), exist_ok=True)
+        with open(legacy, 'wb') as file:
+            file.write(SMALL_GIF)
+        first = Post.objects.create(
+            text='Первый', author=self.user, image='posts/legacy.gif'
+        )
+        Post.objects.create(
+            text='Второй', author=self.user, image='posts/legacy.gif'
+        )
+        first.delete()
+        self.gc()
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertTrue(os.path.exists(legacy))
+
+    def test_reupload_protects_file_from_gc(self):
+        """Файл, загруженный повторно, ждёт своей ссылки весь срок."""
+        post = self.create_post()
+        name = post.image.name
+        post.delete()
+        MediaBlob.objects.filter(name=name).update(
+            updated=timezone.now() - timedelta(days=2)
+        )
+        storage = Post._meta.get_field('image').storage
+        again = storage.save('posts/again.gif', ContentFile(SMALL_GIF))
+        self.assertEqual(again, name)
+        call_command('gc_media', verbosity=0)
+        self.assertTrue(storage.exists(name))
+
+    def test_recount_restores_references(self):
+        post = self.create_post()
+        MediaBlob.objects.all().delete()
+        self.gc('--recount')
+        self.assertEqual(self.ref_count(post.image.name), 1)
+        self.assertTrue(os.path.exists(post.image.path))
@@ -1,6 +1,7 @@
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post, User
+from ..models import EXCERPT_LENGTH, Group, Post, User
 
 
 class PostModelTest(TestCase):
@@ -28,6 +29,10 @@ class PostModelTest(TestCase):
             with self.subTest(str_value=str_value):
                 self.assertEqual(str_value, expected_str)
 
+    def test_unsaved_post_str_uses_text(self):
+        post = Post(author=self.user, text='Ещё не сохранённый пост')
+        self.assertEqual(str(post), post.text[:15])
+
     def test_post_verbose_help_is_right(self):
         """Проверяем verbose_name и help_text поста"""
         text_verbose = self.post._meta.get_field('text').verbose_name
@@ -51,3 +56,33 @@ class PostModelTest(TestCase):
         for field, expected_value in post_test.items():
             with self.subTest(field=field):
                 self.assertEqual(field, expected_value)
+
+    def test_excerpt_follows_text(self):
+        """Отрывок пересчитывается при сохранении текста."""
+        self.assertEqual(self.post.excerpt, self.post.text)
+        self.post.text = 'Слово ' * 100
+        self.post.save(update_fields=['text'])
+        self.post.refresh_from_db()
+        self.assertEqual(len(self.post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(self.post.excerpt.endswith('…'))
+
+    def test_text_html_is_escaped_and_linkified(self):
+        post = Post.objects.create(
+            author=self.user,
+            text='<b>жирный</b> https://example.com\n\nвторой абзац'
+        )
+        self.assertEqual(
+            post.text_html,
+            '<p>&lt;b&gt;жирный&lt;/b&gt; <a href="https://example.com" '
+            'rel="nofollow">https://example.com</a></p>\n\n'
+            '<p>второй абзац</p>'
+        )
+
+    def test_render_posts_fills_missing_html(self):
+        Post.objects.update(excerpt='', text_html='')
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.html, f'<p>{post.text}</p>')
+        call_command('render_posts', verbosity=0)
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, f'<p>{post.text}</p>')
+        self.assertEqual(post.excerpt, post.text)
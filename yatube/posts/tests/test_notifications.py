@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from ..context_processors import notifications
+from ..models import Follow, Notification, Post, User
+
+
+@override_settings(NOTIFICATIONS_BATCH_SIZE=2)
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='LevKharkov')
+        cls.followers = [
+            User.objects.create_user(
+                username=f'follower{i}', email=f'follower{i}@yatube.ru'
+            )
+            for i in range(5)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=user, author=cls.author) for user in cls.followers
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.follower = self.followers[0]
+        self.client.force_login(self.follower)
+
+    def unread(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return notifications(request)['unread_notifications']
+
+    def test_new_post_notifies_all_followers(self):
+        """Новый пост создаёт уведомление каждому подписчику."""
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        self.assertEqual(
+            Notification.objects.filter(post=post).count(),
+            len(self.followers)
+        )
+        self.assertFalse(
+            Notification.objects.filter(user=self.author).exists()
+        )
+
+    def test_editing_post_does_not_notify(self):
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(
+            Notification.objects.filter(user=self.follower).count(), 1
+        )
+
+    def test_unread_count_is_cached(self):
+        """Счётчик в шапке читается из кеша без запросов к базе."""
+        self.assertEqual(self.unread(self.follower), 0)
+        Post.objects.create(text='Тестовый текст', author=self.author)
+        self.assertEqual(self.unread(self.follower), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread(self.follower), 1)
+
+    def test_notifications_page_marks_read(self):
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        self.assertContains(
+            self.client.get(reverse('posts:index')), 'Уведомления (1)'
+        )
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertEqual(response.context['notifications'][0].post, post)
+        self.assertNotContains(response, 'Уведомления (1)')
+        self.assertEqual(self.unread(self.follower), 0)
+
+    def test_digest_is_sent_once(self):
+        """Каждый подписчик получает одно письмо со всеми постами."""
+        Post.objects.create(text='Первый пост', author=self.author)
+        Post.objects.create(text='Второй пост', author=self.author)
+        call_command('send_digests', verbosity=0)
+        self.assertEqual(len(mail.outbox), len(self.followers))
+        self.assertIn('Первый пост', mail.outbox[0].body)
+        self.assertIn('Второй пост', mail.outbox[0].body)
+        self.assertIn(f'{settings.SITE_URL}/posts/', mail.outbox[0].body)
+        self.assertFalse(
+            Notification.objects.filter(is_emailed=False).exists()
+        )
+        call_command('send_digests', verbosity=0)
+        self.assertEqual(len(mail.outbox), len(self.followers))
+
+    @override_settings(DIGEST_BATCH_SIZE=1)
+    def test_failed_digest_keeps_sent_batches(self):
+        """После сбоя повторно уходят только неотправленные письма."""
+        Post.objects.create(text='Первый пост', author=self.author)
+        backend = type(mail.get_connection())
+        send_messages = backend.send_messages
+        calls = []
+
+        def fail_second(connection, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise ConnectionError
+            return send_messages(connection, messages)
+
+        with mock.patch.object(backend, 'send_messages', fail_second):
+            with self.assertRaises(ConnectionError):
+                call_command('send_digests', verbosity=0)
+        self.assertEqual(len(mail.outbox), 1)
+        call_command('send_digests', verbosity=0)
+        self.assertEqual(len(mail.outbox), len(self.followers))
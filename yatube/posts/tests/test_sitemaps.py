@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..sitemaps import build_sitemaps
+
+TEMP_SITEMAP_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    SITEMAP_ROOT=TEMP_SITEMAP_ROOT,
+    SITEMAP_SHARD_SIZE=2,
+    SITEMAP_CHUNK_SIZE=1
+)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LevKharkov')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='Test',
+            description='Group for test'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user, group=cls.group
+            )
+            for i in range(5)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_SITEMAP_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(TEMP_SITEMAP_ROOT, ignore_errors=True)
+
+    def content(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def build(self):
+        call_command(
+            'build_sitemaps', base_url='https://yatube.ru', verbosity=0
+        )
+
+    def shard_url(self, section, shard):
+        return reverse('posts:sitemap_shard', args=(section, shard))
+
+    def test_streamed_sitemap(self):
+        """Без файлов карта отдаётся потоком из базы."""
+        index = self.content(reverse('posts:sitemap'))
+        shards = {post.id // 2 for post in self.posts}
+        for shard in shards:
+            self.assertIn(self.shard_url('posts', shard), index)
+        self.assertIn(self.shard_url('groups', self.group.id // 2), index)
+        self.assertIn(self.shard_url('profiles', self.user.id // 2), index)
+        urls = ''.join(
+            self.content(self.shard_url('posts', shard)) for shard in shards
+        )
+        for post in self.posts:
+            self.assertIn(
+                reverse('posts:post_detail', args=(post.id,)) + '<', urls
+            )
+        self.assertIn(
+            reverse('posts:profile', args=(self.user.username,)),
+            self.content(self.shard_url('profiles', self.user.id // 2))
+        )
+
+    def test_unknown_section_is_404(self):
+        self.assertEqual(
+            self.client.get(self.shard_url('unknown', 0)).status_code, 404
+        )
+
+    def test_missing_shard_is_404(self):
+        """Шарда за пределами отпечатков нет."""
+        self.assertEqual(
+            self.client.get(self.shard_url('posts', 100)).status_code, 404
+        )
+
+    def test_streamed_index_reuses_fingerprints(self):
+        """Отпечатки кешируются до изменения постов."""
+        self.content(reverse('posts:sitemap'))
+        with self.assertNumQueries(0):
+            self.content(reverse('posts:sitemap'))
+        post = Post.objects.create(text='Новый', author=self.user)
+        self.assertIn(
+            self.shard_url('posts', post.id // 2),
+            self.content(reverse('posts:sitemap'))
+        )
+
+    def test_command_writes_files_served_by_view(self):
+        self.build()
+        with open(os.path.join(TEMP_SITEMAP_ROOT, 'sitemap.xml')) as file:
+            index = file.read()
+        self.assertIn('https://yatube.ru/sitemap-posts-', index)
+        self.assertEqual(self.content(reverse('posts:sitemap')), index)
+
+    def test_command_rewrites_only_changed_shards(self):
+        """Повторная сборка трогает только шарды с изменениями."""
+        self.build()
+        self.assertEqual(self.written(), 0)
+        post_id = next(
+            post.id for post in self.posts[1:]
+            if post.id // 2 == (post.id - 1) // 2
+        )
+        Post.objects.filter(pk=post_id).delete()
+        self.assertEqual(self.written(), 1)
+        path = os.path.join(
+            TEMP_SITEMAP_ROOT, f'sitemap-posts-{post_id // 2}.xml'
+        )
+        with open(path) as file:
+            self.assertNotIn(f'/posts/{post_id}/<', file.read())
+
+    def written(self):
+        return build_sitemaps(TEMP_SITEMAP_ROOT, 'https://yatube.ru')
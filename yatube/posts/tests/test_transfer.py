@@ -0,0 +1,117 @@
+import io
+from datetime import timedelta
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.cache import tag_versions
+from core.models import MediaBlob
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LevKharkov')
+        cls.another_user = User.objects.create_user(username='NotLevKharkov')
+        cls.group = Group.objects.create(
+            title='TestGroup',
+            slug='Test',
+            description='Group for test'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.user, group=cls.group
+        )
+        cls.pub_date = timezone.now() - timedelta(days=30)
+        Post.objects.filter(pk=cls.post.pk).update(pub_date=cls.pub_date)
+        Comment.objects.create(
+            post=cls.post, author=cls.another_user, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.another_user, author=cls.user)
+
+    def export(self):
+        output = io.StringIO()
+        call_command('export_yatube', chunk_size=1, stdout=output)
+        return output.getvalue()
+
+    def load(self, dump):
+        call_command('import_yatube', verbosity=0, stdin=io.StringIO(dump))
+
+    def test_export_is_ndjson(self):
+        lines = self.export().splitlines()
+        self.assertIn('"format": "yatube"', lines[0])
+        self.assertEqual(len(lines), 1 + 2 + 1 + 1 + 1 + 1)
+
+    def test_restore_into_empty_database_keeps_ids(self):
+        """В пустую базу данные ложатся с исходными ключами."""
+        dump = self.export()
+        for model in (Follow, Comment, Post, Group, User):
+            model.objects.all().delete()
+        self.load(dump)
+        post = Post.objects.get()
+        self.assertEqual(post.pk, self.post.pk)
+        self.assertEqual(post.pub_date, self.pub_date)
+        self.assertEqual(post.author.username, 'LevKharkov')
+        self.assertEqual(post.comments.get().author, self.another_user)
+        self.assertTrue(self.user.following.filter(
+            user=self.another_user
+        ).exists())
+        self.assertEqual(self.export(), dump)
+
+    def test_merge_into_existing_database(self):
+        """Пользователи и группы связываются, посты добавляются."""
+        self.load(self.export())
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        new_post = Post.objects.exclude(pk=self.post.pk).get()
+        self.assertEqual(new_post.author, self.user)
+        self.assertEqual(new_post.group, self.group)
+        self.assertEqual(new_post.comments.get().text, 'Комментарий')
+        self.assertEqual(new_post.excerpt, self.post.excerpt)
+        created = Post.objects.create(text='Новый пост', author=self.user)
+        self.assertGreater(created.pk, new_post.pk)
+
+    def test_references_to_absent_models_keep_ids(self):
+        """Посты без пользователей в выгрузке ссылаются на существующих."""
+        User.objects.create_user(username='Newcomer')
+        lines = self.export().splitlines(keepends=True)
+        self.load(lines[0] + ''.join(
+            line for line in lines if '"model": "post"' in line
+        ))
+        new_post = Post.objects.exclude(pk=self.post.pk).get()
+        self.assertEqual(new_post.author, self.user)
+        self.assertEqual(new_post.group, self.group)
+        self.assertEqual(new_post.pub_date, self.pub_date)
+
+    def test_import_purges_pages(self):
+        """Импорт сбрасывает страницы групп, авторов и постов."""
+        post_tag = f'post:{self.post.pk}'
+        before = tag_versions([post_tag])
+        lines = self.export().splitlines(keepends=True)
+        self.load(lines[0] + ''.join(
+            line for line in lines if '"model": "comment"' in line
+        ))
+        self.assertEqual(self.post.comments.count(), 2)
+        self.assertNotEqual(tag_versions([post_tag]), before)
+        tags = ['index', f'group:{self.group.pk}', f'author:{self.user.pk}']
+        before = tag_versions(tags)
+        self.load(self.export())
+        after = tag_versions(tags)
+        for tag in tags:
+            self.assertNotEqual(after[tag], before[tag], tag)
+
+    def test_import_counts_image_references(self):
+        """Перенесённые посты тоже держат ссылки на свои картинки."""
+        name = 'posts/ab/ab' + '0' * 62 + '.gif'
+        Post.objects.filter(pk=self.post.pk).update(image=name)
+        MediaBlob.objects.create(name=name, ref_count=1)
+        self.load(self.export())
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 2)
+
+    def test_broken_dump_is_rejected(self):
+        with self.assertRaises(CommandError):
+            self.load('{"model": "post"}\n')
@@ -138,6 +138,14 @@ class PostViewsTests(TestCase):
         self.assertEqual(self.user, response.context['author'])
         self.assertEqual(self.post, response.context['page_obj'][0])
 
+    def test_views_profile_cards_projection(self):
+        """Карточки профиля не читают текст и не перечитывают автора"""
+        response = self.authorized_client.get(self.profile)
+        post = response.context['page_obj'][0]
+        self.assertIn('text', post.get_deferred_fields())
+        self.assertIs(post.author, response.context['author'])
+        self.assertContains(response, self.post.excerpt)
+
     def test_views_group_list_context(self):
         """Проверяем контекст group_list."""
         response = self.authorized_client.get(self.group_list)
@@ -157,16 +165,18 @@ class PostViewsTests(TestCase):
         с картинкой изображение передаётся в словаре context
         """
         posts_count = Post.objects.count()
+        image_name = self.post.image.name
+        self.assertRegex(image_name, r'^posts/[0-9a-f]{2}/[0-9a-f]{64}\.gif$')
         pages = [self.index, self.profile, self.group_list]
         for page in pages:
             with self.subTest(page=page):
                 response = self.authorized_client.get(page)
                 self.assertEqual(
                     response.context['page_obj'][0].image,
-                    'posts/small.gif'
+                    image_name
                 )
         response = self.authorized_client.get(self.post_detail)
-        self.assertEqual(response.context['post'].image, 'posts/small.gif')
+        self.assertEqual(response.context['post'].image, image_name)
         Post.objects.create(
             text='Тестовый текст поста с картинкой',
             author=self.user,
@@ -0,0 +1,268 @@
+"""
+Перенос данных Yatube в NDJSON: пользователи, группы, посты,
+комментарии и подписки.
+
+Файл начинается со строки-заголовка, дальше по одной записи на строку:
+{"model": "post", "pk": 1, "fields": {...}}; внешние ключи записаны
+как первичные ключи исходной базы. Модели идут в порядке зависимостей.
+Экспорт читает таблицы порциями по ключу, импорт пишет их пачками через
+bulk_create, так что память не зависит от объёма данных.
+
+При импорте ключи переносятся со сдвигом на максимальный ключ таблицы,
+поэтому в пустую базу данные ложатся с исходными ключами, а в
+заполненную - рядом с существующими. Пользователи с тем же username и
+группы с тем же slug не создаются, а связываются с существующими.
+Ссылки на модели, которых в выгрузке нет, указывают на существующие
+записи и переносятся без сдвига.
+"""
+import datetime
+import gzip
+import json
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from core.cache import purge_page_tags
+from core.iterators import keyset_chunks
+from core.media import add_references
+
+from . import group_feeds
+from .models import Comment, Follow, Group, Post, User
+
+FORMAT = 'yatube'
+VERSION = 1
+
+
+class ModelSpec:
+    def __init__(self, name, model, fields, natural_key=None,
+                 ignore_conflicts=False, prepare=None, page_tags=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.natural_key = natural_key
+        self.ignore_conflicts = ignore_conflicts
+        # Заполняет вычисляемые поля: bulk_create не вызывает save()
+        self.prepare = prepare
+        # Теги страниц, которые показывают объект: bulk_create не
+        # вызывает сигналы, которые их сбрасывают (см. posts.signals)
+        self.page_tags = page_tags
+        self.foreign_keys = {
+            field.name: field.related_model
+            for field in model._meta.concrete_fields
+            if field.name in fields and field.is_relation
+        }
+        self.datetimes = {
+            field.name for field in model._meta.concrete_fields
+            if field.get_internal_type() == 'DateTimeField'
+        }
+
+    def columns(self):
+        return ['id'] + [
+            f'{name}_id' if name in self.foreign_keys else name
+            for name in self.fields
+        ]
+
+
+def post_tags(post):
+    tags = [f'author:{post.author_id}']
+    if post.group_id is not None:
+        tags.append(f'group:{post.group_id}')
+    return tags
+
+
+def comment_tags(comment):
+    return [f'post:{comment.post_id}']
+
+
+SPECS = [
+    ModelSpec('user', User, [
+        'username', 'password', 'first_name', 'last_name', 'email',
+        'is_active', 'date_joined', 'last_login',
+    ], natural_key='username'),
+    ModelSpec('group', Group, ['title', 'slug', 'description'],
+              natural_key='slug'),
+    ModelSpec('post', Post, ['text', 'pub_date', 'author', 'group', 'image'],
+              prepare=Post.render_text, page_tags=post_tags),
+    ModelSpec('comment', Comment, ['post', 'author', 'text', 'pub_date'],
+              page_tags=comment_tags),
+    ModelSpec('follow', Follow, ['user', 'author'], ignore_conflicts=True),
+]
+SPECS_BY_NAME = {spec.name: spec for spec in SPECS}
+
+
+class Encoder(DjangoJSONEncoder):
+    """Даты с микросекундами: DjangoJSONEncoder обрезает их до мс."""
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def open_stream(path, mode):
+    """Файл по пути, сжатый gzip для .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def export_records(chunk_size):
+    """Строки NDJSON со всеми данными, порциями по chunk_size."""
+    yield json.dumps({'format': FORMAT, 'version': VERSION}) + '\n'
+    encoder = Encoder(ensure_ascii=False)
+    for spec in SPECS:
+        columns = spec.columns()
+        queryset = spec.model.objects.values_list(*columns)
+        for chunk in keyset_chunks(queryset, chunk_size, 'id'):
+            for row in chunk:
+                yield encoder.encode({
+                    'model': spec.name,
+                    'pk': row[0],
+                    'fields': dict(zip(spec.fields, row[1:])),
+                }) + '\n'
+
+
+class IdMap:
+    """Соответствие ключей исходной базы ключам текущей."""
+    def __init__(self, offset=0):
+        self.offset = offset
+        self.existing = {}
+
+    @classmethod
+    def for_model(cls, model):
+        """Сдвиг на максимальный ключ таблицы."""
+        return cls(model.objects.aggregate(Max('id'))['id__max'] or 0)
+
+    def __getitem__(self, pk):
+        if pk is None:
+            return None
+        return self.existing.get(pk, pk + self.offset)
+
+
+# Ключи моделей, которых нет в выгрузке, не меняются
+SAME_IDS = IdMap()
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    bulk_create не затирает перенесённые даты auto_now_add. Флаг поля
+    общий для процесса, поэтому снят только на время одной вставки.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.id_maps = {}
+        self.batch = []
+        self.batch_spec = None
+        self.counts = {spec.name: 0 for spec in SPECS}
+        self.page_tags = {'index'}
+
+    def id_map(self, model):
+        if model not in self.id_maps:
+            self.id_maps[model] = IdMap.for_model(model)
+        return self.id_maps[model]
+
+    def add(self, record):
+        spec = SPECS_BY_NAME[record['model']]
+        if spec is not self.batch_spec:
+            self.flush()
+            self.batch_spec = spec
+            self.id_map(spec.model)
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        spec = self.batch_spec
+        if not self.batch:
+            return
+        records, self.batch = self.batch, []
+        id_map = self.id_map(spec.model)
+        if spec.natural_key:
+            records = self.match_existing(spec, id_map, records)
+        objects = [self.build(spec, id_map, record) for record in records]
+        with keep_auto_now_add(spec.model):
+            spec.model.objects.bulk_create(
+                objects, ignore_conflicts=spec.ignore_conflicts
+            )
+        if spec.model is Post:
+            # bulk_create не вызывает сигналы, которые считают ссылки
+            add_references(obj.image.name for obj in objects)
+        if spec.page_tags is not None:
+            for obj in objects:
+                self.page_tags.update(spec.page_tags(obj))
+        self.counts[spec.name] += len(objects)
+
+    def match_existing(self, spec, id_map, records):
+        """Связывает записи с существующими по естественному ключу."""
+        keys = {record['fields'][spec.natural_key]: record['pk']
+                for record in records}
+        existing = spec.model.objects.filter(
+            **{f'{spec.natural_key}__in': list(keys)}
+        ).values_list(spec.natural_key, 'id')
+        for key, pk in existing:
+            id_map.existing[keys[key]] = pk
+        return [
+            record for record in records
+            if record['pk'] not in id_map.existing
+        ]
+
+    def build(self, spec, id_map, record):
+        values = {'id': id_map[record['pk']]}
+        for name, value in record['fields'].items():
+            if name in spec.foreign_keys:
+                related_map = self.id_maps.get(
+                    spec.foreign_keys[name], SAME_IDS
+                )
+                values[f'{name}_id'] = related_map[value]
+            elif name in spec.datetimes and value is not None:
+                values[name] = parse_datetime(value)
+            else:
+                values[name] = value
+        obj = spec.model(**values)
+        if spec.prepare is not None:
+            spec.prepare(obj)
+        return obj
+
+
+def import_records(lines, batch_size):
+    """
+    Загружает строки NDJSON одной транзакцией.
+    Возвращает количество загруженных записей по моделям.
+    """
+    lines = iter(lines)
+    header = json.loads(next(lines, 'null'))
+    if not header or header.get('format') != FORMAT:
+        raise ValueError('Это не выгрузка Yatube')
+    if header.get('version') != VERSION:
+        raise ValueError(f'Неизвестная версия выгрузки: {header["version"]}')
+    importer = Importer(batch_size)
+    models = [spec.model for spec in SPECS]
+    with transaction.atomic():
+        for line in lines:
+            if line.strip():
+                importer.add(json.loads(line))
+        importer.flush()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+    purge_page_tags(*importer.page_tags)
+    group_feeds.reset_all()
+    return importer.counts
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 app_name = "posts"
 
@@ -15,6 +15,12 @@ urlpatterns = [
     ),
     path('create/', views.post_create, name='post_create'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('live/', views.live_feed, name='live_feed'),
+    path(
+        'notifications/',
+        views.notifications,
+        name='notifications'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -25,5 +31,33 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('feeds/rss/', feeds.IndexFeed(), name='index_rss'),
+    path('feeds/atom/', feeds.IndexAtomFeed(), name='index_atom'),
+    path(
+        'group/<slug:slug>/rss/',
+        feeds.GroupFeed(),
+        name='group_rss'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.GroupAtomFeed(),
+        name='group_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.AuthorFeed(),
+        name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.AuthorAtomFeed(),
+        name='profile_atom'
+    ),
+    path('sitemap.xml', views.sitemap_index, name='sitemap'),
+    path(
+        'sitemap-<slug:section>-<int:shard>.xml',
+        views.sitemap_shard,
+        name='sitemap_shard'
+    ),
     path('', views.index, name='index'),
 ]
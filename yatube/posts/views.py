@@ -1,17 +1,43 @@
+import os
+
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.http import (
+    FileResponse, Http404, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import redirect, render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .models import Post, Group, User, Comment, Follow
+
+from core.cache import add_page_cache_tags, cache_anonymous_page
+from core.identity import get_identity_map, share_related
+from core.ratelimit import ratelimit
+from core.thumbnails import attach_thumbnails, preload_thumbnails
+from .models import Post, Group, User, Follow
 from .forms import PostForm, CommentForm
+from . import group_feeds
+from .cursors import (
+    FOLLOW_FEED, get_cursor, mark_seen, parse_position, position_token,
+    posts_after, remember_position, resume_token, seen_from
+)
+from .live import feed_filter, poll, read_last_id, read_since, stream
+from .sitemaps import (
+    SECTIONS, cached_fingerprints, render_index, render_shard, shard_name
+)
+from .notifications import mark_read
 
 POSTS_COUNT = 10
+NOTIFICATIONS_COUNT = 50
 
 
+@cache_anonymous_page
 def index(request):
-    post_list = Post.objects.select_related('author')
+    add_page_cache_tags(request, 'index')
+    post_list = Post.objects.cards()
     paginator = Paginator(post_list, POSTS_COUNT)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = preload_thumbnails(share_related(
+        request, paginator.get_page(page_number), 'author', 'group'
+    ))
     title = 'Последние обновления на сайте'
     context = {
         'title': title,
@@ -20,12 +46,15 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@cache_anonymous_page
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, POSTS_COUNT)
+    add_page_cache_tags(request, f'group:{group.id}')
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page = group_feeds.get_page(
+        group, page_number, POSTS_COUNT, get_identity_map(request)
+    )
+    page_obj = preload_thumbnails(share_related(request, page, 'author'))
     context = {
         'group': group,
         'page_obj': page_obj
@@ -33,12 +62,14 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_anonymous_page
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    user_posts = Post.objects.filter(author=author)
+    add_page_cache_tags(request, f'author:{author.id}')
+    user_posts = author.posts.cards()
     paginator = Paginator(user_posts, POSTS_COUNT)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = preload_thumbnails(paginator.get_page(page_number))
     following = None
     if author != request.user:
         following = Follow.objects.filter(
@@ -53,17 +84,27 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+@cache_anonymous_page
 def post_detail(request, post_id):
     is_author = False
     form = CommentForm(request.POST or None)
     username = request.user
     post = get_object_or_404(Post, pk=post_id)
+    tags = [f'post:{post.id}', f'author:{post.author_id}']
+    if post.group_id is not None:
+        tags.append(f'group:{post.group_id}')
+    add_page_cache_tags(request, *tags)
+    identity_map = get_identity_map(request)
+    identity_map.attach([post], 'author')
     if post.author == username:
         is_author = True
-    title = f'Пост: {post.text}'
+    title = f'Пост: {post.excerpt}'
     author = post.author
     posts_count = Post.objects.filter(author=author).count()
-    comments = Comment.objects.filter(author=author)
+    # Комментарии автора поста получают тот же объект автора
+    comments = identity_map.attach(
+        post.comments.select_related('author'), 'author'
+    )
     context = {
         'title': title,
         'form': form,
@@ -76,6 +117,7 @@ def post_detail(request, post_id):
 
 
 @login_required
+@ratelimit('10/m')
 def post_create(request):
     username = request.user
     form = PostForm(request.POST or None, files=request.FILES or None,)
@@ -110,6 +152,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@ratelimit('20/m')
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
     post = get_object_or_404(Post, pk=post_id)
@@ -123,19 +166,83 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
+    post_list = Post.objects.filter(
+        author__following__user=request.user
+    ).cards()
+    cursor = get_cursor(request.user, FOLLOW_FEED)
+    title = 'Лента подписок'
+    after = parse_position(request.GET.get('after', ''))
+    if after is not None:
+        posts = attach_thumbnails(get_identity_map(request).attach(
+            posts_after(post_list, *after)[:POSTS_COUNT],
+            'author', 'group'
+        ))
+        if posts:
+            remember_position(cursor, request.user, FOLLOW_FEED, posts[-1])
+        context = {
+            'title': title,
+            'page_obj': posts,
+            'after_mode': True,
+            'next_after': (
+                position_token(posts[-1].pub_date, posts[-1].pk)
+                if len(posts) == POSTS_COUNT else None
+            )
+        }
+        return render(request, 'posts/follow.html', context)
     paginator = Paginator(post_list, POSTS_COUNT)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    title = 'Лента подписок'
+    page_obj = preload_thumbnails(share_related(
+        request, paginator.get_page(page_number), 'author', 'group'
+    ))
     context = {
         'title': title,
         'page_obj': page_obj
     }
+    if page_obj.number == 1:
+        context['resume_after'] = resume_token(cursor)
+        context['seen_from'] = seen_from(cursor, page_obj)
+        if page_obj:
+            mark_seen(cursor, request.user, FOLLOW_FEED, page_obj[0])
+    else:
+        remember_position(cursor, request.user, FOLLOW_FEED, page_obj[-1])
     return render(request, 'posts/follow.html', context)
 
 
+def live_feed(request):
+    feed = request.GET.get('feed', 'index')
+    group = None
+    if feed == 'group':
+        group = get_object_or_404(Group, slug=request.GET.get('group'))
+    matches = feed_filter(request, feed, group)
+    last_id = read_last_id(request)
+    since = read_since(request)
+    if request.GET.get('poll'):
+        return JsonResponse(poll(request, matches, last_id, since))
+    response = StreamingHttpResponse(
+        stream(request, matches, last_id, since),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
+def notifications(request):
+    notification_list = list(
+        request.user.notifications.select_related('post__author')
+        [:NOTIFICATIONS_COUNT]
+    )
+    mark_read(request.user)
+    context = {
+        'title': 'Уведомления',
+        'notifications': notification_list
+    }
+    return render(request, 'posts/notifications.html', context)
+
+
+@login_required
+@ratelimit('30/m', methods=('GET', 'POST'))
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
@@ -148,3 +255,38 @@ def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username=username)
+
+
+def _sitemap_path(name):
+    return os.path.join(settings.SITEMAP_ROOT, name)
+
+
+def _sitemap_response(request, name, render):
+    """Готовый файл карты сайта или, пока его нет, поток из базы."""
+    path = _sitemap_path(name)
+    if os.path.exists(path):
+        return FileResponse(open(path, 'rb'), content_type='application/xml')
+    base_url = request.build_absolute_uri('/').rstrip('/')
+    return StreamingHttpResponse(
+        render(base_url), content_type='application/xml'
+    )
+
+
+def sitemap_index(request):
+    return _sitemap_response(
+        request, 'sitemap.xml',
+        lambda base_url: render_index(cached_fingerprints(), base_url)
+    )
+
+
+def sitemap_shard(request, section, shard):
+    if section not in SECTIONS:
+        raise Http404
+    name = shard_name(section, shard)
+    if (not os.path.exists(_sitemap_path(name))
+            and shard not in cached_fingerprints()[section]):
+        raise Http404
+    return _sitemap_response(
+        request, name,
+        lambda base_url: render_shard(section, shard, base_url)
+    )
@@ -0,0 +1,39 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import override_settings
+
+from core.benchmarks import benchmark
+
+HASHERS = ('scrypt', 'pbkdf2_sha256')
+
+
+def _logins_per_second(encoded, logins, threads):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = executor.map(
+            lambda _: check_password('password', encoded), range(logins)
+        )
+        assert all(results)
+    return logins / (time.perf_counter() - started)
+
+
+@benchmark('password_hashing')
+def password_hashing(repeat):
+    """Входов в секунду на ядро без пула и с пулом на все ядра."""
+    cores = os.cpu_count() or 1
+    results = {}
+    for algorithm in HASHERS:
+        encoded = make_password('password', hasher=algorithm)
+        with override_settings(PASSWORD_HASHING_WORKERS=0):
+            results[f'{algorithm} без пула, входов/с на ядро'] = (
+                _logins_per_second(encoded, repeat, 1)
+            )
+        with override_settings(PASSWORD_HASHING_WORKERS=cores):
+            # Прогрев: запуск процессов пула не входит в замер
+            _logins_per_second(encoded, cores, cores)
+            rate = _logins_per_second(encoded, repeat * cores, cores * 2)
+            results[f'{algorithm} пул, входов/с на ядро'] = rate / cores
+    return results
@@ -0,0 +1,148 @@
+"""
+Хеширование паролей в ограниченном пуле процессов.
+
+Хеш считается в отдельном процессе, поэтому тяжёлые хеши не отнимают
+процессор у потоков, обслуживающих запросы, а одновременных хеширований
+не больше PASSWORD_HASHING_WORKERS. Ожидающих в очереди не больше
+PASSWORD_HASHING_MAX_PENDING, остальные ждут до постановки в очередь.
+При PASSWORD_HASHING_WORKERS = 0 хеш считается в текущем потоке.
+"""
+import base64
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    BasePasswordHasher, PBKDF2PasswordHasher, mask_hash
+)
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare, pbkdf2
+from django.utils.translation import gettext_noop as _
+
+_executor = None
+_pending = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _pending
+    with _lock:
+        if _executor is None and settings.PASSWORD_HASHING_WORKERS:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _pending = threading.BoundedSemaphore(
+                settings.PASSWORD_HASHING_MAX_PENDING
+            )
+        return _executor, _pending
+
+
+@receiver(setting_changed)
+def reset_executor(setting, **kwargs):
+    global _executor
+    if setting in ('PASSWORD_HASHING_WORKERS', 'PASSWORD_HASHING_MAX_PENDING'):
+        with _lock:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = None
+
+
+def run_hash(func, *args):
+    """Считает хеш в пуле процессов, если он включён."""
+    executor, pending = _get_executor()
+    if executor is None:
+        return func(*args)
+    with pending:
+        return executor.submit(func, *args).result()
+
+
+def scrypt_hash(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode(), salt=salt.encode(), n=n, r=r, p=p, dklen=64
+    )
+
+
+def pbkdf2_sha256_hash(password, salt, iterations):
+    return pbkdf2(password, salt, iterations, digest=hashlib.sha256)
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """Стандартный PBKDF2-SHA256 Django, посчитанный в пуле процессов."""
+
+    def encode(self, password, salt, iterations=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        iterations = iterations or self.iterations
+        hash = run_hash(pbkdf2_sha256_hash, password, salt, iterations)
+        hash = base64.b64encode(hash).decode('ascii').strip()
+        return '%s$%d$%s$%s' % (self.algorithm, iterations, salt, hash)
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """
+    Хеш scrypt, требовательный к памяти.
+    Формат совпадает с ScryptPasswordHasher из новых версий Django.
+    """
+    algorithm = 'scrypt'
+    work_factor = 2 ** 14
+    block_size = 8
+    parallelism = 1
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash = run_hash(scrypt_hash, password, salt, n, r, p)
+        hash = base64.b64encode(hash).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash)
+
+    def decode(self, encoded):
+        algorithm, n, salt, r, p, hash = encoded.split('$', 5)
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'work_factor': int(n),
+            'salt': salt,
+            'block_size': int(r),
+            'parallelism': int(p),
+            'hash': hash,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password, decoded['salt'], decoded['work_factor'],
+            decoded['block_size'], decoded['parallelism']
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return OrderedDict([
+            (_('algorithm'), decoded['algorithm']),
+            (_('work factor'), decoded['work_factor']),
+            (_('block size'), decoded['block_size']),
+            (_('parallelism'), decoded['parallelism']),
+            (_('salt'), mask_hash(decoded['salt'])),
+            (_('hash'), mask_hash(decoded['hash'])),
+        ])
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            decoded['work_factor'] != self.work_factor
+            or decoded['block_size'] != self.block_size
+            or decoded['parallelism'] != self.parallelism
+        )
+
+    def harden_runtime(self, password, encoded):
+        # Время scrypt зависит от параметров, а не от числа итераций,
+        # выравнивать нечего.
+        pass
@@ -0,0 +1,42 @@
+from django.contrib.auth.hashers import (
+    check_password, identify_hasher, make_password
+)
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import User
+
+
+class PasswordHashersTests(TestCase):
+    def test_scrypt_is_default_hasher(self):
+        """Новые пароли хешируются scrypt и проходят проверку."""
+        encoded = make_password('s3cr3t-пароль')
+        self.assertTrue(encoded.startswith('scrypt$'))
+        self.assertTrue(check_password('s3cr3t-пароль', encoded))
+        self.assertFalse(check_password('другой', encoded))
+
+    def test_login_upgrades_pbkdf2_hash(self):
+        """При входе хеш PBKDF2 прозрачно заменяется на scrypt."""
+        user = User.objects.create(
+            username='LevKharkov',
+            password=make_password('s3cr3t-пароль', hasher='pbkdf2_sha256')
+        )
+        response = Client().post(reverse('users:login'), {
+            'username': 'LevKharkov',
+            'password': 's3cr3t-пароль',
+        })
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, 'scrypt')
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_pooled_hashing(self):
+        """Хеш из пула процессов совпадает с посчитанным в потоке."""
+        for hasher in ('scrypt', 'pbkdf2_sha256'):
+            with self.subTest(hasher=hasher):
+                pooled = make_password('пароль', salt='salt', hasher=hasher)
+                with self.settings(PASSWORD_HASHING_WORKERS=0):
+                    inline = make_password(
+                        'пароль', salt='salt', hasher=hasher
+                    )
+                self.assertEqual(pooled, inline)
@@ -0,0 +1,17 @@
+"""
+Настройки проекта выбираются переменной окружения DJANGO_ENV:
+dev (по умолчанию) или prod.
+"""
+import os
+
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    from django.core.exceptions import ImproperlyConfigured
+    raise ImproperlyConfigured(
+        f'Неизвестное окружение DJANGO_ENV={DJANGO_ENV!r}'
+    )
@@ -0,0 +1,342 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_list(name, default):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+SECRET_KEY = os.environ.get('SECRET_KEY')
+
+DEBUG = env_bool('DEBUG')
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+])
+
+INSTALLED_APPS = [
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.TemplateProfilerMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'posts.context_processors.notifications',
+                'posts.context_processors.follow_feed',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 0)),
+    }
+}
+
+
+# Первый хешер основной: при входе старые хеши пароля
+# прозрачно пересчитываются в scrypt
+PASSWORD_HASHERS = [
+    'users.hashers.ScryptPasswordHasher',
+    'users.hashers.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# Хеширование паролей в пуле процессов, 0 - в потоке запроса
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 0))
+PASSWORD_HASHING_MAX_PENDING = 32
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+        'UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+        'MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+        'CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.'
+        'NumericPasswordValidator',
+    },
+]
+
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Отдавать собранную статику из WSGI-приложения, минуя Django
+STATIC_SERVE = False
+
+# max-age для файлов статики без хеша в имени
+STATIC_MAX_AGE = 60
+
+# CSS, из которых при сборке вырезаются правила, не используемые в шаблонах
+STATIC_PURGE_CSS = ['css/bootstrap.min.css']
+STATIC_PURGE_SAFELIST = []
+
+LOGIN_URL = 'users:login'
+
+LOGIN_REDIRECT_URL = 'posts:index'
+
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Общий для всех воркеров кеш задаётся через окружение, например
+# CACHE_BACKEND=django.core.cache.backends.memcached.MemcachedCache
+# CACHE_LOCATION=127.0.0.1:11211
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Хранилище сессий: db - в базе, cached_db - в общем кеше с записью
+# в базу, cookie - в подписанной куке (только для небольших сессий)
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cookie': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+def session_engine(tier):
+    if tier not in SESSION_ENGINES:
+        raise ImproperlyConfigured(
+            f'Неизвестный SESSION_TIER {tier!r}, допустимые: '
+            + ', '.join(SESSION_ENGINES)
+        )
+    return SESSION_ENGINES[tier]
+
+
+SESSION_TIER = os.environ.get('SESSION_TIER', 'db')
+SESSION_ENGINE = session_engine(SESSION_TIER)
+SESSION_CACHE_ALIAS = 'default'
+
+# Ограничение частоты запросов; RATELIMIT_IP_HEADER - заголовок с IP
+# клиента за прокси, например HTTP_X_FORWARDED_FOR, RATELIMIT_PROXY_COUNT -
+# сколько доверенных прокси дописывают в него адрес,
+# RATELIMIT_IP_MULTIPLIER - во сколько раз лимит IP вошедших
+# пользователей шире их личного лимита
+RATELIMIT_ENABLE = True
+RATELIMIT_IP_HEADER = None
+RATELIMIT_PROXY_COUNT = 1
+RATELIMIT_IP_MULTIPLIER = 5
+
+# Удаление устаревших сессий командой clearsessions
+CLEARSESSIONS_BATCH_SIZE = 1000
+
+# Прогрев кеша шаблонов при старте WSGI-приложения
+TEMPLATES_PREWARM = False
+
+# Проверки core.E001-E003 при старте WSGI-приложения: с ошибкой в
+# настройках процесс не запускается
+STARTUP_CHECKS = False
+
+# Замер времени рендера каждого {% include %} и тега шаблона
+TEMPLATE_PROFILING = False
+TEMPLATE_PROFILING_TOP = 10
+
+# Приложения и middleware, которые допустимы только при разработке
+DEBUG_ONLY_APPS = [
+    'debug_toolbar',
+]
+DEBUG_ONLY_MIDDLEWARE = [
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
+# Сжатие ответов
+COMPRESSION_MIN_SIZE = 512
+COMPRESSION_STREAMING = True
+COMPRESSION_SKIP_TYPES = [
+    'image/',
+    'video/',
+    'audio/',
+    'font/woff',
+    'application/zip',
+    'application/gzip',
+    'text/event-stream',
+]
+# Уровни сжатия по типу содержимого: точный тип, 'text/*' или '*'
+COMPRESSION_LEVELS = {
+    'text/html': {'br': 5, 'gzip': 6},
+    '*': {'br': 4, 'gzip': 6},
+}
+
+# Кеш целых страниц для анонимных посетителей
+PAGE_CACHE_TIMEOUT = 60
+# Сколько хранить устаревшую копию, которую отдают во время перестроения
+PAGE_CACHE_STALE_TIMEOUT = 600
+PAGE_CACHE_LOCK_TIMEOUT = 10
+# Сколько ждать чужого перестроения, если устаревшей копии нет
+PAGE_CACHE_LOCK_WAIT = 2
+
+# Кеш фрагментов шаблонов: коэффициент раннего перестроения
+# и сколько отдавать устаревший фрагмент, пока его перестраивают
+FRAGMENT_CACHE_BETA = 1.0
+FRAGMENT_CACHE_STALE_TIMEOUT = 60
+FRAGMENT_CACHE_LOCK_TIMEOUT = 10
+FRAGMENT_CACHE_LOCK_WAIT = 2
+
+# Отложенные задачи: при TASKS_ALWAYS_EAGER выполняются сразу,
+# иначе кладутся в очередь, которую разбирает manage.py runworker
+TASKS_ALWAYS_EAGER = env_bool('TASKS_ALWAYS_EAGER', True)
+TASKS_WORKERS = int(os.environ.get('TASKS_WORKERS', 2))
+TASKS_POLL_INTERVAL = 1.0
+# Через сколько секунд выполняющаяся задача считается потерянной
+TASKS_VISIBILITY_TIMEOUT = 600
+
+# Уведомления о новых постах: сколько подписчиков обрабатывать за раз
+# и сколько хранить в кеше счётчик непрочитанных
+NOTIFICATIONS_BATCH_SIZE = 500
+NOTIFICATIONS_CACHE_TIMEOUT = 60 * 60
+# Дайджесты: скольким пользователям отправлять письма за одну порцию
+DIGEST_BATCH_SIZE = 100
+
+# Публикация событий между запросами: core.pubsub.LocalBackend для одного
+# процесса, core.pubsub.CacheBackend для нескольких процессов с общим кешем
+PUBSUB_BACKEND = os.environ.get('PUBSUB_BACKEND', 'core.pubsub.LocalBackend')
+PUBSUB_CACHE_ALIAS = 'default'
+PUBSUB_BUFFER_SIZE = 100
+PUBSUB_EVENT_TIMEOUT = 60 * 10
+PUBSUB_POLL_INTERVAL = 1.0
+# Сколько секунд ждать сообщения события, номер которого уже выдан:
+# после этого событие пропускается (издатель упал между incr и set)
+PUBSUB_MISSING_EVENT_TIMEOUT = 5
+
+# Живое обновление лент, интервалы в секундах, LIVE_FEED_RETRY в мс;
+# LIVE_FEED_BACKLOG - сколько постов, не попавших в закешированную
+# страницу, отдавать при подключении
+LIVE_FEED_HEARTBEAT = 15
+LIVE_FEED_MAX_DURATION = 5 * 60
+LIVE_FEED_POLL_TIMEOUT = 25
+LIVE_FEED_RETRY = 3000
+LIVE_FEED_BACKLOG = 50
+
+# Ленты групп (posts.group_feeds): сколько новых постов группы держать
+# в кеше, для скольких групп и как долго
+GROUP_FEED_SIZE = 200
+GROUP_FEED_CACHE_GROUPS = 100
+GROUP_FEED_TIMEOUT = 15 * 60
+
+# RSS и Atom: сколько постов в ленте и сколько хранить готовую ленту
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Адрес сайта для ссылок вне запроса (карта сайта)
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+# Карта сайта: куда писать файлы, записей в шарде, строк за один запрос
+# и сколько хранить отпечатки шардов, пока файлов нет
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_SHARD_SIZE = 10000
+SITEMAP_CHUNK_SIZE = 2000
+SITEMAP_CACHE_TIMEOUT = 60 * 60
+
+# Картинки постов хранятся по хешу содержимого в объектном хранилище;
+# файл без ссылок удаляется gc_media не раньше чем через MEDIA_GC_GRACE с
+MEDIA_OBJECT_STORE = 'core.media.LocalObjectStore'
+MEDIA_GC_GRACE = 24 * 60 * 60
+
+# Отдача медиафайлов (core.mediaserve). MEDIA_ACCESS_CHECK - путь к функции
+# (request, name) -> bool для закрытых файлов. Файл может отдавать фронтенд:
+# nginx по X-Accel-Redirect на internal-локацию MEDIA_ACCEL_REDIRECT или
+# Apache/lighttpd по X-Sendfile
+MEDIA_ACCESS_CHECK = None
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT')
+MEDIA_X_SENDFILE = env_bool('MEDIA_X_SENDFILE', False)
+# max-age для медиафайлов без хеша содержимого в имени (миниатюры)
+MEDIA_MAX_AGE = 60 * 60
+
+# Миниатюры картинок постов для srcset: ширины и рамка, в которую
+# вписывается самая широкая, sizes по умолчанию
+RESPONSIVE_IMAGE_WIDTHS = [320, 640, 960]
+RESPONSIVE_IMAGE_BOX = (960, 339)
+RESPONSIVE_IMAGE_SIZES = '(max-width: 960px) 100vw, 960px'
@@ -0,0 +1,17 @@
+from .base import *  # noqa: F401,F403
+from .base import (
+    DEBUG_ONLY_APPS, DEBUG_ONLY_MIDDLEWARE, INSTALLED_APPS, MIDDLEWARE,
+    SECRET_KEY, env_bool
+)
+
+SECRET_KEY = SECRET_KEY or 'mp@l#fv0d2b*8ql!)&hws%v^mra5r@2rx^x#w*)9texu-gy(%j'
+
+DEBUG = env_bool('DEBUG', True)
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+INSTALLED_APPS = INSTALLED_APPS + DEBUG_ONLY_APPS
+
+MIDDLEWARE = MIDDLEWARE + DEBUG_ONLY_MIDDLEWARE
@@ -0,0 +1,65 @@
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import (
+    DATABASES, DEBUG_ONLY_APPS, DEBUG_ONLY_MIDDLEWARE, INSTALLED_APPS,
+    MIDDLEWARE, TEMPLATES, env_bool, session_engine
+)
+
+SECRET_KEY = os.environ.get('SECRET_KEY')
+
+DEBUG = env_bool('DEBUG', False)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEBUG_ONLY_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in DEBUG_ONLY_MIDDLEWARE
+]
+
+# Шаблоны компилируются один раз, прогреваются при старте воркера
+# и хранятся в памяти
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+    'django.template.context_processors.debug'
+)
+TEMPLATES_PREWARM = True
+STARTUP_CHECKS = True
+
+# Половина ядер: пул хеширования не отнимает все процессоры у воркеров,
+# которые обслуживают остальные запросы, а на одном ядре остаётся один
+# процесс хеширования
+PASSWORD_HASHING_WORKERS = int(os.environ.get(
+    'PASSWORD_HASHING_WORKERS', max(1, (os.cpu_count() or 2) // 2)
+))
+
+SESSION_TIER = os.environ.get('SESSION_TIER', 'cached_db')
+SESSION_ENGINE = session_engine(SESSION_TIER)
+
+TASKS_ALWAYS_EAGER = env_bool('TASKS_ALWAYS_EAGER', False)
+TASKS_WORKERS = int(os.environ.get('TASKS_WORKERS', os.cpu_count() or 1))
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_SERVE = True
+
+DATABASES = copy.deepcopy(DATABASES)
+DATABASES['default']['CONN_MAX_AGE'] = int(
+    os.environ.get('CONN_MAX_AGE', 60)
+)
+
+# Остальное (профилирование шаблонов, отладочные приложения) проверяет
+# `manage.py check --deploy`, см. core.checks
+if not SECRET_KEY:
+    raise ImproperlyConfigured('В проде нужно задать SECRET_KEY')
+if DEBUG:
+    raise ImproperlyConfigured('В проде нельзя включать DEBUG')
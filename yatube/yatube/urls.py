@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core import views as core_views
 
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
@@ -15,9 +16,12 @@ urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+if settings.MEDIA_URL.startswith('/'):
+    urlpatterns += (path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>', core_views.media,
+        name='media'
+    ),)
+
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
@@ -9,8 +9,21 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.STARTUP_CHECKS:
+    from core.checks import run_startup_checks
+    run_startup_checks()
+
+if settings.STATIC_SERVE:
+    from core.static import StaticFilesApplication
+    application = StaticFilesApplication(application)
+
+if settings.TEMPLATES_PREWARM:
+    from core.template_cache import warm_templates
+    warm_templates()